@@ -1539,9 +1539,11 @@ def handle_digest_slash(ack, respond, command):
 @app.command("/wejscie")
 def handle_wejscie_slash(ack, respond, command):
     """Plan wejścia w pozycję: `/wejscie TICKER [KWOTA] [risk=0.5]`.
+    `/wejscie watchlist [KWOTA] [risk=0.5]` przegląda cały watchlist.
 
-    Acknowledges immediately, then builds a deterministic PositionPlan per ticker
-    on a bounded executor (max 3 concurrent, deduped per user+ticker)."""
+    Acknowledges immediately, then builds one plan per ticker on the bounded
+    executor (deduped per user+ticker): the batch's shared inputs are fetched
+    once first and each finished plan is sent back as soon as it is ready."""
     ack()
 
     try:
@@ -1554,9 +1556,11 @@ def handle_wejscie_slash(ack, respond, command):
     text = (command.get("text") or "").strip()
     user = command.get("user_id", "?")
 
-    parsed = _univ.parse_entry_command(text)
-    tickers = parsed["tickers"]
-    overflow = parsed["overflow"]
+    words = text.split()
+    sweep = bool(words) and words[0].lower() == "watchlist"
+    parsed = _univ.parse_entry_command(" ".join(words[1:]) if sweep else text)
+    tickers = list(_univ.WATCHLIST) if sweep else parsed["tickers"]
+    overflow = [] if sweep else parsed["overflow"]
     amount = parsed["amount"]
     risk = parsed["risk"]
 
@@ -1569,26 +1573,54 @@ def handle_wejscie_slash(ack, respond, command):
 
     rtxt = f"{risk}%" if risk is not None else f"{_icfg.DEFAULT_RISK_PER_TRADE_PCT}% (domyślne)"
     atxt = f"${amount:,.0f}" if amount else f"${_icfg.DEFAULT_PORTFOLIO_VALUE:,.0f} (domyślne)"
-    progress = f"⏳ Buduję plan wejścia dla *{', '.join(tickers)}* | portfel {atxt} | ryzyko {rtxt}…"
+    what = f"watchlisty ({len(tickers)} tickerów)" if sweep else f"*{', '.join(tickers)}*"
+    progress = f"⏳ Buduję plan wejścia dla {what} | portfel {atxt} | ryzyko {rtxt}…"
     if overflow:
         progress += f"\n⚠️ Analizuję max {_icfg.MAX_TICKERS_PER_MESSAGE} tickery — pomijam: {', '.join(overflow)}"
-    if parsed["rejected"]:
+    if parsed["rejected"] and not sweep:
         progress += f"\nℹ️ Pominięto nierozpoznane: {', '.join(parsed['rejected'])}"
     respond(progress)
 
-    def _make_worker(_t):
-        def _w():
-            try:
-                plan = investing.build_position_plan(
-                    _t, amount, risk, llm_client=getattr(_ctx, "claude", None))
-                respond({"text": investing.format_plan(plan)})
-            except Exception as e:               # noqa: BLE001
-                respond(f"❌ {_t}: nie udało się zbudować planu wejścia: {e}")
-        return _w
+    def _send(_t, res):
+        if isinstance(res, Exception):
+            if not sweep:
+                respond(f"❌ {_t}: nie udało się zbudować planu wejścia: {res}")
+            return
+        if not sweep:
+            respond({"text": investing.format_plan(res)})
+        elif res.decision_status.value in ("READY_TO_ENTER", "WAIT_FOR_TRIGGER"):
+            # response_url allows only a few replies — a sweep streams to the user's DM
+            app.client.chat_postMessage(channel=user, text=investing.format_plan(res))
+
+    shared = {}
+    results = {}
+
+    def _prepare(_ts):
+        shared["open_positions"] = investing.prefetch_plan_inputs(_ts)
 
-    for _t in tickers:
-        if not runner.submit(f"{user}:{_t}", _make_worker(_t)):
-            respond(f"⏳ {_t}: analiza już trwa — czekaj na wynik.")
+    def _one(_t):
+        try:
+            res = investing.build_position_plan(
+                _t, amount, risk, llm_client=None if sweep else getattr(_ctx, "claude", None),
+                open_positions=shared.get("open_positions"))
+        except Exception as e:                   # noqa: BLE001
+            res = e
+        results[_t] = res
+        _send(_t, res)
+
+    def _done():
+        if sweep:
+            counts = {}
+            for res in results.values():
+                key = "ERROR" if isinstance(res, Exception) else res.decision_status.value
+                counts[key] = counts.get(key, 0) + 1
+            summary = ", ".join(f"{k}: {v}" for k, v in sorted(counts.items()))
+            respond(f"✅ Watchlista przejrzana ({summary}) — plany do wejścia wysłałem w DM.")
+
+    skipped = runner.submit_batch({t: f"{user}:{t}" for t in tickers}, _one,
+                                  prepare=_prepare, done=_done)
+    if skipped:
+        respond(f"⏳ Analiza już trwa — czekaj na wynik: {', '.join(skipped)}")
 
 
 # ── /cleanup slash command ────────────────────────────────────────────────────
@@ -4739,6 +4771,51 @@ def _send_morning_brief_xnys():
     send_morning_brief()
 
 
+def _build_correlation_matrix_xnys():
+    """Nightly return-correlation / beta matrix for the universe + open positions,
+    read by every /wejscie plan. Runs after the XNYS close; holidays skipped."""
+    try:
+        import datetime as _dt
+        from investing import market_calendar as _mc, correlation_matrix as _cm
+        today = _dt.datetime.now(_dt.timezone.utc).date()
+        if not _mc.is_trading_day(today):
+            logger.info("XNYS zamknięty (%s) — pomijam macierz korelacji", today)
+            return
+        _cm.refresh()
+    except Exception as _e:
+        logger.warning("correlation matrix build failed: %s", _e)
+
+
+def _build_rs_rank_xnys():
+    """The session's cross-sectional RS rank table, read by every /wejscie plan.
+    Runs after the XNYS close; holidays skipped."""
+    try:
+        import datetime as _dt
+        from investing import market_calendar as _mc, rs_rank as _rs
+        today = _dt.datetime.now(_dt.timezone.utc).date()
+        if not _mc.is_trading_day(today):
+            logger.info("XNYS zamknięty (%s) — pomijam ranking RS", today)
+            return
+        _rs.refresh()
+    except Exception as _e:
+        logger.warning("RS rank table build failed: %s", _e)
+
+
+def _track_outcomes_xnys():
+    """Score stored /wejscie plans whose 5/10/20/40/60-session horizons have
+    elapsed. Runs after the XNYS close; holidays skipped."""
+    try:
+        import datetime as _dt
+        from investing import market_calendar as _mc, backtest as _bt
+        today = _dt.datetime.now(_dt.timezone.utc).date()
+        if not _mc.is_trading_day(today):
+            logger.info("XNYS zamknięty (%s) — pomijam śledzenie wyników", today)
+            return
+        _bt.track_outcomes()
+    except Exception as _e:
+        logger.warning("outcome tracking failed: %s", _e)
+
+
 scheduler = BackgroundScheduler(timezone=pytz.timezone('Europe/Warsaw'))
 scheduler.add_job(daily_summaries,           'cron', day_of_week='mon-fri', hour=16, minute=0)
 scheduler.add_job(daily_digest_dre,          'cron', day_of_week='mon-fri', hour=9, minute=0, id='daily_digest_dre')
@@ -4765,6 +4842,18 @@ scheduler.add_job(weekly_cost_report,        'cron', day_of_week='mon',     hour
 scheduler.add_job(_send_morning_brief_xnys,  'cron', day_of_week='mon-fri', hour=8, minute=45,
                   timezone=pytz.timezone('America/New_York'), id='market_health_daily',
                   max_instances=1, coalesce=True, misfire_grace_time=1800)
+# Correlation matrix: 17:30 America/New_York, after the XNYS close; holidays skipped inside.
+scheduler.add_job(_build_correlation_matrix_xnys, 'cron', day_of_week='mon-fri', hour=17, minute=30,
+                  timezone=pytz.timezone('America/New_York'), id='correlation_matrix',
+                  max_instances=1, coalesce=True, misfire_grace_time=3600)
+# RS rank table: 17:25 America/New_York, after the XNYS close; holidays skipped inside.
+scheduler.add_job(_build_rs_rank_xnys,       'cron', day_of_week='mon-fri', hour=17, minute=25,
+                  timezone=pytz.timezone('America/New_York'), id='rs_rank',
+                  max_instances=1, coalesce=True, misfire_grace_time=3600)
+# Outcome tracking: 17:45 America/New_York, once the day's bars are final.
+scheduler.add_job(_track_outcomes_xnys,      'cron', day_of_week='mon-fri', hour=17, minute=45,
+                  timezone=pytz.timezone('America/New_York'), id='outcome_tracking',
+                  max_instances=1, coalesce=True, misfire_grace_time=3600)
 scheduler.add_job(send_weekly_setups,        'cron', day_of_week='fri',     hour=16, minute=0,  id='weekly_setups',
                   max_instances=1, coalesce=True, misfire_grace_time=1800)
 scheduler.add_job(send_narrative_radar,      'cron', day_of_week='fri',     hour=16, minute=30, id='narrative_radar',
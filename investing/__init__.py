@@ -20,6 +20,8 @@ from typing import Any
 
 __all__ = [
     "build_position_plan",
+    "build_position_plans",
+    "prefetch_plan_inputs",
     "format_plan",
     "PositionPlan",
     "DecisionStatus",
@@ -39,6 +41,16 @@ def build_position_plan(*args, **kwargs):
     return _impl(*args, **kwargs)
 
 
+def build_position_plans(*args, **kwargs):
+    from .entry import build_position_plans as _impl
+    return _impl(*args, **kwargs)
+
+
+def prefetch_plan_inputs(*args, **kwargs):
+    from .entry import prefetch_plan_inputs as _impl
+    return _impl(*args, **kwargs)
+
+
 def format_plan(plan) -> str:
     from .formatting import format_plan as _impl
     return _impl(plan)
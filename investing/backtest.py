@@ -3,18 +3,28 @@ investing/backtest.py — recommendation outcome tracking & shadow mode.
 
 For each stored recommendation we can, after 5/10/20/40/60 sessions, compute MFE,
 MAE, realized R, whether stop / T1 / T2 were hit, time-to-target, gap risk and max
-drawdown — and break results down by setup / sector / regime. A shadow mode lets
-the old and new systems produce decisions in parallel for comparison, with no
-execution.
+drawdown — and break results down by setup / sector / regime. :func:`track_outcomes`
+is the scheduled job that does this for every stored plan whose horizons have
+elapsed. A shadow mode lets the old and new systems produce decisions in parallel
+for comparison, with no execution.
 """
 
 from __future__ import annotations
 
-from typing import Optional, Sequence
+import bisect
+import datetime as _dt
+import logging
+from typing import Callable, Optional, Sequence
 
-from . import persistence
+from . import bar_store, market_calendar, persistence, universe
+
+logger = logging.getLogger(__name__)
 
 HORIZONS = (5, 10, 20, 40, 60)
+OUTCOME_JOB = "outcome_tracking"
+# only plans that recommend a trade are scored; NO_TRADE / DATA_INCOMPLETE ones
+# would fold outcomes of trades nobody was told to take into the rollups
+SCORED_STATUSES = frozenset({"READY_TO_ENTER", "WAIT_FOR_TRIGGER"})
 
 
 def compute_outcome(entry: float, stop: float, targets: Sequence[float],
@@ -100,3 +110,119 @@ def shadow_record(*, ticker: str, old_decision: str, new_status: str,
         ticker, "SHADOW", new_setup, 0.0, 0.0,
         {"old_decision": old_decision, "new_status": new_status}, db_path=db_path,
     )
+
+
+def _plan_day(ts: str) -> _dt.date:
+    """XNYS calendar date a plan was made on (``ts`` is UTC ISO)."""
+    t = _dt.datetime.fromisoformat(ts)
+    if t.tzinfo is None:
+        t = t.replace(tzinfo=_dt.timezone.utc)
+    return t.astimezone(market_calendar.ET).date()
+
+
+def _bars_after(bars: dict, day: _dt.date) -> list[dict]:
+    """The sessions strictly after ``day`` as bar dicts (needs ``dates``)."""
+    dates = bars.get("dates")
+    if not dates:
+        return []
+    i = bisect.bisect_right(dates, day.toordinal())
+    opens = bars.get("opens") or bars["closes"]
+    return [{"date": _dt.date.fromordinal(dates[j]), "open": opens[j], "high": bars["highs"][j],
+             "low": bars["lows"][j], "close": bars["closes"][j]} for j in range(i, len(dates))]
+
+
+def _period_covering(day: _dt.date) -> str:
+    for period in ("1y", "2y", "5y"):
+        if bar_store.period_start(period) <= day:
+            return period
+    return "max"
+
+
+def _fill(plan: dict, series: list[dict]) -> tuple[Optional[int], bool]:
+    """``(index of the fill session in series, cancelled)``. A READY_TO_ENTER plan
+    fills on the first session after it was made; a WAIT_FOR_TRIGGER one on the
+    first session whose high reaches the trigger, within the last horizon. It is
+    cancelled when its stop is breached first, or the last horizon passes unfilled."""
+    if plan["decision_status"] != "WAIT_FOR_TRIGGER":
+        return (0 if series else None), False
+    for i, b in enumerate(series[:HORIZONS[-1]]):
+        if b["high"] >= plan["entry_trigger"]:
+            return i, False
+        if b["low"] <= plan["stop"]:
+            return None, True
+    return None, len(series) >= HORIZONS[-1]
+
+
+def track_outcomes(*, session: Optional[_dt.date] = None, db_path: Optional[str] = None,
+                   get_bars_many: Optional[Callable[..., dict]] = None) -> dict:
+    """Score every stored plan whose horizons have elapsed by ``session`` (default:
+    the last completed XNYS session). One bulk bar fetch covers all their
+    tickers; every new outcome row (and the plans it completes) is written in one
+    transaction, and the run is recorded in ``job_runs``.
+
+    Entry is the plan's trigger price and horizons are counted from the fill (see
+    :func:`_fill`): the first session after the plan, or for WAIT_FOR_TRIGGER the
+    session the trigger is reached. Only :data:`SCORED_STATUSES` plans are scored;
+    the rest, plans without a usable entry/stop, triggers that never fill and plans
+    scored at every horizon are flagged done and never scanned again."""
+    started = _dt.datetime.now(_dt.timezone.utc).isoformat()
+    try:
+        session = session or market_calendar.last_completed_session()
+        plans = persistence.pending_outcome_plans(db_path)
+        done_ids: list[int] = []
+        due: list[tuple[dict, _dt.date, list[int]]] = []
+        for p in plans:
+            entry, stop = p["entry_trigger"], p["stop"]
+            if (p["decision_status"] not in SCORED_STATUSES
+                    or entry is None or stop is None or stop >= entry):
+                done_ids.append(p["id"])            # nothing to score
+                continue
+            day = _plan_day(p["ts"])
+            elapsed = market_calendar.sessions_between(day, session)
+            horizons = [h for h in HORIZONS if h <= elapsed and h not in p["done_horizons"]]
+            if horizons:
+                due.append((p, day, horizons))
+
+        bars: dict[str, dict] = {}
+        if due:
+            if get_bars_many is None:
+                from .providers.market_data import get_bars_many
+            tickers = sorted({p["ticker"] for p, _, _ in due})
+            bars = get_bars_many(tickers, period=_period_covering(min(d for _, d, _ in due)))
+
+        outcomes: list[dict] = []
+        for p, day, horizons in due:
+            series = [b for b in _bars_after(bars.get(p["ticker"]) or {}, day) if b["date"] <= session]
+            targets = [t for t in (p["target_1"], p["target_2"], p["target_3"]) if t is not None]
+            scored = set(p["done_horizons"])
+            fill, cancelled = _fill(p, series)
+            if fill is None:
+                if cancelled:                       # never filled: no trade to score
+                    done_ids.append(p["id"])
+                continue
+            for h in horizons:
+                if len(series) < fill + h:          # data lags the calendar: next run
+                    continue
+                window = series[fill:fill + h]
+                out = compute_outcome(p["entry_trigger"], p["stop"], targets, window)
+                scored.add(h)
+                if not out.get("valid"):
+                    continue
+                out.pop("valid")
+                out.update({"plan_id": p["id"], "ticker": p["ticker"], "horizon_session": h,
+                            "as_of": window[-1]["date"].isoformat(), "price": window[-1]["close"],
+                            "setup_type": p["setup_type"], "sector": universe.sector_of(p["ticker"]),
+                            "market_regime": p["market_regime"]})
+                outcomes.append(out)
+            if scored >= set(HORIZONS):
+                done_ids.append(p["id"])
+
+        n = persistence.save_outcomes(outcomes, done_ids, db_path=db_path)
+        summary = {"pending": len(plans), "due": len(due), "outcomes": n, "completed": len(done_ids)}
+        persistence.record_job_run(OUTCOME_JOB, "ok", started,
+                                   ", ".join(f"{k}={v}" for k, v in summary.items()), db_path=db_path)
+        logger.info("outcome tracking: %s", summary)
+        return summary
+    except Exception as e:
+        persistence.record_job_run(OUTCOME_JOB, "error", started, str(e)[:500], db_path=db_path)
+        raise
@@ -0,0 +1,374 @@
+"""
+investing/bar_store.py — local incremental OHLCV store.
+
+Daily bars older than the last completed session never change, so each ticker's
+history is kept on disk and only the missing sessions are downloaded on refresh.
+One file per ticker holds fixed-width little-endian float64 rows
+
+    date ordinal, open, high, low, close, adj close, volume
+
+(appendable, and mappable as an ``(n, 7)`` array — see :meth:`BarStore.memmap`)
+next to a small JSON sidecar recording how far back the history is complete.
+
+Refreshes re-download a short overlap before the last stored session. Upstream
+prices are split-adjusted and ``Adj Close`` is dividend-adjusted after the fact,
+so a mismatch on the overlap means a corporate action happened: the stored
+history is rescaled by the observed ratio instead of being refetched. Only
+completed sessions are persisted; a live intraday bar is returned but not stored.
+An empty or short download never replaces stored history (:class:`EmptyFetch`).
+Streaming indicator state (:mod:`investing.indicator_state`) lives in a third
+sidecar; every refresh creates or advances it, and plans read their ATR / RSI /
+moving averages from it (:meth:`BarStore.indicator_values`).
+"""
+
+from __future__ import annotations
+
+import array
+import bisect
+import datetime as _dt
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from . import config, market_calendar
+from .indicator_state import IndicatorState
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("date", "open", "high", "low", "close", "adj_close", "volume")
+NCOLS = len(COLUMNS)
+_ROW_BYTES = NCOLS * 8
+
+# (date, open, high, low, close, adj_close, volume)
+Row = tuple[_dt.date, float, float, float, float, float, float]
+
+
+@dataclass
+class Bars:
+    dates: list[_dt.date] = field(default_factory=list)
+    open: list[float] = field(default_factory=list)
+    high: list[float] = field(default_factory=list)
+    low: list[float] = field(default_factory=list)
+    close: list[float] = field(default_factory=list)
+    adj_close: list[float] = field(default_factory=list)
+    volume: list[float] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def last(self) -> Optional[_dt.date]:
+        return self.dates[-1] if self.dates else None
+
+    def since(self, start: _dt.date) -> "Bars":
+        i = bisect.bisect_left(self.dates, start)
+        return Bars(self.dates[i:], self.open[i:], self.high[i:], self.low[i:],
+                    self.close[i:], self.adj_close[i:], self.volume[i:])
+
+    def rows(self) -> list[Row]:
+        return list(zip(self.dates, self.open, self.high, self.low,
+                        self.close, self.adj_close, self.volume))
+
+
+_PERIOD_RE = re.compile(r"^(\d+)(d|wk|mo|y)$")
+
+
+def period_start(period: str, today: Optional[_dt.date] = None) -> _dt.date:
+    """First calendar date covered by a yfinance-style period ("5d", "6mo",
+    "1y", "ytd", "max"). ``Nd`` counts sessions, like yfinance."""
+    today = today or _dt.date.today()
+    if period == "max":
+        return _dt.date(1970, 1, 1)
+    if period == "ytd":
+        return _dt.date(today.year, 1, 1)
+    m = _PERIOD_RE.match(period)
+    if not m:
+        raise ValueError(f"unsupported period {period!r}")
+    n, unit = int(m.group(1)), m.group(2)
+    if unit == "d":
+        d = market_calendar.last_completed_session(
+            _dt.datetime.combine(today, _dt.time(23, 59), tzinfo=market_calendar.ET))
+        return market_calendar.add_sessions(d, -max(n - 1, 0))
+    if unit == "wk":
+        return today - _dt.timedelta(weeks=n)
+    months = n * 12 if unit == "y" else n
+    y, mth = divmod(today.year * 12 + today.month - 1 - months, 12)
+    day = min(today.day, 28)
+    return _dt.date(y, mth + 1, day)
+
+
+def _safe_name(ticker: str) -> str:
+    return re.sub(r"[^A-Za-z0-9.\-]", "_", ticker.upper())
+
+
+class EmptyFetch(ValueError):
+    """Upstream returned nothing (or less than is stored) for a refresh —
+    yfinance does that on a 429 or any other failure. The stored history is kept."""
+
+
+class BarStore:
+    def __init__(self, root: Optional[str] = None) -> None:
+        self.root = root or config.BAR_STORE["dir"]
+        self._locks: dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    # ── files ────────────────────────────────────────────────────────────────
+    def path(self, ticker: str) -> str:
+        return os.path.join(self.root, _safe_name(ticker) + ".f8")
+
+    def _meta_path(self, ticker: str) -> str:
+        return os.path.join(self.root, _safe_name(ticker) + ".json")
+
+    def _lock(self, ticker: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(_safe_name(ticker), threading.Lock())
+
+    def _meta(self, ticker: str) -> dict:
+        try:
+            with open(self._meta_path(ticker)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, ticker: str, meta: dict) -> None:
+        tmp = self._meta_path(ticker) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._meta_path(ticker))
+
+    @staticmethod
+    def _pack(rows: list[Row]) -> bytes:
+        arr = array.array("d")
+        for r in rows:
+            arr.extend((float(r[0].toordinal()), *(float(x) for x in r[1:])))
+        if sys.byteorder != "little":
+            arr.byteswap()
+        return arr.tobytes()
+
+    def read(self, ticker: str) -> Optional[Bars]:
+        try:
+            with open(self.path(ticker), "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return None
+        arr = array.array("d")
+        arr.frombytes(raw[:len(raw) - len(raw) % _ROW_BYTES])   # ignore a torn tail
+        if sys.byteorder != "little":
+            arr.byteswap()
+        b = Bars()
+        cols = (b.open, b.high, b.low, b.close, b.adj_close, b.volume)
+        for i in range(0, len(arr), NCOLS):
+            b.dates.append(_dt.date.fromordinal(int(arr[i])))
+            for j, col in enumerate(cols, start=1):
+                col.append(arr[i + j])
+        return b
+
+    def memmap(self, ticker: str):
+        """Read-only ``numpy.memmap`` of shape (n, 7) in :data:`COLUMNS` order."""
+        import numpy as np  # lazy
+        n = os.path.getsize(self.path(ticker)) // _ROW_BYTES
+        return np.memmap(self.path(ticker), dtype="<f8", mode="r", shape=(n, NCOLS))
+
+    def last_session(self, ticker: str) -> Optional[_dt.date]:
+        """Last stored session, read from the file's final row."""
+        try:
+            with open(self.path(ticker), "rb") as f:
+                size = f.seek(0, os.SEEK_END)
+                size -= size % _ROW_BYTES
+                if size < _ROW_BYTES:
+                    return None
+                f.seek(size - _ROW_BYTES)
+                first = array.array("d")
+                first.frombytes(f.read(8))
+        except FileNotFoundError:
+            return None
+        if sys.byteorder != "little":
+            first.byteswap()
+        return _dt.date.fromordinal(int(first[0]))
+
+    def write(self, ticker: str, rows: list[Row], *, complete_from: _dt.date) -> None:
+        """Replace the stored history (atomic)."""
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.path(ticker) + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self._pack(rows))
+        os.replace(tmp, self.path(ticker))
+        self._write_meta(ticker, {"complete_from": complete_from.isoformat(), "rows": len(rows)})
+        try:
+            os.remove(self._state_path(ticker))   # history changed: rebuild on next use
+        except FileNotFoundError:
+            pass
+
+    def append(self, ticker: str, rows: list[Row]) -> None:
+        if not rows:
+            return
+        with open(self.path(ticker), "ab") as f:
+            f.write(self._pack(rows))
+        meta = self._meta(ticker)
+        meta["rows"] = meta.get("rows", 0) + len(rows)
+        self._write_meta(ticker, meta)
+        if os.path.exists(self._state_path(ticker)):
+            self._save_state(ticker, self._advance(self._load_state(ticker), rows))
+
+    # ── streaming indicator state ────────────────────────────────────────────
+    def _state_path(self, ticker: str) -> str:
+        return os.path.join(self.root, _safe_name(ticker) + ".ind.json")
+
+    def _load_state(self, ticker: str) -> IndicatorState:
+        try:
+            with open(self._state_path(ticker)) as f:
+                return IndicatorState.from_state(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return IndicatorState()
+
+    def _save_state(self, ticker: str, st: IndicatorState) -> None:
+        tmp = self._state_path(ticker) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(st.state(), f)
+        os.replace(tmp, self._state_path(ticker))
+
+    @staticmethod
+    def _advance(st: IndicatorState, rows: list[Row]) -> IndicatorState:
+        for d, _o, h, lo, c, _a, v in rows:
+            st.update(d, h, lo, c, v)
+        return st
+
+    def indicators(self, ticker: str) -> IndicatorState:
+        """Streaming indicator state over the stored completed sessions, kept in
+        a sidecar and advanced only by the sessions it has not seen yet. A
+        rewrite of the history (re-adjustment, backfill) discards it."""
+        with self._lock(ticker):
+            return self._sync_state(ticker)
+
+    def _sync_state(self, ticker: str) -> IndicatorState:
+        st = self._load_state(ticker)
+        last = self.last_session(ticker)
+        if last is None or st.last_date == last:
+            return st
+        stored = self.read(ticker)
+        if st.last_date is not None and st.last_date not in set(stored.dates):
+            st = IndicatorState()
+        self._advance(st, stored.since(st.last_date + _dt.timedelta(days=1)).rows()
+                      if st.last_date else stored.rows())
+        self._save_state(ticker, st)
+        return st
+
+    def indicator_values(self, ticker: str, bars: "Bars") -> Optional[dict]:
+        """:meth:`IndicatorState.values` as of ``bars``' last row — the stored
+        state, or the state plus the one live bar :meth:`history` appends — or
+        None when the state does not line up with ``bars``."""
+        st = self.indicators(ticker)
+        if st.last_date is None or not len(bars):
+            return None
+        if bars.last == st.last_date:
+            return st.values()
+        if len(bars) >= 2 and bars.dates[-2] == st.last_date:
+            return st.peek(bars.high[-1], bars.low[-1], bars.close[-1], bars.volume[-1], bars.last)
+        return None
+
+    # ── refresh ──────────────────────────────────────────────────────────────
+    def plan(self, ticker: str, start: _dt.date,
+             now_utc: Optional[_dt.datetime] = None) -> Optional[_dt.date]:
+        """Date to download from so the store covers ``start`` .. now, or None when
+        it is already current. Always re-fetches during a session (live bar)."""
+        last = self.last_session(ticker)
+        complete_from = self._meta(ticker).get("complete_from")
+        if last is None or complete_from is None or _dt.date.fromisoformat(complete_from) > start:
+            return start
+        if last >= market_calendar.last_completed_session(now_utc) and not market_calendar.in_session(now_utc):
+            return None
+        return last - _dt.timedelta(days=config.BAR_STORE["overlap_days"])
+
+    def ingest(self, ticker: str, rows: list[Row], *, fetched_from: _dt.date,
+               now_utc: Optional[_dt.datetime] = None) -> list[Row]:
+        """Merge freshly downloaded ``rows`` (starting at ``fetched_from``) into the
+        store. Returns the live rows newer than the last completed session, which
+        are not persisted."""
+        rows = sorted(rows, key=lambda r: r[0])
+        cutoff = market_calendar.last_completed_session(now_utc)
+        done = [r for r in rows if r[0] <= cutoff]
+        live = [r for r in rows if r[0] > cutoff]
+        stored = self.read(ticker)
+        if not rows:
+            raise EmptyFetch(f"{ticker}: empty refresh from {fetched_from}")
+        complete_from = self._meta(ticker).get("complete_from")
+        if stored is None or not len(stored) or complete_from is None \
+                or fetched_from <= _dt.date.fromisoformat(complete_from):
+            self._check_covers(ticker, stored, done, fetched_from)
+            self.write(ticker, done, complete_from=fetched_from)
+            return live
+
+        by_date = {r[0]: r for r in done}
+        overlap = [d for d in stored.dates if d in by_date]
+        if not overlap:
+            raise ValueError(f"{ticker}: refresh does not overlap stored bars")
+        anchor = overlap[-1]
+        i = stored.dates.index(anchor)
+        new = by_date[anchor]
+        px_ratio = new[4] / stored.close[i] if stored.close[i] else 1.0
+        adj_ratio = new[5] / stored.adj_close[i] if stored.adj_close[i] else 1.0
+        fresh = [r for r in done if r[0] > stored.last]
+        tol = config.BAR_STORE["adjust_tolerance"]
+        if abs(px_ratio - 1) <= tol and abs(adj_ratio - 1) <= tol:
+            self.append(ticker, fresh)
+            return live
+
+        # split (prices and volume) and/or dividend (adj close) since last refresh
+        logger.info("bar store: re-adjusting %s history (price x%.6f, adj x%.6f)",
+                    ticker, px_ratio, adj_ratio)
+        head = [(d, o * px_ratio, h * px_ratio, lo * px_ratio, c * px_ratio, a * adj_ratio,
+                 v / px_ratio if px_ratio else v)
+                for d, o, h, lo, c, a, v in stored.rows() if d < fetched_from]
+        tail = [r for r in done if r[0] >= fetched_from]
+        self._check_covers(ticker, stored, tail, fetched_from)
+        self.write(ticker, head + tail, complete_from=_dt.date.fromisoformat(complete_from))
+        return live
+
+    @staticmethod
+    def _check_covers(ticker: str, stored: Optional[Bars], rows: list[Row], since: _dt.date) -> None:
+        """A rewrite from ``since`` must not leave fewer sessions than are stored."""
+        if stored is not None and len(rows) < len(stored.since(since)):
+            raise EmptyFetch(f"{ticker}: refresh from {since} returned {len(rows)} sessions, "
+                             f"{len(stored.since(since))} stored")
+
+    def history(self, ticker: str, start: _dt.date, fetch: Callable[[_dt.date], list[Row]],
+                *, now_utc: Optional[_dt.datetime] = None) -> Bars:
+        """Bars from ``start`` on, downloading only what the store is missing.
+        ``fetch(since)`` returns the upstream rows from ``since`` to today."""
+        with self._lock(ticker):
+            since = self.plan(ticker, start, now_utc)
+            live: list[Row] = []
+            if since is not None:
+                try:
+                    live = self.ingest(ticker, fetch(since), fetched_from=since, now_utc=now_utc)
+                except EmptyFetch:
+                    raise                   # upstream failure: not a reason to refetch everything
+                except ValueError:
+                    # no overlap to adjust against (long gap, renamed ticker): rebuild
+                    full = min(start, _dt.date.fromisoformat(
+                        self._meta(ticker).get("complete_from", start.isoformat())))
+                    live = self.ingest(ticker, fetch(full), fetched_from=full, now_utc=now_utc)
+                self._sync_state(ticker)
+            bars = self.read(ticker) or Bars()
+        out = bars.since(start)
+        for r in live:
+            if out.last is None or r[0] > out.last:
+                for col, v in zip((out.dates, out.open, out.high, out.low,
+                                   out.close, out.adj_close, out.volume), r):
+                    col.append(v)
+        return out
+
+
+_STORE: Optional[BarStore] = None
+
+
+def store() -> BarStore:
+    global _STORE
+    if _STORE is None:
+        _STORE = BarStore()
+    return _STORE
@@ -0,0 +1,295 @@
+"""
+investing/cache.py — the gateway's two cache tiers.
+
+L1 (:class:`MemoryCache`) is an in-process LRU bounded by an approximate byte
+budget and an entry cap; expired entries are purged proactively instead of
+lingering until their key is requested again. L2 (:class:`SQLiteCache`) backs it
+with its own SQLite ``gateway_cache`` table so a restart, a deploy or a side
+process (backfill, backtest CLI) reuses data we already fetched instead of
+refetching the universe.
+
+Values are stored in a compact binary envelope: homogeneous numeric lists (the
+OHLCV arrays of a bar set) are packed as float64 or int64 arrays, keeping their
+type, everything else rides along as JSON with datetimes tagged, and the whole
+thing is zlib-compressed. Expired rows are
+removed by a background sweeper through the ``expires_at`` index.
+"""
+
+from __future__ import annotations
+
+import array
+import datetime as _dt
+import json
+import logging
+import struct
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Optional
+
+from . import config, persistence
+
+logger = logging.getLogger(__name__)
+
+_VERSION = 2                             # v2: per-array typecode ("d" float64 / "q" int64)
+_TAG_JSON = b"J"
+_TAG_ARRAYS = b"A"
+_HEADER = struct.Struct("<BcI")          # version, tag, header length
+
+
+# ── codec ─────────────────────────────────────────────────────────────────────
+def _tag(obj: Any) -> Any:
+    if isinstance(obj, _dt.datetime):
+        return {"__dt__": obj.isoformat()}
+    if isinstance(obj, _dt.date):
+        return {"__d__": obj.isoformat()}
+    raise TypeError(f"not cacheable: {type(obj).__name__}")
+
+
+def _untag(obj: dict) -> Any:
+    if "__dt__" in obj:
+        return _dt.datetime.fromisoformat(obj["__dt__"])
+    if "__d__" in obj:
+        return _dt.date.fromisoformat(obj["__d__"])
+    return obj
+
+
+def _typecode(v: Any) -> Optional[str]:
+    """``"d"`` for a list of floats, ``"q"`` for a list of ints that fit int64,
+    None for anything else (mixed lists stay JSON so no element changes type)."""
+    if not isinstance(v, list) or not v:
+        return None
+    if all(type(x) is float for x in v):
+        return "d"
+    if all(type(x) is int and -2 ** 63 <= x < 2 ** 63 for x in v):
+        return "q"
+    return None
+
+
+def encode(value: Any) -> bytes:
+    """Serialize a gateway value. Raises TypeError for values that are not
+    cacheable (the gateway then simply keeps them in L1 only)."""
+    codes = {k: _typecode(v) for k, v in value.items()} if isinstance(value, dict) else {}
+    names = [k for k, code in codes.items() if code]
+    if names:
+        meta = {k: v for k, v in value.items() if k not in names}
+        header = json.dumps({"meta": meta, "arrays": [[k, len(value[k]), codes[k]] for k in names]},
+                            default=_tag, separators=(",", ":")).encode()
+        chunks = []
+        for k in names:
+            arr = array.array(codes[k], value[k])
+            if sys.byteorder != "little":
+                arr.byteswap()
+            chunks.append(arr.tobytes())
+        body = _HEADER.pack(_VERSION, _TAG_ARRAYS, len(header)) + header + b"".join(chunks)
+    else:
+        header = json.dumps(value, default=_tag, separators=(",", ":")).encode()
+        body = _HEADER.pack(_VERSION, _TAG_JSON, len(header)) + header
+    return zlib.compress(body, 6)
+
+
+def decode(blob: bytes) -> Any:
+    raw = zlib.decompress(blob)
+    version, tag, hlen = _HEADER.unpack_from(raw)
+    if version not in (1, _VERSION):
+        raise ValueError(f"unsupported cache encoding v{version}")
+    start = _HEADER.size
+    header = json.loads(raw[start:start + hlen], object_hook=_untag)
+    if tag == _TAG_JSON:
+        return header
+    out = dict(header["meta"])
+    pos = start + hlen
+    for name, n, *code in header["arrays"]:           # v1 arrays are all float64
+        arr = array.array(code[0] if code else "d")
+        arr.frombytes(raw[pos:pos + n * arr.itemsize])
+        if sys.byteorder != "little":
+            arr.byteswap()
+        out[name] = arr.tolist()
+        pos += n * arr.itemsize
+    return out
+
+
+# ── L1 tier ───────────────────────────────────────────────────────────────────
+_FLOAT_SIZE = sys.getsizeof(0.0)
+
+
+def approx_size(obj: Any, _depth: int = 0) -> int:
+    """Approximate retained size in bytes. Homogeneous numeric lists (bar arrays)
+    are costed from their first element instead of walked item by item."""
+    size = sys.getsizeof(obj)
+    if _depth > 4:
+        return size
+    if isinstance(obj, dict):
+        size += sum(approx_size(k, _depth + 1) + approx_size(v, _depth + 1) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)) and obj:
+        first = next(iter(obj))
+        if isinstance(first, (int, float)) and not isinstance(first, bool):
+            size += len(obj) * _FLOAT_SIZE
+        else:
+            size += sum(approx_size(v, _depth + 1) for v in obj)
+    return size
+
+
+class MemoryCache:
+    """LRU keyed by cache key. Entries must expose ``value`` and ``max_until``
+    (monotonic seconds after which they are unusable)."""
+
+    def __init__(self, max_bytes: Optional[int] = None, max_entries: Optional[int] = None,
+                 *, purge_interval: Optional[float] = None) -> None:
+        self.max_bytes = max_bytes if max_bytes is not None else int(config.GATEWAY["cache_max_mb"] * 1024 * 1024)
+        self.max_entries = max_entries if max_entries is not None else config.GATEWAY["cache_max_entries"]
+        self.purge_interval = (purge_interval if purge_interval is not None
+                               else config.GATEWAY["cache_purge_interval"])
+        self._data: OrderedDict[str, Any] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        self._bytes = 0
+        self._last_purge = time.monotonic()
+        self._counters = {"evictions_lru": 0, "evictions_expired": 0}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: Any) -> None:
+        size = approx_size(entry.value)
+        with self._lock:
+            self._drop(key)
+            if size > self.max_bytes:
+                return                      # would evict everything else; don't keep it
+            self._data[key] = entry
+            self._sizes[key] = size
+            self._bytes += size
+            now = time.monotonic()
+            if now - self._last_purge >= self.purge_interval:
+                self._purge_expired(now)
+            while self._data and (self._bytes > self.max_bytes or len(self._data) > self.max_entries):
+                oldest = next(iter(self._data))
+                self._drop(oldest)
+                self._counters["evictions_lru"] += 1
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._purge_expired(time.monotonic())
+
+    def _purge_expired(self, now: float) -> int:
+        dead = [k for k, e in self._data.items() if e.max_until <= now]
+        for k in dead:
+            self._drop(k)
+        self._counters["evictions_expired"] += len(dead)
+        self._last_purge = now
+        return len(dead)
+
+    def _drop(self, key: str) -> None:
+        if self._data.pop(key, None) is not None:
+            self._bytes -= self._sizes.pop(key, 0)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._data), "bytes": self._bytes,
+                    "max_bytes": self.max_bytes, **self._counters}
+
+
+# ── L2 tier ───────────────────────────────────────────────────────────────────
+class L2Entry:
+    __slots__ = ("value", "fetched_at", "fresh_until", "expires_at")
+
+    def __init__(self, value: Any, fetched_at: _dt.datetime, fresh_until: float, expires_at: float) -> None:
+        self.value = value
+        self.fetched_at = fetched_at
+        self.fresh_until = fresh_until       # unix epoch
+        self.expires_at = expires_at         # unix epoch
+
+
+class SQLiteCache:
+    """``gateway_cache``-backed cache tier. Never raises into the caller: a broken or
+    locked database only shows up as misses / errors in :meth:`stats`."""
+
+    def __init__(self, db_path: Optional[str] = None, *,
+                 sweep_interval: Optional[float] = None) -> None:
+        self.db_path = db_path
+        self.sweep_interval = (sweep_interval if sweep_interval is not None
+                               else config.GATEWAY["l2_sweep_interval"])
+        self._counters = {"hits": 0, "misses": 0, "writes": 0, "errors": 0, "swept": 0}
+        self._lock = threading.Lock()
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += n
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def get(self, key: str) -> Optional[L2Entry]:
+        try:
+            row = persistence.cache_get_entry(key, db_path=self.db_path)
+            if row is None or row["expires_at"] is None or row["expires_at"] <= time.time():
+                self._incr("misses")
+                return None
+            entry = L2Entry(decode(row["value"]), _dt.datetime.fromisoformat(row["fetched_at"]),
+                            row["fresh_until"] or 0.0, row["expires_at"])
+        except Exception as e:               # noqa: BLE001 — cache must never break a fetch
+            logger.debug("L2 cache read failed for %s: %s", key, e)
+            self._incr("errors")
+            return None
+        self._incr("hits")
+        return entry
+
+    def put(self, key: str, value: Any, *, source: str, fetched_at: _dt.datetime,
+            fresh_for: float, max_age: float) -> bool:
+        if max_age <= 0:
+            return False
+        try:
+            blob = encode(value)
+        except (TypeError, ValueError):
+            return False                     # not cacheable cross-process; L1 only
+        now = time.time()
+        try:
+            persistence.cache_put_entry(key, blob, source=source, fetched_at=fetched_at.isoformat(),
+                                        fresh_until=now + fresh_for, expires_at=now + max_age,
+                                        db_path=self.db_path)
+        except Exception as e:               # noqa: BLE001
+            logger.debug("L2 cache write failed for %s: %s", key, e)
+            self._incr("errors")
+            return False
+        self._incr("writes")
+        return True
+
+    def sweep(self) -> int:
+        """Delete expired rows (uses the ``expires_at`` index)."""
+        try:
+            n = persistence.cache_sweep(time.time(), db_path=self.db_path)
+        except Exception as e:               # noqa: BLE001
+            logger.debug("L2 cache sweep failed: %s", e)
+            self._incr("errors")
+            return 0
+        self._incr("swept", n)
+        return n
+
+    def start_sweeper(self) -> None:
+        if self._sweeper is not None or self.sweep_interval <= 0:
+            return
+
+        def _loop() -> None:
+            while not self._stop.wait(self.sweep_interval):
+                self.sweep()
+
+        self._sweeper = threading.Thread(target=_loop, name="gw-l2-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        self._stop.set()
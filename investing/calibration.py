@@ -0,0 +1,120 @@
+"""
+investing/calibration.py — parameter sweeps over the historical replay.
+
+``config`` marks thresholds like ``MAX_CHASE_ATR`` or ``RR_MIN_BY_REGIME`` as
+calibratable; this is how. A setting is a dict of config overrides (a dotted
+name such as ``"RR_MIN_BY_REGIME.BULL"`` overrides one entry of a dict
+setting); :func:`grid` and :func:`random_settings` build them from a search
+space, and :func:`sweep` replays every setting over the same history and
+reports expectancy and hit rate per setting.
+
+Most of a replay step is the feature bundle (indicators, base stats, RS), and
+none of it reads a threshold. The pool is therefore split by ticker, not by
+setting: each worker computes a ticker's features once, lazily per session,
+and then runs classify / decide / scoring for every setting against that cache.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import copy
+import datetime as _dt
+import itertools
+import logging
+import random
+import time
+from typing import Iterator, Optional, Sequence
+
+from . import config, historical_backtest as hb
+
+logger = logging.getLogger(__name__)
+
+
+def grid(space: Optional[dict[str, Sequence]] = None) -> list[dict]:
+    """Every combination of the values in ``space`` (``{name: [values]}``;
+    default ``config.CALIBRATION_SPACE``)."""
+    space = space if space is not None else config.CALIBRATION_SPACE
+    names = sorted(space)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(space[n] for n in names))]
+
+
+def random_settings(space: Optional[dict[str, Sequence]], n: int, *, seed: int = 0) -> list[dict]:
+    """``n`` distinct settings drawn from the grid of ``space`` (all of it when smaller)."""
+    full = grid(space)
+    return random.Random(seed).sample(full, min(n, len(full)))
+
+
+def _split(name: str) -> tuple[str, Optional[str]]:
+    attr, _, key = name.partition(".")
+    if not attr.isupper() or not hasattr(config, attr):
+        raise ValueError(f"unknown config setting: {name}")
+    if key and not isinstance(getattr(config, attr), dict):
+        raise ValueError(f"{attr} is not a dict setting")
+    return attr, key or None
+
+
+@contextlib.contextmanager
+def overrides(setting: dict) -> Iterator[None]:
+    """Apply ``setting`` to :mod:`investing.config` for the duration of the block.
+    Only for a replay worker: it changes the module for the whole process."""
+    saved: dict[str, object] = {}
+    try:
+        for name, value in setting.items():
+            attr, key = _split(name)
+            if attr not in saved:
+                saved[attr] = getattr(config, attr)
+                if key:
+                    setattr(config, attr, copy.copy(saved[attr]))
+            if key:
+                getattr(config, attr)[key] = value
+            else:
+                setattr(config, attr, value)
+        yield
+    finally:
+        for attr, value in saved.items():
+            setattr(config, attr, value)
+
+
+def _sweep_ticker(task: tuple) -> list[list[dict]]:
+    """Trades for each setting on one ticker, features computed once."""
+    job, settings = task
+    s = hb.load_series(job)
+    if s is None:
+        return [[] for _ in settings]
+    cache: dict[int, Optional[dict]] = {}
+
+    def features(i: int) -> Optional[dict]:
+        if i not in cache:
+            cache[i] = hb.features_at(job, s, i)
+        return cache[i]
+
+    out = []
+    for setting in settings:
+        with overrides(setting):
+            out.append(hb.simulate(job, s, features))
+    return out
+
+
+def sweep(settings: Sequence[dict], tickers: Optional[Sequence[str]] = None, *,
+          start: Optional[_dt.date] = None, end: Optional[_dt.date] = None,
+          horizon: Optional[int] = None, workers: Optional[int] = None,
+          root: Optional[str] = None, fetch: bool = False) -> list[dict]:
+    """Replay every setting over the same history (arguments as
+    :func:`historical_backtest.run`). One row per setting, best expectancy
+    first: the setting, :func:`historical_backtest.summarize` of its trades
+    and the same per setup type under ``by_setup``."""
+    for setting in settings:                   # fail before any work is spawned
+        for name in setting:
+            _split(name)
+    t0 = time.monotonic()
+    todo = hb.prepare(tickers, start=start, end=end, horizon=horizon, root=root, fetch=fetch)
+    trades: list[list[dict]] = [[] for _ in settings]
+    for per_setting in hb.map_jobs(_sweep_ticker, [(job, list(settings)) for job in todo], workers):
+        for k, rows in enumerate(per_setting):
+            trades[k].extend(rows)
+    rows = [{"setting": dict(setting), **hb.summarize(t), "by_setup": hb.expectancy_table(t)}
+            for setting, t in zip(settings, trades)]
+    rows.sort(key=lambda r: (r["avg_r"] is not None, r["avg_r"] or 0.0), reverse=True)
+    logger.info("calibration sweep: %d settings x %d tickers in %.1fs",
+                len(settings), len(todo), time.monotonic() - t0)
+    return rows
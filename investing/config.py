@@ -36,6 +36,9 @@ CLAUDE_MODEL_FAST: str = _env("CLAUDE_MODEL_FAST", "claude-haiku-4-5-20251001")
 LLM_MAX_TOKENS: int = int(_env("INVEST_LLM_MAX_TOKENS", "2000"))
 # One repair retry on schema failure (P0.2). 1 == a single corrective attempt.
 LLM_SCHEMA_REPAIR_RETRIES: int = int(_env("INVEST_LLM_REPAIR_RETRIES", "1"))
+# The enrichment runs alongside the deterministic pipeline; a plan waits this
+# many seconds for it and then proceeds without it.
+LLM_TIMEOUT: float = float(_env("INVEST_LLM_TIMEOUT", "45"))
 
 
 # ── Strategy / horizon ─────────────────────────────────────────────────────────
@@ -136,6 +139,50 @@ GATEWAY = {
     # circuit breaker: open after N consecutive failures, stay open for cooldown s.
     "cb_threshold": int(_env("INVEST_GW_CB_THRESHOLD", "5")),
     "cb_cooldown": float(_env("INVEST_GW_CB_COOLDOWN", "60")),
+    # stale-while-revalidate: serve cache entries aged between TTL `fresh` and
+    # `max` immediately (DataPoint status STALE) and refresh them in background.
+    "stale_while_revalidate": _env("INVEST_GW_SWR", "1") == "1",
+    # persistent L2 cache in SQLite gateway_cache (survives restarts, shared with
+    # side processes); expired rows are swept every `l2_sweep_interval` s.
+    "l2_cache": _env("INVEST_GW_L2", "1") == "1",
+    "l2_sweep_interval": float(_env("INVEST_GW_L2_SWEEP", "600")),
+    # in-memory L1: LRU bounded by an approximate byte budget and an entry cap;
+    # expired entries are purged at most every `cache_purge_interval` s.
+    "cache_max_mb": float(_env("INVEST_GW_CACHE_MB", "64")),
+    "cache_max_entries": int(_env("INVEST_GW_CACHE_ENTRIES", "5000")),
+    "cache_purge_interval": float(_env("INVEST_GW_CACHE_PURGE", "60")),
+    # max seconds a fetch queues for a rate-limit token before degrading.
+    "rate_wait": float(_env("INVEST_GW_RATE_WAIT", "30")),
+    # bulk loads (Gateway.fetch_many): ids per upstream call and the timeout of
+    # one such call (a 50-ticker download takes far longer than one quote).
+    "batch_chunk": int(_env("INVEST_GW_BATCH_CHUNK", "50")),
+    "batch_timeout": float(_env("INVEST_GW_BATCH_TIMEOUT", "60")),
+    # worker-pool size for sources not listed in BULKHEAD_WORKERS.
+    "bulkhead_default": int(_env("INVEST_GW_BULKHEAD_DEFAULT", "2")),
+    # fan-out of a plan's independent fetches (Gateway.gather): shared worker
+    # pool and the per-plan deadline after which missing inputs are degraded.
+    "fanout_workers": int(_env("INVEST_GW_FANOUT_WORKERS", "16")),
+    "plan_deadline": float(_env("INVEST_GW_PLAN_DEADLINE", "25")),
+}
+
+# Per-source worker pools (bulkheads). A hung source can only exhaust its own
+# pool; once all of its workers are stuck on timed-out calls, new work for it is
+# refused (degraded mode) while other sources keep flowing.
+BULKHEAD_WORKERS = {
+    "yfinance": int(_env("INVEST_BH_YF", "6")),
+    "FRED": int(_env("INVEST_BH_FRED", "2")),
+    "Tavily": int(_env("INVEST_BH_TAVILY", "2")),
+}
+
+# Per-source token-bucket budgets: sustained calls per minute + burst capacity.
+# Sources not listed fall back to the call site's `rate_limit` (per minute).
+RATE_LIMITS = {
+    "yfinance": {"per_minute": int(_env("INVEST_RL_YF_PER_MIN", "120")),
+                 "burst": int(_env("INVEST_RL_YF_BURST", "20"))},
+    "FRED":     {"per_minute": int(_env("INVEST_RL_FRED_PER_MIN", "60")),
+                 "burst": int(_env("INVEST_RL_FRED_BURST", "10"))},
+    "Tavily":   {"per_minute": int(_env("INVEST_RL_TAVILY_PER_MIN", "30")),
+                 "burst": int(_env("INVEST_RL_TAVILY_BURST", "5"))},
 }
 
 
@@ -144,11 +191,82 @@ MAX_CONCURRENT_ANALYSES: int = int(_env("INVEST_MAX_CONCURRENCY", "3"))
 MAX_TICKERS_PER_MESSAGE: int = 3
 
 
+# ── Market context ──────────────────────────────────────────────────────────────
+# The market-wide regime (macro inputs + health normalization) is rebuilt at most
+# this often (seconds) and shared by every plan; only the sector notes are per plan.
+MARKET_CONTEXT_TTL: float = float(_env("INVEST_MARKET_CONTEXT_TTL", "900"))
+# A degraded regime (UNKNOWN, or built with some inputs missing) is only kept this
+# long, so a transient provider outage does not pin every plan to it for the full TTL.
+MARKET_CONTEXT_DEGRADED_TTL: float = float(_env("INVEST_MARKET_CONTEXT_DEGRADED_TTL", "60"))
+
+
 # ── Market calendar ─────────────────────────────────────────────────────────────
 # Pre-open brief fires this many minutes before the XNYS regular open.
 PRE_OPEN_BRIEF_LEAD_MIN: int = int(_env("INVEST_BRIEF_LEAD_MIN", "45"))
 
 
+# ── Local OHLCV store ────────────────────────────────────────────────────────────
+# Daily bars are kept on disk per ticker and only the missing sessions are
+# downloaded on refresh (see investing/bar_store.py).
+BAR_STORE = {
+    "enabled": _env("INVEST_BAR_STORE", "1") == "1",
+    "dir": _env(
+        "INVEST_BAR_STORE_DIR",
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "bars"),
+    ),
+    # sessions re-downloaded before the last stored one; a price mismatch on
+    # the overlap means a split/dividend re-adjusted history upstream.
+    "overlap_days": int(_env("INVEST_BAR_STORE_OVERLAP", "10")),
+    # relative close mismatch on the overlap that triggers re-adjustment
+    "adjust_tolerance": float(_env("INVEST_BAR_STORE_ADJ_TOL", "0.0005")),
+}
+
+
+# Bar requests for periods up to this one are windows over a single cached
+# series per ticker (a 6mo or 5d request after a 1y one needs no download).
+BARS_CANONICAL_PERIOD: str = _env("INVEST_BARS_PERIOD", "1y")
+
+
+# Return-correlation / beta matrix for the universe + open positions, rebuilt
+# nightly from the bar store (see investing/correlation_matrix.py).
+CORRELATION_MATRIX = {
+    "path": _env(
+        "INVEST_CORR_MATRIX_PATH",
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "correlations.npz"),
+    ),
+    # daily returns per pair (the trailing ~6 months)
+    "window": int(_env("INVEST_CORR_WINDOW", "126")),
+}
+
+# The session's cross-sectional RS rank table (investing/rs_rank.py) is built by
+# the nightly job, or in the background when a plan finds it missing; plans never
+# wait for it. After a failed build, wait this long (seconds) before the next.
+RS_RANK_RETRY: float = float(_env("INVEST_RS_RANK_RETRY", "300"))
+
+
+# Offline replay of the decision core over the stored history, for validating
+# the thresholds above (see investing/historical_backtest.py).
+HISTORICAL_BACKTEST = {
+    # history pulled into the bar store before a run
+    "period": _env("INVEST_BT_PERIOD", "5y"),
+    # sessions each simulated entry is held and scored over
+    "horizon": int(_env("INVEST_BT_HORIZON", "20")),
+    # trailing sessions handed to build_features at each step (MA200 + base)
+    "lookback": int(_env("INVEST_BT_LOOKBACK", "260")),
+    # worker processes; 0 = one per CPU
+    "workers": int(_env("INVEST_BT_WORKERS", "0")),
+}
+
+# Default search space for calibration sweeps (investing/calibration.py); a
+# dotted name overrides one entry of a dict setting.
+CALIBRATION_SPACE = {
+    "MAX_CHASE_ATR": [0.5, 0.75, 1.0, 1.25],
+    "MAX_BELOW_PIVOT_ATR": [1.0, 1.5, 2.0, 3.0],
+    "MAX_BREAKOUT_BASE_DEPTH_PCT": [15.0, 22.0, 30.0],
+    "RR_MIN_BY_REGIME.BULL": [1.5, 2.0, 2.5],
+}
+
+
 # ── Database ─────────────────────────────────────────────────────────────────────
 DB_PATH: str = _env(
     "INVEST_DB_PATH",
@@ -156,6 +274,15 @@ DB_PATH: str = _env(
 )
 
 
+# Write-behind for append-only logs (signals, data-quality events, outcomes):
+# rows per transaction and how long the writer waits to fill a batch (s).
+PERSIST_WRITE_BEHIND = {
+    "enabled": _env("INVEST_WRITE_BEHIND", "1") == "1",
+    "max_batch": int(_env("INVEST_WRITE_BEHIND_BATCH", "200")),
+    "linger": float(_env("INVEST_WRITE_BEHIND_LINGER", "0.2")),
+}
+
+
 # ── Version stamps (recorded with every recommendation) ───────────────────────
 CONFIG_VERSION = "2.0.0"
 
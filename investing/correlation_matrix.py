@@ -0,0 +1,184 @@
+"""
+investing/correlation_matrix.py — nightly return-correlation and beta matrix.
+
+:func:`portfolio.correlation` compares two close series on demand, but nothing
+fetched the open positions' history during a plan, so ``correlations`` reached
+:func:`portfolio.evaluate_new_position` empty and the correlation warning never
+fired. Here the pairwise correlation of daily returns (last
+``CORRELATION_MATRIX["window"]`` sessions) and each ticker's beta vs the broad
+benchmark are computed once per night for the universe plus every open
+position, from the local bar store, in one vectorized pass.
+
+Stored compactly as ``.npz``: correlations as int16 thousandths (exactly the
+3-decimal rounding :func:`portfolio.correlation` returns), betas as float32.
+A lookup is a dict index plus an array read — O(1) per pair.
+"""
+
+from __future__ import annotations
+
+import datetime as _dt
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+from . import config, indicators_np as vnp
+from . import market_calendar, persistence, rs_rank, universe
+
+logger = logging.getLogger(__name__)
+
+_MISSING = np.iinfo(np.int16).min          # int16 sentinel for "no correlation"
+_MIN_RETURNS = 20                          # same floor as portfolio.correlation
+
+
+def compute(closes: dict[str, Sequence[float]], broad_closes: Sequence[float],
+            window: int = 126) -> tuple[list[str], np.ndarray, np.ndarray]:
+    """(tickers, correlation matrix, betas) over the trailing ``window`` daily
+    returns. Pairs are compared over their common tail, as
+    :func:`portfolio.correlation` does; fewer than 20 returns -> NaN."""
+    tickers = list(closes)
+    if not tickers:
+        return [], np.empty((0, 0)), np.empty(0)
+    rows = [closes[t] for t in tickers] + [broad_closes]
+    r = vnp.daily_returns(vnp.stack(rows)[:, -window - 1:])
+    m = (~np.isnan(r)).astype(float)
+    x = np.where(m > 0, r, 0.0)
+
+    # pairwise-complete sums via matrix products: entry (i, j) only counts the
+    # sessions where both i and j have a return.
+    n = m @ m.T
+    sx = x @ m.T                       # sum of x_i where j is present
+    sxx = (x * x) @ m.T
+    sxy = x @ x.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sx.T / n
+        vx = sxx - sx * sx / n
+        vy = vx.T
+        corr = cov / np.sqrt(vx * vy)
+        beta = cov[:-1, -1] / vy[:-1, -1]
+    ok = (n >= _MIN_RETURNS) & (vx > 0) & (vy > 0)
+    corr = np.where(ok, np.clip(corr, -1.0, 1.0), np.nan)
+    beta = np.where(ok[:-1, -1], beta, np.nan)
+    return tickers, corr[:-1, :-1], beta
+
+
+@dataclass
+class CorrelationMatrix:
+    session: _dt.date
+    window: int
+    tickers: list[str]
+    corr: np.ndarray                  # int16 thousandths, _MISSING for none
+    beta: np.ndarray                  # float32, NaN for none
+    index: dict[str, int] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.index = {t: i for i, t in enumerate(self.tickers)}
+
+    @classmethod
+    def from_arrays(cls, session: _dt.date, window: int, tickers: list[str],
+                    corr: np.ndarray, beta: np.ndarray) -> "CorrelationMatrix":
+        packed = np.where(np.isnan(corr), _MISSING, np.round(np.nan_to_num(corr) * 1000))
+        return cls(session, window, list(tickers), packed.astype(np.int16), beta.astype(np.float32))
+
+    def get(self, a: str, b: str) -> Optional[float]:
+        i, j = self.index.get(a), self.index.get(b)
+        if i is None or j is None:
+            return None
+        v = int(self.corr[i, j])
+        return None if v == _MISSING else v / 1000
+
+    def beta_of(self, ticker: str) -> Optional[float]:
+        i = self.index.get(ticker)
+        if i is None or np.isnan(self.beta[i]):
+            return None
+        return round(float(self.beta[i]), 3)
+
+    def correlations_for(self, ticker: str, others: Iterable[str]) -> dict[str, float]:
+        """``{other: corr}`` for every other ticker with a value; the shape
+        :func:`portfolio.evaluate_new_position` takes."""
+        out = {}
+        for o in others:
+            if o == ticker:
+                continue
+            c = self.get(ticker, o)
+            if c is not None:
+                out[o] = c
+        return out
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, tickers=np.array(self.tickers, dtype=str), corr=self.corr,
+                                beta=self.beta, session=np.array(self.session.isoformat()),
+                                window=np.array(self.window))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "CorrelationMatrix":
+        with np.load(path, allow_pickle=False) as z:
+            return cls(_dt.date.fromisoformat(str(z["session"])), int(z["window"]),
+                       [str(t) for t in z["tickers"]], z["corr"], z["beta"])
+
+
+def matrix_tickers() -> list[str]:
+    """The universe plus every open position."""
+    try:
+        held = {p["ticker"] for p in persistence.list_open_positions() if p.get("ticker")}
+    except Exception as e:                     # noqa: BLE001
+        logger.warning("correlation matrix: open positions unavailable: %s", e)
+        held = set()
+    return sorted(set(rs_rank.universe_tickers()) | held)
+
+
+def build(session: Optional[_dt.date] = None, tickers: Optional[list[str]] = None) -> CorrelationMatrix:
+    """Read the bars in bulk (bar store) and compute the matrix."""
+    from .providers import market_data
+
+    session = session or market_calendar.last_completed_session()
+    window = config.CORRELATION_MATRIX["window"]
+    tickers = tickers if tickers is not None else matrix_tickers()
+    bars = market_data.get_bars_many(sorted(set(tickers) | {universe.BROAD_BENCHMARK}), period="1y")
+    closes = {t: bars[t]["closes"] for t in tickers if bars.get(t, {}).get("closes")}
+    broad = bars.get(universe.BROAD_BENCHMARK, {}).get("closes") or []
+    names, corr, beta = compute(closes, broad, window)
+    return CorrelationMatrix.from_arrays(session, window, names, corr, beta)
+
+
+def refresh(path: Optional[str] = None) -> CorrelationMatrix:
+    """The nightly job: rebuild and store the matrix."""
+    global _MATRIX
+    path = path or config.CORRELATION_MATRIX["path"]
+    m = build()
+    m.save(path)
+    with _LOCK:
+        _MATRIX = (path, os.path.getmtime(path), m)
+    logger.info("correlation matrix built for %s (%d tickers)", m.session, len(m.tickers))
+    return m
+
+
+_MATRIX: Optional[tuple[str, float, CorrelationMatrix]] = None
+_LOCK = threading.Lock()
+
+
+def matrix(path: Optional[str] = None) -> Optional[CorrelationMatrix]:
+    """The last stored matrix (re-read only when the file changes), or None
+    before the first nightly run."""
+    global _MATRIX
+    path = path or config.CORRELATION_MATRIX["path"]
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _LOCK:
+        if _MATRIX is None or _MATRIX[0] != path or _MATRIX[1] != mtime:
+            _MATRIX = (path, mtime, CorrelationMatrix.load(path))
+        return _MATRIX[2]
+
+
+def correlations_for(ticker: str, others: Iterable[str]) -> dict[str, float]:
+    m = matrix()
+    return m.correlations_for(ticker, others) if m is not None else {}
@@ -10,9 +10,10 @@ cancel/recheck conditions). The mapping is pure: same inputs -> same plan.
 
 from __future__ import annotations
 
+import datetime as _dt
 from typing import Optional
 
-from . import config, sizing as sizing_mod
+from . import config, market_calendar, sizing as sizing_mod
 from .data_quality import GateResult
 from .schemas import (DecisionStatus, EventPlan, EventRiskAssessment, LLMQualitative,
                       MarketContext, PortfolioImpact, PositionPlan, SetupClassification,
@@ -50,6 +51,15 @@ def _entry_timing(setup: SetupClassification, price: float) -> tuple[str, float]
     return "wait", trig or price
 
 
+def _horizon_end(as_of: Optional[_dt.datetime], horizon_sessions: int) -> Optional[_dt.date]:
+    """The ``horizon_sessions``-th XNYS session after the price's session."""
+    if as_of is None or horizon_sessions <= 0:
+        return None
+    if as_of.tzinfo is None:
+        as_of = as_of.replace(tzinfo=_dt.timezone.utc)
+    return market_calendar.add_sessions(as_of.astimezone(market_calendar.ET).date(), horizon_sessions)
+
+
 def decide(
     *,
     ticker: str,
@@ -76,6 +86,7 @@ def decide(
         asset_type=asset_type,
         strategy=strategy,
         horizon_sessions=horizon_sessions,
+        horizon_end=_horizon_end(price_point.as_of, horizon_sessions),
         decision_status=DecisionStatus.NO_TRADE,
         setup_type=setup.setup_type,
         market_regime=market.regime,
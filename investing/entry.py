@@ -7,7 +7,7 @@ Pipeline (all deterministic except the optional qualitative LLM enrichment):
     -> data-quality gate
     -> relative strength
     -> setup classification
-    -> market context (regime, R/R, size multiplier, macro impact)
+    -> market context (shared regime, R/R, size multiplier; per-sector notes)
     -> event risk
     -> portfolio impact
     -> deterministic decision  -> PositionPlan
@@ -21,11 +21,15 @@ from __future__ import annotations
 
 import datetime as _dt
 import logging
-from typing import Optional
-
-from . import (config, data_quality, decision as decision_mod, event_risk,
-               market_health, persistence, portfolio, relative_strength,
-               setups, universe)
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, as_completed
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from . import (config, data_quality, decision as decision_mod,
+               event_risk, feature_store, gateway, market_calendar, market_health,
+               persistence, portfolio, relative_strength, universe)
 from .schemas import (AssetType, Catalyst, DataPoint, EventRiskAssessment,
                       LLMQualitative, MarketContext, MarketRegime)
 
@@ -50,6 +54,11 @@ def _asset_type(ticker: str) -> AssetType:
     return AssetType.EQUITY
 
 
+def _no_bars(ticker: str, error: Exception) -> dict:
+    return {"closes": [], "highs": [], "lows": [], "volumes": [], "adv_dollars": None,
+            "last_date": None, "point": DataPoint(name=f"{ticker}.bars", note=str(error))}
+
+
 def _safe(fn, default=None):
     try:
         return fn()
@@ -58,56 +67,147 @@ def _safe(fn, default=None):
         return default
 
 
-def build_market_context(sector: str) -> MarketContext:
-    """Build regime from available macro/market data; degrade to UNKNOWN cleanly."""
+def _rs_rank():
+    from . import rs_rank  # lazy: numpy is optional
+    return rs_rank
+
+
+def _correlation_matrix():
+    from . import correlation_matrix  # lazy: numpy is optional
+    return correlation_matrix
+
+
+def _regime_fetches() -> dict:
+    """The market-wide inputs of the regime, as gateway calls."""
+    from .providers import macro, market_data
+    return {
+        "credit_oas": macro.credit_spread_oas,
+        "spy_bars": lambda: market_data.get_bars(universe.BROAD_BENCHMARK, period="1y"),
+        "yield_curve": lambda: macro.fred_point("yield_curve_10y2y"),
+        "yield_10y": lambda: macro.fred_point("yield_10y"),
+    }
+
+
+def _market_fetches(sector: str) -> dict:
+    """The independent inputs of :func:`build_market_context`, as gateway calls:
+    the sector's rotation bars, plus the regime inputs when the shared regime
+    needs a rebuild."""
+    from .providers import market_data
+    calls = {} if _regime_fresh() else _regime_fetches()
+    bench = universe.SECTOR_BENCHMARK.get(sector)
+    if bench:
+        calls["rotation_sector"] = lambda: market_data.get_bars(bench, period="6mo")
+        calls["rotation_broad"] = lambda: market_data.get_bars(universe.BROAD_BENCHMARK, period="6mo")
+    return calls
+
+
+def _ok(fetched: dict, name: str):
+    """A gathered result, or None when that fetch failed or missed the deadline."""
+    v = fetched.get(name)
+    return None if isinstance(v, Exception) else v
+
+
+@dataclass
+class _Regime:
+    built_at: float                     # time.monotonic()
+    ctx: MarketContext                  # market-wide; no sector notes
+    rate_trend: Optional[str]
+    ttl: float                          # MARKET_CONTEXT_TTL, or the degraded TTL
+
+
+_REGIME: Optional[_Regime] = None
+_REGIME_SCORES = 3                      # credit_oas, spy_vs_ma200, yield_curve
+_REGIME_LOCK = threading.Lock()
+
+
+def _regime_fresh() -> bool:
+    r = _REGIME
+    return r is not None and time.monotonic() - r.built_at < r.ttl
+
+
+def _compute_regime(fetched: dict) -> tuple[MarketContext, Optional[str], bool]:
+    """The regime, the rate trend and whether it is degraded (UNKNOWN, or some
+    regime input missing)."""
     scores: dict[str, Optional[float]] = {}
     rate_trend = None
     try:
-        from .providers import macro, market_data
-        oas = macro.credit_spread_oas()
-        if oas.usable() and oas.value is not None:
+        oas = _ok(fetched, "credit_oas")
+        if oas is not None and oas.usable() and oas.value is not None:
             # calibrated HY-OAS bands (%), not an arbitrary composite range
             v = oas.value
             scores["credit_oas"] = 1.0 if v < 3 else (0.3 if v < 4.5 else (-0.4 if v < 6 else -1.0))
-        spy = market_data.get_bars(universe.BROAD_BENCHMARK, period="1y")
+        spy = _ok(fetched, "spy_bars") or {}
         from . import indicators as ind
         closes = spy.get("closes") or []
         ma200 = ind.sma(closes, 200) if closes else None
         if ma200 and closes:
             pct = (closes[-1] / ma200 - 1) * 100
             scores["spy_vs_ma200"] = max(-1.0, min(1.0, pct / 10.0))
-        yc = macro.fred_point("yield_curve_10y2y")
-        if yc.usable() and yc.value is not None:
+        yc = _ok(fetched, "yield_curve")
+        if yc is not None and yc.usable() and yc.value is not None:
             scores["yield_curve"] = max(-1.0, min(1.0, yc.value))
-        y10 = macro.fred_point("yield_10y")
-        if y10.usable():
+        y10 = _ok(fetched, "yield_10y")
+        if y10 is not None and y10.usable():
             rate_trend = "rising" if (y10.value or 0) > 4.5 else "stable"
     except Exception as e:
         logger.debug("market context build degraded: %s", e)
 
     history = _safe(lambda: persistence.market_health_series(250), []) or []
-    ctx = market_health.build_context(scores, history, sector=sector, rate_trend=rate_trend)
-    # persist for future normalization
+    ctx = market_health.build_context(scores, history, rate_trend=rate_trend)
+    # persist for future normalization — one reading per session, so repeated
+    # plans don't pile up near-identical rows and skew the percentile
     if ctx.health_score is not None:
         composite = (ctx.health_score / 100.0) * 2 - 1
+        session = _safe(lambda: market_calendar.last_completed_session().isoformat())
         _safe(lambda: persistence.save_market_health(
             round(composite, 4), ctx.health_percentile, ctx.health_zscore,
-            ctx.regime.value, {"scores": scores}))
-    ctx.sector_rotation = _sector_rotation_note(sector)
+            ctx.regime.value, {"scores": scores}, session=session))
+    degraded = ctx.regime == MarketRegime.UNKNOWN or len(scores) < _REGIME_SCORES
+    return ctx, rate_trend, degraded
+
+
+def market_regime(fetched: Optional[dict] = None) -> tuple[MarketContext, Optional[str]]:
+    """The market-wide context and rate trend shared by every plan, rebuilt at
+    most every ``config.MARKET_CONTEXT_TTL`` seconds (a degraded one only for
+    ``config.MARKET_CONTEXT_DEGRADED_TTL``). ``fetched`` may carry the regime
+    inputs already gathered by the caller."""
+    global _REGIME
+    with _REGIME_LOCK:
+        if not _regime_fresh():
+            fetched = fetched or {}
+            if not all(k in fetched for k in _regime_fetches()):
+                fetched = gateway.gather(_regime_fetches())
+            ctx, rate_trend, degraded = _compute_regime(fetched)
+            ttl = config.MARKET_CONTEXT_DEGRADED_TTL if degraded else config.MARKET_CONTEXT_TTL
+            _REGIME = _Regime(time.monotonic(), ctx, rate_trend, ttl)
+        return _REGIME.ctx, _REGIME.rate_trend
+
+
+def build_market_context(sector: str, fetched: Optional[dict] = None) -> MarketContext:
+    """The shared market regime plus this sector's macro-impact and rotation
+    notes; degrades to UNKNOWN cleanly. ``fetched`` holds the results of
+    :func:`_market_fetches` when the caller already fanned them out with its own
+    fetches; otherwise they are gathered here."""
+    if fetched is None:
+        fetched = gateway.gather(_market_fetches(sector))
+    regime, rate_trend = market_regime(fetched)
+    ctx = market_health.for_sector(regime, sector, rate_trend)
+    ctx.sector_rotation = _sector_rotation_note(sector, _ok(fetched, "rotation_sector"),
+                                                _ok(fetched, "rotation_broad"))
     return ctx
 
 
-def _sector_rotation_note(sector: str) -> str:
+def _sector_rotation_note(sector: str, sector_bars: Optional[dict],
+                          broad_bars: Optional[dict]) -> str:
     """Momentum-based note. Named 'rotation', NOT 'inflows' — we do not have real
     ETF flow / units-outstanding data here."""
     bench = universe.SECTOR_BENCHMARK.get(sector)
     if not bench:
         return "brak benchmarku sektorowego"
     try:
-        from .providers import market_data
         from . import indicators as ind
-        sb = market_data.get_bars(bench, period="6mo").get("closes") or []
-        bb = market_data.get_bars(universe.BROAD_BENCHMARK, period="6mo").get("closes") or []
+        sb = (sector_bars or {}).get("closes") or []
+        bb = (broad_bars or {}).get("closes") or []
         r_s = ind.pct_return(sb, 20)
         r_b = ind.pct_return(bb, 20)
         if r_s is None or r_b is None:
@@ -129,8 +229,10 @@ def build_position_plan(
     portfolio_value: Optional[float] = None,
     llm_client: Optional[object] = None,
     persist: bool = True,
+    open_positions: Optional[list[dict]] = None,
 ):
-    """Build and (optionally) persist a :class:`PositionPlan` for ``ticker``."""
+    """Build and (optionally) persist a :class:`PositionPlan` for ``ticker``.
+    ``open_positions`` lets a batch pass the portfolio read once."""
     from .providers import market_data, asset_proxy
 
     ticker = ticker.upper().strip()
@@ -141,13 +243,31 @@ def build_position_plan(
     atype = _asset_type(ticker)
 
     # ── fetch ──
-    price_dp = market_data.get_quote(ticker)
-    bars = market_data.get_bars(ticker, period="1y")
-    bars_dp: DataPoint = bars["point"]
-    earnings_dp = market_data.get_earnings_date(ticker)
-    broad = market_data.get_bars(universe.BROAD_BENCHMARK, period="1y")
+    # every independent input (incl. the market context's) at once, under one
+    # deadline; a failed or late source degrades only its own data point.
     sector_bench = universe.sector_benchmark(ticker)
-    sector_bars = market_data.get_bars(sector_bench, period="1y") if sector_bench else {"closes": []}
+    # the required inputs are never served stale-while-revalidate: a STALE point
+    # would fail the gate, so a stale cache entry is refetched before the plan.
+    calls = {
+        "price": lambda: market_data.get_quote(ticker, fresh=True),
+        "bars": lambda: market_data.get_bars(ticker, period="1y", fresh=True),
+        "earnings_date": lambda: market_data.get_earnings_date(ticker, fresh=True),
+        "broad": lambda: market_data.get_bars(universe.BROAD_BENCHMARK, period="1y"),
+        **{f"market:{k}": fn for k, fn in _market_fetches(sector).items()},
+    }
+    if sector_bench:
+        calls["sector_bars"] = lambda: market_data.get_bars(sector_bench, period="1y")
+    if atype == AssetType.CRYPTO_PROXY:
+        calls["asset_proxy_nav"] = lambda: asset_proxy.get_nav(ticker)
+    fetched = gateway.gather(calls)
+
+    price_dp = _ok(fetched, "price") or DataPoint(name="price", note=str(fetched["price"]))
+    bars = _ok(fetched, "bars") or _no_bars(ticker, fetched["bars"])
+    bars_dp: DataPoint = bars["point"]
+    earnings_dp = (_ok(fetched, "earnings_date")
+                   or DataPoint(name="earnings_date", note=str(fetched["earnings_date"])))
+    broad = _ok(fetched, "broad") or {"closes": []}
+    sector_bars = _ok(fetched, "sector_bars") or {"closes": []}
 
     points: dict[str, DataPoint] = {
         "price": price_dp,
@@ -159,7 +279,7 @@ def build_position_plan(
     points["benchmark_bars"] = broad["point"] if "point" in broad else DataPoint(name="benchmark_bars")
 
     if atype == AssetType.CRYPTO_PROXY:
-        nav = asset_proxy.get_nav(ticker)
+        nav = _ok(fetched, "asset_proxy_nav") or {}
         points["asset_proxy_nav"] = nav.get("summary", DataPoint(name="asset_proxy_nav"))
         required.append("asset_proxy_nav")
 
@@ -168,13 +288,15 @@ def build_position_plan(
         for name, dp in points.items():
             if dp.status.value in ("MISSING", "ERROR", "STALE"):
                 _safe(lambda n=name, d=dp: persistence.log_data_quality_event(
-                    ticker, n, d.status.value, d.source, d.note))
+                    ticker, n, d.status.value, d.source, d.note, deferred=True))
 
     # ── relative strength ──
     rs = {}
     if bars["closes"] and broad["closes"]:
         rs = relative_strength.compute(bars["closes"], broad["closes"],
                                        sector_bars.get("closes") or None)
+        # sector / universe percentile from the session's cross-sectional table
+        _safe(lambda: _rs_rank().attach_ranks(ticker, sector, rs))
 
     # ── earnings / event timing ──
     days_to_earn = market_data.days_to(earnings_dp.value) if earnings_dp.value else None
@@ -182,25 +304,37 @@ def build_position_plan(
     imminent = days_to_earn is not None and 0 <= days_to_earn <= blackout_days
 
     # ── optional qualitative LLM enrichment (qualitative only) ──
-    llm: Optional[LLMQualitative] = None
-    catalysts: list[Catalyst] = []
+    # started now, runs while the deterministic steps below do; joined before
+    # the event-risk assessment, its first consumer
+    llm_future = None
     if llm_client is not None or _llm_available():
-        llm = _safe(lambda: _qualitative(ticker, sector, rs, llm_client))
-        if llm:
-            catalysts = llm.catalysts
+        llm_future = _llm_pool().submit(_qualitative, ticker, sector, rs, llm_client)
 
     # ── setup ──
-    feat = setups.build_features(
-        bars["closes"], bars["highs"], bars["lows"], bars["volumes"], rs,
-        imminent_binary_event=imminent,
+    feat, setup = feature_store.features_and_setup(
+        ticker, bars.get("last_date"), bars["closes"], bars["highs"], bars["lows"],
+        bars["volumes"], rs, imminent_binary_event=imminent, persist=persist,
+        streamed=bars.get("indicators"),
     )
-    setup = setups.classify(feat)
 
     # ── data-quality gate ──
     gate = data_quality.evaluate(points, required=required, optional=optional)
 
     # ── market context & event risk ──
-    market = build_market_context(sector)
+    market = build_market_context(sector, {k.split(":", 1)[1]: v for k, v in fetched.items()
+                                           if k.startswith("market:")})
+    llm: Optional[LLMQualitative] = None
+    catalysts: list[Catalyst] = []
+    if llm_future is not None:
+        try:
+            llm = llm_future.result(timeout=config.LLM_TIMEOUT)
+        except FutureTimeout:
+            logger.warning("LLM enrichment for %s timed out after %ss — plan without it",
+                           ticker, config.LLM_TIMEOUT)
+        except Exception as e:  # noqa: BLE001
+            logger.debug("LLM enrichment for %s failed: %s", ticker, e)
+        if llm:
+            catalysts = llm.catalysts
     earn_date = None
     if earnings_dp.value:
         try:
@@ -223,10 +357,16 @@ def build_position_plan(
         adv_dollars=bars.get("adv_dollars"), size_multiplier=market.size_multiplier,
     ) if (setup.stop and entry_ref) else None
     prov_qty = prov.final_quantity if prov else 0
+    if open_positions is None:
+        open_positions = _safe(persistence.list_open_positions, []) or []
+    # nightly matrix: an O(1) lookup per open position, no bars fetched here
+    correlations = _safe(lambda: _correlation_matrix().correlations_for(
+        ticker, [p["ticker"] for p in open_positions]), {}) or {}
     pf_impact = portfolio.evaluate_new_position(
         ticker=ticker, sector=sector, narrative=narrative,
         entry_price=max(entry_ref, 0.01), stop_price=max(setup.stop or 0.01, 0.01),
         quantity=prov_qty, beta=rs.get("beta"), portfolio_value=portfolio_value,
+        open_positions=open_positions, correlations=correlations,
     )
 
     # ── decision ──
@@ -247,11 +387,71 @@ def build_position_plan(
     if persist:
         _safe(lambda: persistence.log_signal(ticker, strategy, setup.setup_type.value,
                                              plan.signal_confidence, plan.data_quality_score,
-                                             {"reason": plan.decision_reason}))
+                                             {"reason": plan.decision_reason}, deferred=True))
         _safe(lambda: persistence.save_position_plan(plan))
     return plan
 
 
+def prefetch_plan_inputs(tickers: list[str]) -> list[dict]:
+    """Fetch what a batch of plans shares, once: every ticker's and benchmark's
+    bars in one bulk download (landing in the per-ticker cache entries), the
+    market regime and the RS rank table (its build started if missing). Returns
+    the open positions, for each plan's ``open_positions``."""
+    from .providers import market_data
+
+    benches = {universe.BROAD_BENCHMARK} | {b for b in map(universe.sector_benchmark, tickers) if b}
+    _safe(lambda: market_data.get_bars_many(tickers + sorted(benches - set(tickers)), period="1y"))
+    _safe(market_regime)
+    _safe(lambda: _rs_rank().table())           # starts the build if missing; never waits
+    return _safe(persistence.list_open_positions, []) or []
+
+
+def build_position_plans(
+    tickers: list[str],
+    amount: Optional[float] = None,
+    risk_pct: Optional[float] = None,
+    *,
+    strategy: str = config.STRATEGY_POSITION,
+    horizon_sessions: int = config.HORIZON_DEFAULT_SESSIONS,
+    portfolio_value: Optional[float] = None,
+    llm_client: Optional[object] = None,
+    persist: bool = True,
+    on_plan: Optional[Callable[[str, Any], None]] = None,
+    max_workers: Optional[int] = None,
+) -> dict[str, Any]:
+    """:func:`build_position_plan` for many tickers: ``{ticker: plan or exception}``.
+
+    The shared inputs are fetched once up front (:func:`prefetch_plan_inputs`),
+    then each ticker runs the deterministic pipeline on ``max_workers`` threads.
+    ``on_plan(ticker, plan_or_exception)`` is called as each one finishes, in
+    completion order. Callers with their own bounded executor (the Slack bot's
+    :mod:`investing.runner`) use :func:`prefetch_plan_inputs` and submit the
+    per-ticker plans there instead."""
+    tickers = list(dict.fromkeys(t.upper().strip() for t in tickers if t and t.strip()))
+    if not tickers:
+        return {}
+    open_positions = prefetch_plan_inputs(tickers)
+
+    out: dict[str, Any] = {}
+    workers = max(1, min(max_workers or config.MAX_CONCURRENT_ANALYSES, len(tickers)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="invest-plan") as pool:
+        futures = {pool.submit(build_position_plan, t, amount, risk_pct, strategy=strategy,
+                               horizon_sessions=horizon_sessions, portfolio_value=portfolio_value,
+                               llm_client=llm_client, persist=persist,
+                               open_positions=open_positions): t for t in tickers}
+        for fut in as_completed(futures):
+            t = futures[fut]
+            try:
+                res = fut.result()
+            except Exception as e:  # noqa: BLE001 — one ticker never sinks the batch
+                logger.warning("position plan for %s failed: %s", t, e)
+                res = e
+            out[t] = res
+            if on_plan is not None:
+                _safe(lambda: on_plan(t, res))
+    return {t: out[t] for t in tickers}
+
+
 def _llm_available() -> bool:
     try:
         import _ctx
@@ -260,6 +460,20 @@ def _llm_available() -> bool:
         return False
 
 
+_LLM_POOL: Optional[ThreadPoolExecutor] = None
+_LLM_POOL_LOCK = threading.Lock()
+
+
+def _llm_pool() -> ThreadPoolExecutor:
+    # concurrent first plans must not each create (and leak) a pool
+    global _LLM_POOL
+    with _LLM_POOL_LOCK:
+        if _LLM_POOL is None:
+            _LLM_POOL = ThreadPoolExecutor(max_workers=config.MAX_CONCURRENT_ANALYSES,
+                                           thread_name_prefix="invest-llm")
+        return _LLM_POOL
+
+
 def _qualitative(ticker, sector, rs, client) -> Optional[LLMQualitative]:
     from . import llm as llm_mod
     system = (
@@ -273,4 +487,4 @@ def _qualitative(ticker, sector, rs, client) -> Optional[LLMQualitative]:
         "Zbuduj zwięzły bull case, bear case, listę katalizatorów (z rodzajem i "
         "horyzontem) oraz sprzeczności. Tylko ocena jakościowa."
     )
-    return llm_mod.extract_qualitative(system=system, user=user, client=client)
+    return llm_mod.cached_qualitative(ticker, system=system, user=user, client=client)
@@ -0,0 +1,145 @@
+"""
+investing/feature_store.py — cached feature vectors and setup classifications.
+
+:func:`setups.build_features` + :func:`setups.classify` only change when a new
+bar arrives or the strategy config changes, yet every /wejscie or /swing ran
+them again. Results are cached per ``(ticker, last bar date, CONFIG_VERSION)``:
+in process (LRU) and in the SQLite ``feature_cache`` table, so the backtest and
+the outcome tracker can reuse what the live path computed for the same session.
+
+A new bar date or a config bump is a different key, so invalidation is
+automatic. Each entry also carries a fingerprint of the inputs that can change
+without a new bar date (the live intraday bar, relative strength, the
+event-blackout flag); a mismatch recomputes and replaces the entry.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Sequence
+
+from . import config, persistence, setups
+from .schemas import SetupClassification
+
+logger = logging.getLogger(__name__)
+
+# Computed parts of the feature bundle; the raw series are the caller's inputs
+# and are re-attached on a hit instead of being stored.
+_COMPUTED = ("ext", "base", "volume_contraction", "higher_low", "rs", "imminent_binary_event")
+
+
+def fingerprint(closes: Sequence[float], highs: Sequence[float], lows: Sequence[float],
+                volumes: Sequence[float], rs: dict, imminent_binary_event: bool) -> str:
+    tail = [len(closes)] + [s[-1] if len(s) else None for s in (closes, highs, lows, volumes)]
+    blob = json.dumps([tail, rs or {}, imminent_binary_event], sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+
+class FeatureStore:
+    def __init__(self, *, max_entries: int = 512, db_path: Optional[str] = None) -> None:
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._mem: OrderedDict[tuple, tuple[str, dict, SetupClassification]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0}
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._mem), **self._counters}
+
+    def get(self, ticker: str, bar_date: str, fp: str, *,
+            persist: bool = True) -> Optional[tuple[dict, SetupClassification]]:
+        key = (ticker, bar_date, config.CONFIG_VERSION)
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None and hit[0] == fp:
+                self._mem.move_to_end(key)
+                return copy.deepcopy(hit[1]), hit[2].model_copy(deep=True)
+        if not persist:
+            return None
+        try:
+            row = persistence.feature_get(*key, db_path=self.db_path)
+        except Exception as e:               # noqa: BLE001 — cache must never break a plan
+            logger.debug("feature cache read failed for %s: %s", ticker, e)
+            return None
+        if row is None or row["fingerprint"] != fp:
+            return None
+        setup = SetupClassification.model_validate(row["setup"])
+        self._remember(key, fp, row["features"], setup)
+        return row["features"], setup.model_copy(deep=True)
+
+    def put(self, ticker: str, bar_date: str, fp: str, computed: dict,
+            setup: SetupClassification, *, persist: bool = True) -> None:
+        key = (ticker, bar_date, config.CONFIG_VERSION)
+        self._remember(key, fp, computed, setup.model_copy(deep=True))
+        if not persist:
+            return
+        try:
+            persistence.feature_put(*key, fp, computed, setup.model_dump(mode="json"),
+                                    db_path=self.db_path)
+        except Exception as e:               # noqa: BLE001
+            logger.debug("feature cache write failed for %s: %s", ticker, e)
+
+    def _remember(self, key: tuple, fp: str, computed: dict, setup: SetupClassification) -> None:
+        with self._lock:
+            self._mem[key] = (fp, computed, setup)
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.max_entries:
+                self._mem.popitem(last=False)
+
+    def features_and_setup(
+        self,
+        ticker: str,
+        bar_date: Optional[str],
+        closes: Sequence[float],
+        highs: Sequence[float],
+        lows: Sequence[float],
+        volumes: Sequence[float],
+        rs: dict,
+        *,
+        imminent_binary_event: bool = False,
+        persist: bool = True,
+        streamed: Optional[dict] = None,
+    ) -> tuple[dict, SetupClassification]:
+        """``setups.build_features`` + ``setups.classify`` through the cache.
+        Without a ``bar_date`` (no bars) nothing is cached. ``streamed`` is the bar
+        store's indicator state for the same bars (see :func:`setups.build_features`)."""
+        fp = fingerprint(closes, highs, lows, volumes, rs, imminent_binary_event)
+        if bar_date:
+            hit = self.get(ticker, bar_date, fp, persist=persist)
+            if hit is not None:
+                with self._lock:
+                    self._counters["hits"] += 1
+                computed, setup = hit
+                return {"closes": list(closes), "highs": list(highs), "lows": list(lows),
+                        "volumes": list(volumes), **computed}, setup
+        with self._lock:
+            self._counters["misses"] += 1
+        feat = setups.build_features(closes, highs, lows, volumes, rs,
+                                     imminent_binary_event=imminent_binary_event, streamed=streamed)
+        setup = setups.classify(feat)
+        if bar_date:
+            self.put(ticker, bar_date, fp, copy.deepcopy({k: feat[k] for k in _COMPUTED}), setup,
+                     persist=persist)
+        return feat, setup
+
+
+_STORE: Optional[FeatureStore] = None
+
+
+def store() -> FeatureStore:
+    global _STORE
+    if _STORE is None:
+        _STORE = FeatureStore()
+    return _STORE
+
+
+def features_and_setup(ticker: str, bar_date: Optional[str], closes: Sequence[float],
+                       highs: Sequence[float], lows: Sequence[float], volumes: Sequence[float],
+                       rs: dict, **kw) -> tuple[dict, SetupClassification]:
+    return store().features_and_setup(ticker, bar_date, closes, highs, lows, volumes, rs, **kw)
@@ -2,22 +2,33 @@
 investing/gateway.py — one central data gateway for every external source.
 
 Provides, per source: retry with exponential backoff + jitter, soft timeout,
-circuit breaker, a simple rate-limit budget, a TTL cache (in-memory + optional
-cross-process via persistence.api_cache), a fallback hook and an explicit
-degraded mode. Providers never call yfinance/FRED/Tavily directly — they go
-through :func:`fetch`.
+circuit breaker, a token-bucket rate limit that queues callers, a TTL cache
+(in-memory + optional cross-process via persistence.gateway_cache) with
+stale-while-revalidate between the ``fresh`` and ``max`` TTL, single-flight
+coalescing of concurrent misses on the same key, an isolated worker pool
+(bulkhead) that tracks abandoned timed-out calls, a fallback hook and an
+explicit degraded mode. Latency, retries, cache hit ratio, degraded-mode
+activations and breaker transitions are recorded per source in a metrics
+registry (:meth:`Gateway.snapshot`). Providers never call
+yfinance/FRED/Tavily directly — they go through :func:`fetch` (or
+:func:`fetch_result` when they need the fetch time / staleness).
+:func:`gather` fans a caller's independent fetches out under one deadline.
 """
 
 from __future__ import annotations
 
+import datetime as _dt
+import json
 import random
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
 from dataclasses import dataclass, field
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Optional, Union
 
 from . import config
+from .cache import MemoryCache, SQLiteCache
+from .metrics import Registry
 
 # Injectable for tests (avoid real sleeping / randomness).
 _SLEEP: Callable[[float], None] = time.sleep
@@ -32,6 +43,10 @@ class GatewayError(RuntimeError):
     pass
 
 
+class BulkheadFull(RuntimeError):
+    pass
+
+
 @dataclass
 class CircuitBreaker:
     threshold: int
@@ -39,8 +54,27 @@ class CircuitBreaker:
     failures: int = 0
     opened_at: Optional[float] = None
     _now: Callable[[], float] = time.monotonic
+    # called as on_transition(old_state, new_state) when the state changes
+    on_transition: Optional[Callable[[str, str], None]] = None
+    _state: str = "closed"
+
+    def state(self) -> str:
+        """closed | open | half_open (cooldown elapsed, a trial is allowed)."""
+        if self.opened_at is None:
+            return "closed"
+        if self._now() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def _observe(self) -> None:
+        new = self.state()
+        if new != self._state:
+            old, self._state = self._state, new
+            if self.on_transition is not None:
+                self.on_transition(old, new)
 
     def allow(self) -> bool:
+        self._observe()
         if self.opened_at is None:
             return True
         if self._now() - self.opened_at >= self.cooldown:
@@ -50,11 +84,13 @@ class CircuitBreaker:
     def record_success(self) -> None:
         self.failures = 0
         self.opened_at = None
+        self._observe()
 
     def record_failure(self) -> None:
         self.failures += 1
         if self.failures >= self.threshold:
             self.opened_at = self._now()
+        self._observe()
 
     def is_open(self) -> bool:
         return not self.allow()
@@ -62,27 +98,174 @@ class CircuitBreaker:
 
 @dataclass
 class RateLimiter:
+    """Thread-safe token bucket: ``max_calls`` per ``window`` seconds sustained,
+    with up to ``burst`` calls back to back (defaults to ``max_calls``). Refill is
+    computed from elapsed time, so every operation is O(1)."""
+
     max_calls: int
     window: float = 60.0
-    _calls: list = field(default_factory=list)
+    burst: Optional[int] = None
     _now: Callable[[], float] = time.monotonic
+    _sleep: Callable[[float], None] = time.sleep
+    _lock: Any = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.capacity = float(self.burst or self.max_calls)
+        self.rate = self.max_calls / self.window            # tokens per second
+        self._tokens = self.capacity
+        self._stamp = self._now()
+
+    def _take(self) -> float:
+        """Take a token if one is available. Returns 0.0 on success, otherwise the
+        seconds until the next token. Caller holds the lock."""
+        now = self._now()
+        self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / self.rate if self.rate > 0 else float("inf")
 
     def allow(self) -> bool:
-        now = self._now()
-        self._calls = [t for t in self._calls if now - t < self.window]
-        if len(self._calls) >= self.max_calls:
-            return False
-        self._calls.append(now)
-        return True
+        """Non-blocking: take a token or refuse."""
+        with self._lock:
+            return self._take() == 0.0
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Block until a token is available. Gives up (False) as soon as it is
+        clear the next token will not arrive within ``timeout`` seconds."""
+        deadline = None if timeout is None else self._now() + timeout
+        while True:
+            with self._lock:
+                wait = self._take()
+            if wait == 0.0:
+                return True
+            if deadline is not None:
+                remaining = deadline - self._now()
+                if wait > remaining:
+                    return False
+            self._sleep(wait)
+
+    def available(self) -> float:
+        with self._lock:
+            now = self._now()
+            return min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
 
 
-class Gateway:
+class Bulkhead:
+    """An isolated worker pool for one source.
+
+    A timed-out call cannot be stopped — its thread keeps running — so it is
+    tracked as a *zombie* until it finally returns. Once a source's zombies
+    occupy every worker, new work for that source is refused instead of queued
+    behind calls that may never finish; other sources are unaffected."""
+
+    def __init__(self, source: str, workers: int) -> None:
+        self.source = source
+        self.workers = max(1, workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                            thread_name_prefix=f"gw-{source}")
+        self._lock = threading.Lock()
+        self.zombies = 0           # timed out, still running
+        self.abandoned = 0         # total calls ever abandoned on timeout
+        self.refused = 0           # calls refused while saturated
+
+    def admit(self) -> bool:
+        """False (and counted as refused) while zombies occupy every worker."""
+        with self._lock:
+            if self.zombies >= self.workers:
+                self.refused += 1
+                return False
+            return True
+
+    def run(self, fn: Callable[[], Any], timeout: float) -> Any:
+        if not self.admit():
+            raise BulkheadFull(f"{self.source}: all {self.workers} workers stuck on timed-out calls")
+        fut = self._executor.submit(fn)
+        try:
+            return fut.result(timeout=timeout)
+        except FutureTimeout as e:
+            if not fut.cancel():               # already running -> a zombie
+                with self._lock:
+                    self.zombies += 1
+                    self.abandoned += 1
+                fut.add_done_callback(self._reap)
+            raise TimeoutError(f"timeout after {timeout}s") from e
+
+    def _reap(self, _fut) -> None:
+        with self._lock:
+            self.zombies -= 1
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"workers": self.workers, "zombies": self.zombies,
+                    "abandoned": self.abandoned, "refused": self.refused}
+
+
+@dataclass
+class Fetched:
+    """A gateway result plus provenance: when the value was actually pulled from
+    the source, and whether it is served past its fresh TTL (stale-while-
+    revalidate) or came from the fallback (degraded)."""
+
+    value: Any
+    fetched_at: _dt.datetime
+    stale: bool = False
+    degraded: bool = False
+
+
+class _Entry:
+    __slots__ = ("fresh_until", "max_until", "fetched_at", "value")
+
+    def __init__(self, fresh_until: float, max_until: float, fetched_at: _dt.datetime, value: Any) -> None:
+        self.fresh_until = fresh_until        # monotonic
+        self.max_until = max_until            # monotonic; stale but servable until here
+        self.fetched_at = fetched_at          # wall clock, UTC
+        self.value = value
+
+
+class _Flight:
+    """One in-flight upstream load that concurrent callers of the same key join."""
+
+    __slots__ = ("done", "ok", "result", "why", "waiters")
+
     def __init__(self) -> None:
+        self.done = threading.Event()
+        self.ok = False
+        self.result: Optional[Fetched] = None
+        self.why = ""
+        self.waiters = 0
+
+
+def _utcnow() -> _dt.datetime:
+    return _dt.datetime.now(_dt.timezone.utc)
+
+
+class Gateway:
+    """``l2=True`` backs the in-memory cache with the SQLite ``gateway_cache`` tier
+    (see :mod:`investing.cache`); the process-wide :func:`gateway` enables it per
+    config, bare instances (tests, tools) stay in-memory only."""
+
+    def __init__(self, *, l2: bool = False, db_path: Optional[str] = None) -> None:
         self._breakers: dict[str, CircuitBreaker] = {}
         self._limiters: dict[str, RateLimiter] = {}
-        self._cache: dict[str, tuple[float, Any]] = {}     # key -> (expiry_monotonic, value)
+        self._cache = MemoryCache()
+        self._inflight: dict[str, _Flight] = {}
+        self._counters: dict[str, int] = {"upstream_loads": 0, "coalesced": 0,
+                                          "stale_served": 0, "revalidations": 0,
+                                          "l1_hits": 0, "l1_misses": 0}
         self._lock = threading.Lock()
-        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="gw")
+        self._bulkheads: dict[str, Bulkhead] = {}
+        self.metrics = Registry()
+        # background revalidation runs apart from the fetch pools so a refresh
+        # waiting on its own fetch can never starve them
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="gw-swr")
+        # caller-side fan-out (gather); the calls still queue on the bulkheads
+        self._fanout = ThreadPoolExecutor(max_workers=config.GATEWAY["fanout_workers"],
+                                          thread_name_prefix="gw-fanout")
+        self._l2: Optional[SQLiteCache] = SQLiteCache(db_path) if l2 else None
+        if self._l2 is not None:
+            self._l2.start_sweeper()
 
     def breaker(self, source: str) -> CircuitBreaker:
         with self._lock:
@@ -90,28 +273,133 @@ class Gateway:
                 self._breakers[source] = CircuitBreaker(
                     threshold=config.GATEWAY["cb_threshold"],
                     cooldown=config.GATEWAY["cb_cooldown"],
+                    on_transition=lambda old, new: self.metrics.incr(
+                        "gateway_breaker_transitions", source=source, to=new),
                 )
             return self._breakers[source]
 
     def limiter(self, source: str, max_calls: int = 60) -> RateLimiter:
+        """Per-source token bucket. Budgets come from :data:`config.RATE_LIMITS`;
+        ``max_calls`` (per minute) only applies to sources not listed there."""
         with self._lock:
             if source not in self._limiters:
-                self._limiters[source] = RateLimiter(max_calls=max_calls)
+                budget = config.RATE_LIMITS.get(source)
+                if budget:
+                    self._limiters[source] = RateLimiter(max_calls=budget["per_minute"],
+                                                         burst=budget.get("burst"))
+                else:
+                    self._limiters[source] = RateLimiter(max_calls=max_calls)
             return self._limiters[source]
 
-    # ── cache ──
-    def _cache_get(self, key: str) -> tuple[bool, Any]:
+    def bulkhead(self, source: str) -> Bulkhead:
         with self._lock:
-            item = self._cache.get(key)
-        if item and item[0] > time.monotonic():
-            return True, item[1]
-        return False, None
+            if source not in self._bulkheads:
+                workers = config.BULKHEAD_WORKERS.get(source, config.GATEWAY["bulkhead_default"])
+                self._bulkheads[source] = Bulkhead(source, workers)
+            return self._bulkheads[source]
 
-    def _cache_set(self, key: str, value: Any, ttl: float) -> None:
+    def bulkhead_stats(self) -> dict[str, dict[str, int]]:
+        """Per-source pool size, live zombies, abandoned and refused calls."""
+        with self._lock:
+            heads = dict(self._bulkheads)
+        return {src: bh.stats() for src, bh in heads.items()}
+
+    def stats(self) -> dict[str, int]:
+        """Counters: ``upstream_loads`` (leader loads that went to the source),
+        ``coalesced`` (callers that joined an in-flight load instead),
+        ``stale_served`` and ``revalidations`` (stale-while-revalidate), and per
+        tier ``l1_hits`` / ``l1_misses`` / ``l2_hits`` / ``l2_misses`` / ....
+        L1 memory accounting: ``l1_entries``, ``l1_bytes``, ``l1_max_bytes``,
+        ``l1_evictions_lru`` and ``l1_evictions_expired``."""
+        with self._lock:
+            out = dict(self._counters)
+        out.update({f"l1_{k}": v for k, v in self._cache.stats().items()})
+        if self._l2 is not None:
+            out.update({f"l2_{k}": v for k, v in self._l2.stats().items()})
+        return out
+
+    def snapshot(self) -> dict[str, Any]:
+        """Everything observable about the gateway, JSON-serializable: per-source
+        latency percentiles, retries, errors, cache hit ratio, degraded-mode
+        activations, breaker state/transitions, bulkhead and rate-limit state,
+        plus the raw metric series and cache counters."""
         with self._lock:
-            self._cache[key] = (time.monotonic() + ttl, value)
+            breakers = dict(self._breakers)
+            limiters = dict(self._limiters)
+            bulkheads = dict(self._bulkheads)
+        m = self.metrics
+        sources: dict[str, dict] = {}
+        for src in sorted(set(breakers) | set(limiters) | set(bulkheads)
+                          | m.label_values("source")):
+            l1_hit = m.counter("gateway_cache", source=src, tier="l1", result="hit")
+            l1_miss = m.counter("gateway_cache", source=src, tier="l1", result="miss")
+            l2_hit = m.counter("gateway_cache", source=src, tier="l2", result="hit")
+            lookups = l1_hit + l1_miss
+            br = breakers.get(src)
+            sources[src] = {
+                "latency_ms": m.histogram("gateway_latency_ms", source=src),
+                "retries": m.counter("gateway_retries", source=src),
+                "errors": m.counter("gateway_errors", source=src),
+                "cache_hit_ratio": round((l1_hit + l2_hit) / lookups, 3) if lookups else None,
+                "degraded": m.total("gateway_degraded", source=src),
+                "breaker": br.state() if br else "closed",
+                "breaker_transitions": m.total("gateway_breaker_transitions", source=src),
+                "bulkhead": bulkheads[src].stats() if src in bulkheads else None,
+                "rate_tokens": round(limiters[src].available(), 2) if src in limiters else None,
+            }
+        return {"sources": sources, "cache": self.stats(), "series": m.snapshot()}
+
+    def snapshot_json(self, **kw: Any) -> str:
+        return json.dumps(self.snapshot(), **kw)
+
+    def _incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    # ── cache ──
+    def _cache_get(self, key: str) -> tuple[str, Optional[_Entry]]:
+        """Return ("fresh" | "stale" | "miss", entry)."""
+        entry = self._cache.get(key)
+        now = time.monotonic()
+        if entry is None or entry.max_until <= now:
+            return "miss", None
+        return ("fresh" if entry.fresh_until > now else "stale"), entry
+
+    def _cache_set(self, key: str, value: Any, ttl: float, max_age: Optional[float] = None) -> _Entry:
+        now = time.monotonic()
+        entry = _Entry(now + ttl, now + max(ttl, max_age or 0.0), _utcnow(), value)
+        self._cache.put(key, entry)
+        return entry
+
+    def _l2_promote(self, key: str) -> tuple[str, Optional[_Entry]]:
+        """Look ``key`` up in L2 and, on a hit, copy it into L1 (expiries are
+        translated from wall-clock epoch to this process's monotonic clock)."""
+        hit = self._l2.get(key) if self._l2 is not None else None
+        if hit is None:
+            return "miss", None
+        wall, mono = time.time(), time.monotonic()
+        entry = _Entry(mono + (hit.fresh_until - wall), mono + (hit.expires_at - wall),
+                       hit.fetched_at, hit.value)
+        self._cache.put(key, entry)
+        return ("fresh" if hit.fresh_until > wall else "stale"), entry
+
+    @staticmethod
+    def _ttls(kind: str, ttl: Optional[float], max_age: Optional[float]) -> tuple[float, float]:
+        """(fresh, max) ages. An explicit ``ttl`` disables the stale window unless
+        ``max_age`` is given too; otherwise both come from :data:`config.TTL`."""
+        spec = config.TTL.get(kind, {"fresh": 60})
+        fresh = ttl if ttl is not None else spec["fresh"]
+        if max_age is None:
+            swr = ttl is None and config.GATEWAY["stale_while_revalidate"]
+            max_age = spec.get("max", fresh) if swr else fresh
+        return fresh, max(fresh, max_age)
+
+    def fetch(self, source: str, key: str, fn: Callable[[], Any], **kw) -> Any:
+        """Fetch through the gateway. Returns the value, or the fallback's value in
+        degraded mode. Raises GatewayError only when there is no fallback."""
+        return self.fetch_result(source, key, fn, **kw).value
 
-    def fetch(
+    def fetch_result(
         self,
         source: str,
         key: str,
@@ -119,52 +407,293 @@ class Gateway:
         *,
         kind: str = "default",
         ttl: Optional[float] = None,
+        max_age: Optional[float] = None,
         timeout: Optional[float] = None,
         fallback: Optional[Callable[[], Any]] = None,
         max_retries: Optional[int] = None,
         rate_limit: int = 60,
-    ) -> Any:
-        """Fetch through the gateway. Returns the value, or the fallback's value in
-        degraded mode. Raises GatewayError only when there is no fallback."""
-        ttl = ttl if ttl is not None else config.TTL.get(kind, {"fresh": 60})["fresh"]
+        require_fresh: bool = False,
+    ) -> Fetched:
+        """Like :meth:`fetch`, but returns a :class:`Fetched` with provenance.
+
+        Entries older than ``fresh`` but younger than ``max`` are returned at once
+        with ``stale=True`` while a background task revalidates them. With
+        ``require_fresh`` such an entry is refetched synchronously instead, and
+        only served (stale) when that fetch fails."""
+        ttl, max_age = self._ttls(kind, ttl, max_age)
         timeout = timeout if timeout is not None else config.GATEWAY["timeout"]
         max_retries = max_retries if max_retries is not None else config.GATEWAY["max_retries"]
+        load = dict(ttl=ttl, max_age=max_age, timeout=timeout,
+                    max_retries=max_retries, rate_limit=rate_limit)
+
+        state, entry = self._cache_get(key)
+        self.metrics.incr("gateway_cache", source=source, tier="l1",
+                          result="miss" if state == "miss" else "hit")
+        if state != "miss":
+            self._incr("l1_hits")
+            if state == "fresh":
+                return Fetched(entry.value, entry.fetched_at)
+            if not require_fresh:
+                self._incr("stale_served")
+                self._revalidate(source, key, fn, load)
+                return Fetched(entry.value, entry.fetched_at, stale=True)
+        else:
+            self._incr("l1_misses")
+
+        # single-flight: the first miss on a key loads it, concurrent misses wait
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+            else:
+                flight.waiters += 1
+        if not leader:
+            flight.done.wait()
+            self._incr("coalesced")
+            if flight.ok:
+                return flight.result
+            # the flight we joined (possibly a background revalidation) failed:
+            # like the leader, serve a stale copy rather than none
+            state, entry = self._cache_get(key)
+            if state != "miss":
+                if state == "stale":
+                    self._incr("stale_served")
+                return Fetched(entry.value, entry.fetched_at, stale=(state == "stale"))
+            return self._degraded(source, key, fallback, flight.why)
 
-        hit, val = self._cache_get(key)
-        if hit:
-            return val
+        try:
+            # a previous leader may have landed between our miss and taking the
+            # lead; otherwise try the persistent tier before going upstream
+            state, entry = self._cache_get(key)
+            if state == "miss" and self._l2 is not None:
+                state, entry = self._l2_promote(key)
+                self.metrics.incr("gateway_cache", source=source, tier="l2",
+                                  result="miss" if state == "miss" else "hit")
+            if state == "fresh" or (state == "stale" and not require_fresh):
+                flight.ok = True
+                flight.result = Fetched(entry.value, entry.fetched_at, stale=(state == "stale"))
+            else:
+                flight.ok, flight.result, flight.why = self._load(source, key, fn, **load)
+                if not flight.ok and state == "stale":
+                    # the refetch failed: the stale value beats none (and is marked as such)
+                    flight.ok, flight.result = True, Fetched(entry.value, entry.fetched_at, stale=True)
+                    self._incr("stale_served")
+                    return flight.result
+        finally:
+            self._land(key, flight)
+        if not flight.ok:
+            return self._degraded(source, key, fallback, flight.why)
+        if flight.result.stale:
+            self._incr("stale_served")
+            self._revalidate(source, key, fn, load)
+        return flight.result
+
+    def fetch_many(
+        self,
+        source: str,
+        keys: dict[str, str],
+        batch_fn: Callable[[list[str]], dict[str, Any]],
+        *,
+        kind: str = "default",
+        ttl: Optional[float] = None,
+        max_age: Optional[float] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        rate_limit: int = 60,
+    ) -> dict[str, Union[Fetched, GatewayError]]:
+        """Batch counterpart of :meth:`fetch_result` for sources with a bulk endpoint.
+
+        ``keys`` maps item id -> cache key. Cached ids are served as usual (stale
+        ones revalidated one by one in the background); the misses are loaded
+        ``chunk_size`` at a time with ``batch_fn(ids) -> {id: value}`` and every
+        returned value lands under its own key, so later single-key fetches hit.
+        Ids that are already being loaded by another caller are joined, not
+        refetched. An id the batch did not return, or whose chunk failed, maps to
+        a :class:`GatewayError` instead of a :class:`Fetched`."""
+        ttl, max_age = self._ttls(kind, ttl, max_age)
+        timeout = timeout if timeout is not None else config.GATEWAY["batch_timeout"]
+        max_retries = max_retries if max_retries is not None else config.GATEWAY["max_retries"]
+        chunk_size = max(1, chunk_size or config.GATEWAY["batch_chunk"])
+        load = dict(ttl=ttl, max_age=max_age, timeout=config.GATEWAY["timeout"],
+                    max_retries=max_retries, rate_limit=rate_limit)
+
+        out: dict[str, Union[Fetched, GatewayError]] = {}
+        misses: list[str] = []
+        for item, key in keys.items():
+            state, entry = self._cache_get(key)
+            self.metrics.incr("gateway_cache", source=source, tier="l1",
+                              result="miss" if state == "miss" else "hit")
+            if state == "miss":
+                self._incr("l1_misses")
+                if self._l2 is not None:
+                    state, entry = self._l2_promote(key)
+                    self.metrics.incr("gateway_cache", source=source, tier="l2",
+                                      result="miss" if state == "miss" else "hit")
+            else:
+                self._incr("l1_hits")
+            if state == "miss":
+                misses.append(item)
+                continue
+            out[item] = Fetched(entry.value, entry.fetched_at, stale=(state == "stale"))
+            if state == "stale":
+                self._incr("stale_served")
+                self._revalidate(source, key, lambda i=item: batch_fn([i])[i], load)
+
+        # claim single-flight slots for the misses; join the ones already in flight
+        owned: dict[str, _Flight] = {}
+        joined: dict[str, _Flight] = {}
+        with self._lock:
+            for item in misses:
+                flight = self._inflight.get(keys[item])
+                if flight is None:
+                    owned[item] = self._inflight[keys[item]] = _Flight()
+                else:
+                    flight.waiters += 1
+                    joined[item] = flight
+
+        pending = list(owned)
+        try:
+            for i in range(0, len(pending), chunk_size):
+                chunk = pending[i:i + chunk_size]
+                ok, values, why = self._call(source, lambda c=chunk: batch_fn(c), timeout=timeout,
+                                             max_retries=max_retries, rate_limit=rate_limit)
+                for item in chunk:
+                    flight = owned[item]
+                    if ok and item in values:
+                        flight.ok = True
+                        flight.result = self._store(source, keys[item], values[item], ttl, max_age)
+                    else:
+                        flight.why = why or "not returned by batch"
+                    self._land(keys[item], flight)
+        finally:
+            for item, flight in owned.items():
+                if not flight.done.is_set():
+                    flight.why = flight.why or "batch aborted"
+                    self._land(keys[item], flight)
+
+        for item, flight in {**owned, **joined}.items():
+            if item in joined:
+                flight.done.wait()
+                self._incr("coalesced")
+            if flight.ok:
+                out[item] = flight.result
+            else:
+                self.metrics.incr("gateway_degraded", source=source, reason=flight.why.split(":", 1)[0])
+                out[item] = GatewayError(f"{source}:{keys[item]} degraded: {flight.why}")
+        return {item: out[item] for item in keys}
+
+    def gather(self, calls: dict[str, Callable[[], Any]], *,
+               deadline: Optional[float] = None) -> dict[str, Union[Any, GatewayError]]:
+        """Run independent calls (typically provider functions that fetch through
+        this gateway) concurrently and wait for all of them at most ``deadline``
+        seconds, so the caller pays the slowest latency instead of the sum.
+
+        A call that raised, or had not returned by the deadline, maps to a
+        :class:`GatewayError`; the others keep their results. A late call is not
+        cancelled — it still lands in the cache for the next caller. Calls must
+        not ``gather`` themselves (the pool is shared and bounded)."""
+        deadline = deadline if deadline is not None else config.GATEWAY["plan_deadline"]
+        t0 = time.monotonic()
+        futures = {name: self._fanout.submit(fn) for name, fn in calls.items()}
+        done, _ = wait(futures.values(), timeout=deadline)
+        self.metrics.observe("gateway_gather_ms", (time.monotonic() - t0) * 1000)
+        out: dict[str, Union[Any, GatewayError]] = {}
+        for name, fut in futures.items():
+            if fut not in done:
+                self.metrics.incr("gateway_gather", result="deadline")
+                out[name] = GatewayError(f"{name}: no result within the {deadline:g}s deadline")
+            elif fut.exception() is not None:
+                self.metrics.incr("gateway_gather", result="error")
+                out[name] = GatewayError(f"{name}: {fut.exception()}")
+            else:
+                self.metrics.incr("gateway_gather", result="ok")
+                out[name] = fut.result()
+        return out
+
+    def _land(self, key: str, flight: _Flight) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+        flight.done.set()
+
+    def _revalidate(self, source: str, key: str, fn: Callable[[], Any], load: dict) -> None:
+        """Refresh a stale entry in the background (at most one refresh per key)."""
+        with self._lock:
+            if key in self._inflight:
+                return
+            flight = self._inflight[key] = _Flight()
+        self._incr("revalidations")
 
+        def _run() -> None:
+            try:
+                flight.ok, flight.result, flight.why = self._load(source, key, fn, **load)
+            finally:
+                self._land(key, flight)
+
+        try:
+            self._refresher.submit(_run)
+        except RuntimeError:                   # pool shut down (interpreter exit)
+            self._land(key, flight)
+
+    def _load(self, source: str, key: str, fn: Callable[[], Any], *, ttl: float,
+              max_age: float, timeout: float, max_retries: int,
+              rate_limit: int) -> tuple[bool, Optional[Fetched], str]:
+        """Upstream load for a cache miss. Returns (ok, result, why-not)."""
+        ok, value, why = self._call(source, fn, timeout=timeout, max_retries=max_retries,
+                                    rate_limit=rate_limit)
+        if not ok:
+            return False, None, why
+        return True, self._store(source, key, value, ttl, max_age), ""
+
+    def _store(self, source: str, key: str, value: Any, ttl: float, max_age: float) -> Fetched:
+        entry = self._cache_set(key, value, ttl, max_age)
+        if self._l2 is not None:
+            self._l2.put(key, value, source=source, fetched_at=entry.fetched_at,
+                         fresh_for=ttl, max_age=max_age)
+        return Fetched(value, entry.fetched_at)
+
+    def _call(self, source: str, fn: Callable[[], Any], *, timeout: float, max_retries: int,
+              rate_limit: int) -> tuple[bool, Any, str]:
+        """One upstream call behind breaker, bulkhead, rate limit and retries.
+        Returns (ok, value, why-not)."""
         breaker = self.breaker(source)
         if breaker.is_open():
-            return self._degraded(source, key, fallback, "circuit open")
+            return False, None, "circuit open"
 
+        bulkhead = self.bulkhead(source)
+        if not bulkhead.admit():
+            return False, None, "bulkhead saturated by timed-out calls"
+
+        # pace bulk scans by queueing for a token instead of degrading at once
         limiter = self.limiter(source, rate_limit)
-        if not limiter.allow():
-            return self._degraded(source, key, fallback, "rate limit exceeded")
+        if not limiter.acquire(timeout=config.GATEWAY["rate_wait"]):
+            return False, None, "rate limit exceeded"
 
+        self._incr("upstream_loads")
         last_exc: Optional[Exception] = None
         for attempt in range(max_retries + 1):
+            if attempt:
+                self.metrics.incr("gateway_retries", source=source)
+            started = time.monotonic()
             try:
-                value = self._with_timeout(fn, timeout)
+                value = bulkhead.run(fn, timeout)
+                self.metrics.observe("gateway_latency_ms", (time.monotonic() - started) * 1000, source=source)
                 breaker.record_success()
-                self._cache_set(key, value, ttl)
-                return value
+                return True, value, ""
+            except BulkheadFull as exc:        # not the source's fault; don't trip the breaker
+                last_exc = exc
+                break
             except Exception as exc:           # noqa: BLE001 — gateway boundary
                 last_exc = exc
+                self.metrics.observe("gateway_latency_ms", (time.monotonic() - started) * 1000, source=source)
+                self.metrics.incr("gateway_errors", source=source)
                 breaker.record_failure()
                 if breaker.is_open():
                     break
                 if attempt < max_retries:
                     self._backoff(attempt)
-        return self._degraded(source, key, fallback, f"failed after retries: {last_exc}")
-
-    def _with_timeout(self, fn: Callable[[], Any], timeout: float) -> Any:
-        fut = self._executor.submit(fn)
-        try:
-            return fut.result(timeout=timeout)
-        except FutureTimeout as e:
-            fut.cancel()
-            raise TimeoutError(f"timeout after {timeout}s") from e
+        return False, None, f"failed after retries: {last_exc}"
 
     def _backoff(self, attempt: int) -> None:
         base = config.GATEWAY["base_backoff"]
@@ -173,10 +702,11 @@ class Gateway:
         delay += _RANDOM() * config.GATEWAY["jitter"]
         _SLEEP(delay)
 
-    def _degraded(self, source: str, key: str, fallback: Optional[Callable[[], Any]], why: str) -> Any:
+    def _degraded(self, source: str, key: str, fallback: Optional[Callable[[], Any]], why: str) -> Fetched:
+        self.metrics.incr("gateway_degraded", source=source, reason=why.split(":", 1)[0])
         if fallback is not None:
             try:
-                return fallback()
+                return Fetched(fallback(), _utcnow(), degraded=True)
             except Exception as e:  # noqa: BLE001
                 raise GatewayError(f"{source}:{key} degraded ({why}); fallback failed: {e}") from e
         raise GatewayError(f"{source}:{key} degraded: {why}")
@@ -189,9 +719,26 @@ _GATEWAY: Optional[Gateway] = None
 def gateway() -> Gateway:
     global _GATEWAY
     if _GATEWAY is None:
-        _GATEWAY = Gateway()
+        _GATEWAY = Gateway(l2=config.GATEWAY["l2_cache"])
     return _GATEWAY
 
 
 def fetch(source: str, key: str, fn: Callable[[], Any], **kw) -> Any:
     return gateway().fetch(source, key, fn, **kw)
+
+
+def fetch_result(source: str, key: str, fn: Callable[[], Any], **kw) -> Fetched:
+    return gateway().fetch_result(source, key, fn, **kw)
+
+
+def fetch_many(source: str, keys: dict[str, str], batch_fn: Callable[[list[str]], dict[str, Any]],
+               **kw) -> dict[str, Union[Fetched, GatewayError]]:
+    return gateway().fetch_many(source, keys, batch_fn, **kw)
+
+
+def gather(calls: dict[str, Callable[[], Any]], **kw) -> dict[str, Union[Any, GatewayError]]:
+    return gateway().gather(calls, **kw)
+
+
+def metrics_snapshot() -> dict[str, Any]:
+    return gateway().snapshot()
@@ -0,0 +1,317 @@
+"""
+investing/historical_backtest.py — offline replay of the decision core.
+
+:mod:`investing.backtest` scores the plans we actually issued. This module asks
+what the current code *would* have issued: it walks every universe ticker's
+stored history session by session, rebuilds :func:`setups.build_features` /
+:func:`setups.classify` on the trailing window, runs :func:`decision.decide`
+under a regime reconstructed for that session, and scores each READY_TO_ENTER
+with :func:`backtest.compute_outcome` over the following sessions.
+
+Tickers are independent, so they are spread over a process pool; each worker
+reads the bar store's files through ``numpy.memmap`` instead of having the
+arrays pickled to it. The per-setup expectancy table is what the config
+thresholds get validated against.
+
+Only the broad benchmark has a usable history of regime inputs (credit OAS,
+yield curve etc. are point-in-time fetches), so the reconstructed regime is the
+``spy_vs_ma200`` reading normalized against its trailing 250 sessions — the
+same scoring and percentile bands :func:`entry.market_regime` applies.
+"""
+
+from __future__ import annotations
+
+import datetime as _dt
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+from . import backtest, bar_store, config, decision, market_health, relative_strength, setups, universe
+from .data_quality import GateResult
+from .schemas import (AssetType, DataPoint, DataStatus, DecisionStatus, EventRiskAssessment,
+                      MarketContext, MarketRegime, PortfolioImpact)
+
+logger = logging.getLogger(__name__)
+
+_WARMUP = 200            # sessions before the first step (MA200 must exist)
+_HISTORY = 250           # trailing composites a regime reading is ranked against
+
+
+def reconstruct_regimes(dates: Sequence[int], closes: Sequence[float]) -> dict[int, str]:
+    """``{date ordinal: regime}`` from the broad benchmark's closes alone."""
+    c = np.asarray(closes, dtype=float)
+    ma200 = np.full(len(c), np.nan)
+    if len(c) >= 200:
+        cs = np.cumsum(np.insert(c, 0, 0.0))
+        ma200[199:] = (cs[200:] - cs[:-200]) / 200
+    history: list[float] = []
+    out: dict[int, str] = {}
+    for d, px, ma in zip(dates, c, ma200):
+        if np.isnan(ma) or not ma:
+            out[int(d)] = MarketRegime.UNKNOWN.value
+            continue
+        score = max(-1.0, min(1.0, (px / ma - 1) * 100 / 10.0))
+        composite, _, _ = market_health.compute_composite({"spy_vs_ma200": score})
+        ctx = market_health.build_context({"spy_vs_ma200": score}, history[-_HISTORY:])
+        out[int(d)] = ctx.regime.value
+        history.append(composite)
+    return out
+
+
+def _context(regime: str) -> MarketContext:
+    # read at call time: a calibration sweep overrides these per setting
+    return MarketContext(
+        regime=MarketRegime(regime),
+        required_rr=config.RR_MIN_BY_REGIME.get(regime, config.RR_MIN_BY_REGIME["UNKNOWN"]),
+        size_multiplier=config.SIZE_MULT_BY_REGIME.get(regime, config.SIZE_MULT_BY_REGIME["UNKNOWN"]),
+    )
+
+
+def _gate() -> GateResult:
+    g = GateResult()               # stored completed bars: complete, never stale
+    g.score, g.can_enter = 1.0, True
+    return g
+
+
+def _aligned(store: bar_store.BarStore, ticker: str, dates: np.ndarray) -> Optional[np.ndarray]:
+    """``ticker``'s closes on ``dates`` (last close at or before each; NaN
+    before its history starts), or None when it isn't stored."""
+    try:
+        m = store.memmap(ticker)
+    except (FileNotFoundError, ValueError):
+        return None
+    if not len(m):
+        return None
+    idx = np.searchsorted(m[:, 0], dates, side="right") - 1
+    return np.where(idx >= 0, m[np.maximum(idx, 0), 4], np.nan)
+
+
+@dataclass(frozen=True)
+class _Job:
+    ticker: str
+    root: str
+    regimes: dict[int, str]
+    start: int                     # first / last session ordinal replayed
+    end: int
+    horizon: int
+    lookback: int
+
+
+@dataclass
+class _Series:
+    """One ticker's memory-mapped columns plus its benchmarks on the same dates."""
+    dates: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    broad: np.ndarray
+    sector_closes: Optional[np.ndarray]
+    sector: str
+
+
+def load_series(job: _Job) -> Optional[_Series]:
+    store = bar_store.BarStore(job.root)
+    try:
+        m = store.memmap(job.ticker)
+    except (FileNotFoundError, ValueError):
+        return None
+    dates = m[:, 0].astype(np.int64)
+    broad = _aligned(store, universe.BROAD_BENCHMARK, dates)
+    if broad is None:
+        return None
+    sector = universe.sector_of(job.ticker)
+    bench = universe.SECTOR_BENCHMARK.get(sector)
+    sec = _aligned(store, bench, dates) if bench and bench != job.ticker else None
+    return _Series(dates, m[:, 1], m[:, 2], m[:, 3], m[:, 4], m[:, 6], broad, sec, sector)
+
+
+_RAW = ("closes", "highs", "lows", "volumes")
+
+
+def _raw(s: _Series, w: slice) -> dict:
+    return {"closes": s.close[w].tolist(), "highs": s.high[w].tolist(),
+            "lows": s.low[w].tolist(), "volumes": s.volume[w].tolist()}
+
+
+def features_at(job: _Job, s: _Series, i: int) -> Optional[dict]:
+    """The parameter-independent part of session ``i``'s feature bundle (RS and
+    the indicator blocks, without the raw series), or None on a benchmark gap.
+    Nothing here reads a config threshold, so a sweep computes it once."""
+    w = slice(max(0, i + 1 - job.lookback), i + 1)
+    b = s.broad[w]
+    if np.isnan(b).any():
+        return None
+    raw = _raw(s, w)
+    sec = s.sector_closes[w] if s.sector_closes is not None else None
+    rs = relative_strength.compute(raw["closes"], b.tolist(),
+                                   sec.tolist() if sec is not None and not np.isnan(sec).any() else None)
+    feat = setups.build_features(raw["closes"], raw["highs"], raw["lows"], raw["volumes"], rs)
+    return {k: v for k, v in feat.items() if k not in _RAW}
+
+
+def simulate(job: _Job, s: _Series, features: Callable[[int], Optional[dict]]) -> list[dict]:
+    """Every simulated entry for one ticker under the current config, with
+    ``features(i)`` supplying :func:`features_at` for session ``i``. One
+    position at a time: after an entry the next ``horizon`` sessions are skipped."""
+    n = len(s.dates)
+    first = max(_WARMUP, int(np.searchsorted(s.dates, job.start, side="left")))
+    last = min(n - 1 - job.horizon, int(np.searchsorted(s.dates, job.end, side="right")) - 1)
+    o, h, lo, c, v = s.open, s.high, s.low, s.close, s.volume
+    trades: list[dict] = []
+    i = first
+    while i <= last:
+        computed = features(i)
+        if computed is None:
+            i += 1
+            continue
+        setup = setups.classify({**_raw(s, slice(max(0, i + 1 - job.lookback), i + 1)), **computed})
+        if not setup.qualifies:                 # decide() would stop at NO_TRADE
+            i += 1
+            continue
+        day = _dt.date.fromordinal(int(s.dates[i]))
+        regime = job.regimes.get(int(s.dates[i]), MarketRegime.UNKNOWN.value)
+        price = float(c[i])
+        plan = decision.decide(
+            ticker=job.ticker, strategy=config.STRATEGY_POSITION,
+            horizon_sessions=job.horizon,
+            asset_type=AssetType.ETF if job.ticker in universe.KNOWN_ETFS else AssetType.EQUITY,
+            price_point=DataPoint(name="price", value=price, source="bar_store",
+                                  status=DataStatus.OK, age_seconds=0.0),
+            gate=_gate(), setup=setup, market=_context(regime), event=EventRiskAssessment(),
+            portfolio_impact=PortfolioImpact(sector=s.sector),
+            portfolio_value=config.DEFAULT_PORTFOLIO_VALUE,
+            risk_per_trade_pct=config.DEFAULT_RISK_PER_TRADE_PCT, sector=s.sector,
+            adv_dollars=float(np.mean(c[i - 19:i + 1] * v[i - 19:i + 1])), rs=computed["rs"],
+        )
+        if plan.decision_status != DecisionStatus.READY_TO_ENTER:
+            i += 1
+            continue
+        targets = [t for t in (plan.target_1, plan.target_2, plan.target_3) if t is not None]
+        ahead = [{"open": float(o[j]), "high": float(h[j]), "low": float(lo[j]), "close": float(c[j])}
+                 for j in range(i + 1, i + 1 + job.horizon)]
+        out = backtest.compute_outcome(price, plan.technical_stop, targets, ahead)
+        if out.pop("valid"):
+            trades.append({"ticker": job.ticker, "date": day.isoformat(), "sector": s.sector,
+                           "setup_type": setup.setup_type.value, "market_regime": regime,
+                           "entry": price, "stop": plan.technical_stop, **out})
+            i += job.horizon
+        i += 1
+    return trades
+
+
+def _replay(job: _Job) -> list[dict]:
+    s = load_series(job)
+    return simulate(job, s, lambda i: features_at(job, s, i)) if s is not None else []
+
+
+def summarize(trades: Sequence[dict]) -> dict:
+    """n, win rate, expectancy (``avg_r``, R per trade), MFE/MAE and target /
+    stop hit rates, in the shape of :func:`persistence.outcome_rollups`."""
+    if not trades:
+        return {"n": 0, "win_rate": None, "avg_r": None, "avg_win_r": None, "avg_loss_r": None,
+                "avg_mfe": None, "avg_mae": None, "target_1_rate": None, "stop_rate": None}
+    r = np.array([t["r_multiple"] for t in trades], dtype=float)
+    wins, losses = r[r > 0], r[r <= 0]
+    return {
+        "n": len(trades),
+        "win_rate": round(float(len(wins) / len(r)), 3),
+        "avg_r": round(float(r.mean()), 3),
+        "avg_win_r": round(float(wins.mean()), 3) if len(wins) else None,
+        "avg_loss_r": round(float(losses.mean()), 3) if len(losses) else None,
+        "avg_mfe": round(float(np.mean([t["mfe"] for t in trades])), 3),
+        "avg_mae": round(float(np.mean([t["mae"] for t in trades])), 3),
+        "target_1_rate": round(sum(bool(t["hit_target_1"]) for t in trades) / len(trades), 3),
+        "stop_rate": round(sum(bool(t["hit_stop"]) for t in trades) / len(trades), 3),
+    }
+
+
+def expectancy_table(trades: Sequence[dict], by: str = "setup_type") -> dict[str, dict]:
+    """:func:`summarize` per ``by`` value."""
+    groups: dict[str, list[dict]] = {}
+    for t in trades:
+        groups.setdefault(str(t.get(by)), []).append(t)
+    return {key: summarize(rows) for key, rows in sorted(groups.items())}
+
+
+@dataclass
+class BacktestResult:
+    start: _dt.date
+    end: _dt.date
+    horizon: int
+    tickers: list[str]
+    trades: list[dict] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def table(self, by: str = "setup_type") -> dict[str, dict]:
+        return expectancy_table(self.trades, by)
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    # spawn: the bot process runs gateway / scheduler threads a fork would copy mid-flight
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def prepare(tickers: Optional[Sequence[str]] = None, *, start: Optional[_dt.date] = None,
+            end: Optional[_dt.date] = None, horizon: Optional[int] = None,
+            root: Optional[str] = None, fetch: bool = False) -> list[_Job]:
+    """One replay job per ticker (default: the universe), sharing the regime
+    series of the broad benchmark. ``fetch`` first brings the bar store up to
+    ``HISTORICAL_BACKTEST["period"]`` for the tickers and benchmarks."""
+    cfg = config.HISTORICAL_BACKTEST
+    tickers = sorted(tickers if tickers is not None else set(universe.WATCHLIST) | set(universe.SECTOR_OF))
+    if not tickers:
+        raise ValueError("no tickers to replay")
+    horizon = horizon or cfg["horizon"]
+    end = end or _dt.date.today()
+    start = start or bar_store.period_start(cfg["period"], end)
+    if fetch:
+        from .providers import market_data
+        benches = set(universe.SECTOR_BENCHMARK.values()) | {universe.BROAD_BENCHMARK}
+        market_data.get_bars_many(sorted(set(tickers) | benches), period=cfg["period"])
+
+    store = bar_store.BarStore(root) if root else bar_store.store()
+    try:
+        broad = store.memmap(universe.BROAD_BENCHMARK)
+    except FileNotFoundError:
+        raise ValueError(f"{universe.BROAD_BENCHMARK} is not in the bar store") from None
+    regimes = reconstruct_regimes(broad[:, 0].astype(np.int64), broad[:, 4])
+    return [_Job(t, store.root, regimes, start.toordinal(), end.toordinal(), horizon, cfg["lookback"])
+            for t in tickers]
+
+
+def map_jobs(fn: Callable, items: Sequence, workers: Optional[int] = None):
+    """``map(fn, items)`` over the process pool (``workers=0``: in-process),
+    in order. ``fn`` must be a module-level function."""
+    workers = config.HISTORICAL_BACKTEST["workers"] if workers is None else workers
+    if workers == 0 or len(items) <= 1:
+        yield from map(fn, items)
+        return
+    with _pool(min(workers or os.cpu_count() or 1, len(items))) as pool:
+        yield from pool.map(fn, items)
+
+
+def run(tickers: Optional[Sequence[str]] = None, *, start: Optional[_dt.date] = None,
+        end: Optional[_dt.date] = None, horizon: Optional[int] = None,
+        workers: Optional[int] = None, root: Optional[str] = None,
+        fetch: bool = False) -> BacktestResult:
+    """Replay ``tickers`` (default: the universe) between ``start`` and ``end``
+    (see :func:`prepare`). ``workers=0`` replays in-process."""
+    t0 = time.monotonic()
+    todo = prepare(tickers, start=start, end=end, horizon=horizon, root=root, fetch=fetch)
+    trades: list[dict] = []
+    for rows in map_jobs(_replay, todo, workers):
+        trades.extend(rows)
+    job = todo[0]
+    result = BacktestResult(_dt.date.fromordinal(job.start), _dt.date.fromordinal(job.end), job.horizon,
+                            [j.ticker for j in todo], trades, round(time.monotonic() - t0, 2))
+    logger.info("historical backtest: %d tickers, %d trades in %.1fs",
+                len(result.tickers), len(trades), result.seconds)
+    return result
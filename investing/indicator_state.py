@@ -0,0 +1,229 @@
+"""
+investing/indicator_state.py — streaming (incremental) indicators.
+
+The functions in :mod:`investing.indicators` recompute Wilder RSI / ATR from the
+first bar on every call. The objects here keep the running state instead and
+take one bar at a time in O(1), producing exactly the same numbers as the list
+functions over the same history. :class:`IndicatorState` bundles the set the
+decision core reads and round-trips through a plain dict, so the bar store can
+persist it next to each ticker's bars (see :meth:`BarStore.indicators`).
+
+:meth:`IndicatorState.peek` evaluates a tentative live bar (an intraday quote)
+without committing it, so a quote refresh costs one step, not a recompute.
+"""
+
+from __future__ import annotations
+
+import copy
+import datetime as _dt
+from collections import deque
+from typing import Optional
+
+STATE_VERSION = 1
+
+
+class StreamingSMA:
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self._win: deque[float] = deque(maxlen=n)
+
+    def update(self, value: float) -> None:
+        self._win.append(float(value))
+
+    @property
+    def value(self) -> Optional[float]:
+        # summed on read (n <= a few dozen) so the result is bit-identical to sma()
+        if len(self._win) < self.n or self.n <= 0:
+            return None
+        return sum(self._win) / self.n
+
+    def state(self) -> dict:
+        return {"n": self.n, "win": list(self._win)}
+
+    @classmethod
+    def from_state(cls, st: dict) -> "StreamingSMA":
+        obj = cls(st["n"])
+        obj._win.extend(st["win"])
+        return obj
+
+
+class StreamingEMA:
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self.value: Optional[float] = None
+
+    def update(self, value: float) -> None:
+        k = 2 / (self.n + 1)
+        self.value = float(value) if self.value is None else value * k + self.value * (1 - k)
+
+    def state(self) -> dict:
+        return {"n": self.n, "value": self.value}
+
+    @classmethod
+    def from_state(cls, st: dict) -> "StreamingEMA":
+        obj = cls(st["n"])
+        obj.value = st["value"]
+        return obj
+
+
+class _Wilder:
+    """Mean of the first ``period`` inputs, then ``(avg*(p-1) + x) / p``."""
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.count = 0
+        self.acc = 0.0            # running sum during warm-up, then the average
+
+    def update(self, x: float) -> None:
+        self.count += 1
+        if self.count <= self.period:
+            self.acc += x
+            if self.count == self.period:
+                self.acc /= self.period
+        else:
+            self.acc = (self.acc * (self.period - 1) + x) / self.period
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.acc if self.count >= self.period else None
+
+    def state(self) -> dict:
+        return {"period": self.period, "count": self.count, "acc": self.acc}
+
+    @classmethod
+    def from_state(cls, st: dict) -> "_Wilder":
+        obj = cls(st["period"])
+        obj.count, obj.acc = st["count"], st["acc"]
+        return obj
+
+
+class StreamingRSI:
+    """Wilder's RSI, identical to :func:`investing.indicators.rsi`."""
+
+    def __init__(self, period: int = 14) -> None:
+        self.period = period
+        self.prev: Optional[float] = None
+        self._gain = _Wilder(period)
+        self._loss = _Wilder(period)
+
+    def update(self, close: float) -> None:
+        if self.prev is not None:
+            d = close - self.prev
+            self._gain.update(max(d, 0.0))
+            self._loss.update(max(-d, 0.0))
+        self.prev = float(close)
+
+    @property
+    def value(self) -> Optional[float]:
+        g, lo = self._gain.value, self._loss.value
+        if g is None or lo is None:
+            return None
+        if lo == 0:
+            return 100.0
+        return 100 - 100 / (1 + g / lo)
+
+    def state(self) -> dict:
+        return {"period": self.period, "prev": self.prev,
+                "gain": self._gain.state(), "loss": self._loss.state()}
+
+    @classmethod
+    def from_state(cls, st: dict) -> "StreamingRSI":
+        obj = cls(st["period"])
+        obj.prev = st["prev"]
+        obj._gain = _Wilder.from_state(st["gain"])
+        obj._loss = _Wilder.from_state(st["loss"])
+        return obj
+
+
+class StreamingATR:
+    """Wilder's ATR, identical to :func:`investing.indicators.atr`."""
+
+    def __init__(self, period: int = 14) -> None:
+        self.period = period
+        self.prev_close: Optional[float] = None
+        self._avg = _Wilder(period)
+
+    def update(self, high: float, low: float, close: float) -> None:
+        if self.prev_close is not None:
+            pc = self.prev_close
+            self._avg.update(max(high - low, abs(high - pc), abs(low - pc)))
+        self.prev_close = float(close)
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._avg.value
+
+    def state(self) -> dict:
+        return {"period": self.period, "prev_close": self.prev_close, "avg": self._avg.state()}
+
+    @classmethod
+    def from_state(cls, st: dict) -> "StreamingATR":
+        obj = cls(st["period"])
+        obj.prev_close = st["prev_close"]
+        obj._avg = _Wilder.from_state(st["avg"])
+        return obj
+
+
+class IndicatorState:
+    """The per-ticker set: SMA20/50, EMA21, RSI14, ATR14 and the 50-session
+    volume average, advanced bar by bar."""
+
+    def __init__(self) -> None:
+        self.last_date: Optional[_dt.date] = None
+        self.bars = 0
+        self.sma20 = StreamingSMA(20)
+        self.sma50 = StreamingSMA(50)
+        self.ema21 = StreamingEMA(21)
+        self.rsi14 = StreamingRSI(14)
+        self.atr14 = StreamingATR(14)
+        self.vol50 = StreamingSMA(50)
+
+    def update(self, date: _dt.date, high: float, low: float, close: float, volume: float) -> bool:
+        """Advance by one completed session. Sessions at or before
+        :attr:`last_date` are ignored (refreshes overlap), returns False for them."""
+        if self.last_date is not None and date <= self.last_date:
+            return False
+        self.sma20.update(close)
+        self.sma50.update(close)
+        self.ema21.update(close)
+        self.rsi14.update(close)
+        self.atr14.update(high, low, close)
+        self.vol50.update(volume)
+        self.last_date = date
+        self.bars += 1
+        return True
+
+    def values(self) -> dict[str, Optional[float]]:
+        return {"ma20": self.sma20.value, "ma50": self.sma50.value, "ema21": self.ema21.value,
+                "rsi14": self.rsi14.value, "atr": self.atr14.value, "avg_volume50": self.vol50.value,
+                "as_of": self.last_date.isoformat() if self.last_date else None}
+
+    def peek(self, high: float, low: float, close: float, volume: float = 0.0,
+             date: Optional[_dt.date] = None) -> dict[str, Optional[float]]:
+        """Values as if a live (not yet completed) bar were appended; the state
+        itself is left untouched."""
+        tmp = copy.deepcopy(self)
+        tmp.last_date = None
+        tmp.update(date or _dt.date.max, high, low, close, volume)
+        return tmp.values()
+
+    def state(self) -> dict:
+        return {"v": STATE_VERSION, "last_date": self.last_date.isoformat() if self.last_date else None,
+                "bars": self.bars, "sma20": self.sma20.state(), "sma50": self.sma50.state(),
+                "ema21": self.ema21.state(), "rsi14": self.rsi14.state(),
+                "atr14": self.atr14.state(), "vol50": self.vol50.state()}
+
+    @classmethod
+    def from_state(cls, st: dict) -> "IndicatorState":
+        if st.get("v") != STATE_VERSION:
+            raise ValueError("indicator state version mismatch")
+        obj = cls()
+        obj.last_date = _dt.date.fromisoformat(st["last_date"]) if st["last_date"] else None
+        obj.bars = st["bars"]
+        obj.sma20 = StreamingSMA.from_state(st["sma20"])
+        obj.sma50 = StreamingSMA.from_state(st["sma50"])
+        obj.ema21 = StreamingEMA.from_state(st["ema21"])
+        obj.rsi14 = StreamingRSI.from_state(st["rsi14"])
+        obj.atr14 = StreamingATR.from_state(st["atr14"])
+        obj.vol50 = StreamingSMA.from_state(st["vol50"])
+        return obj
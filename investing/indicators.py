@@ -3,7 +3,8 @@ investing/indicators.py — pure-Python technical indicators.
 
 No pandas / numpy dependency on purpose: the decision core must import and run
 (and be unit-tested) without the heavy data stack. Inputs are plain lists of
-floats, oldest-first.
+floats, oldest-first. :mod:`investing.indicators_np` is the optional vectorized
+twin for whole-universe scans; this module stays the reference.
 """
 
 from __future__ import annotations
@@ -177,16 +178,19 @@ def higher_low(lows: Sequence[float], lookback: int = 20) -> Optional[bool]:
 
 
 def extension_metrics(closes: Sequence[float], highs: Sequence[float], lows: Sequence[float],
-                      volumes: Sequence[float]) -> dict:
-    """Move-extension features. RSI is just ONE of these — never decisive alone."""
+                      volumes: Sequence[float], streamed: Optional[dict] = None) -> dict:
+    """Move-extension features. RSI is just ONE of these — never decisive alone.
+    ``streamed`` (:meth:`IndicatorState.values` as of the last bar) supplies ATR,
+    RSI and the moving averages instead of recomputing them over the series."""
     if not closes:
         return {"price": None, "atr": None, "rsi14": None, "dist_from_pivot_atr": None,
                 "dist_from_ma20_atr": None, "dist_from_ma50_atr": None, "consecutive_up": 0,
                 "parabolic": None, "volume_ratio_1d": None, "ma20": None, "ma50": None, "pivot": None}
     price = closes[-1]
-    a = atr(highs, lows, closes) or 0.0
-    ma20 = sma(closes, 20)
-    ma50 = sma(closes, 50)
+    if streamed is not None:
+        a, ma20, ma50, r = streamed["atr"] or 0.0, streamed["ma20"], streamed["ma50"], streamed["rsi14"]
+    else:
+        a, ma20, ma50, r = atr(highs, lows, closes) or 0.0, sma(closes, 20), sma(closes, 50), rsi(closes)
     piv = pivot_high(highs)
 
     def atr_dist(level: Optional[float]) -> Optional[float]:
@@ -197,7 +201,7 @@ def extension_metrics(closes: Sequence[float], highs: Sequence[float], lows: Seq
     return {
         "price": price,
         "atr": round(a, 4) if a else None,
-        "rsi14": rsi(closes),
+        "rsi14": r,
         "dist_from_pivot_atr": atr_dist(piv),
         "dist_from_ma20_atr": atr_dist(ma20),
         "dist_from_ma50_atr": atr_dist(ma50),
@@ -0,0 +1,308 @@
+"""
+investing/indicators_np.py — vectorized NumPy counterpart of :mod:`investing.indicators`.
+
+Same functions, same parameters, but every input is a 2-D float array of shape
+(tickers, sessions), oldest-first along axis 1, so one call covers the whole
+scan universe. Histories of different lengths are left-padded with NaN (see
+:func:`stack`). Where the pure-Python function returns a scalar, this returns a
+1-D array over tickers; ``None`` becomes NaN and booleans become 1.0 / 0.0.
+:func:`to_records` turns a result dict back into the per-ticker dicts the
+decision core consumes.
+
+Optional: only callers that want the batch path import this module. The
+pure-Python module stays the reference implementation; the parity tests keep
+the two identical.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Sequence
+
+import numpy as np
+
+# result columns that the list version returns as bool / int
+_BOOL = frozenset({"volatility_contraction", "volume_contraction", "higher_low", "parabolic"})
+_INT = frozenset({"consecutive_up", "base_length"})
+
+
+def stack(series: Sequence[Sequence[float]]) -> np.ndarray:
+    """Right-align ragged oldest-first series into a NaN-padded 2-D array."""
+    width = max((len(s) for s in series), default=0)
+    out = np.full((len(series), width), np.nan)
+    for i, s in enumerate(series):
+        if len(s):
+            out[i, width - len(s):] = s
+    return out
+
+
+def lengths(x: np.ndarray) -> np.ndarray:
+    """Number of real (non-padding) sessions per row."""
+    if not x.shape[1]:
+        return np.zeros(x.shape[0], dtype=int)
+    valid = ~np.isnan(x)
+    first = np.where(valid.any(axis=1), valid.argmax(axis=1), x.shape[1])
+    return x.shape[1] - first
+
+
+def to_records(metrics: dict[str, np.ndarray]) -> list[dict]:
+    """Column dict of arrays -> one plain dict per ticker, typed like the list
+    version's results (NaN -> None, flags -> bool, counts -> int)."""
+    n = len(next(iter(metrics.values()))) if metrics else 0
+    out = []
+    for i in range(n):
+        rec = {}
+        for k, arr in metrics.items():
+            v = arr[i].item()
+            if isinstance(v, float) and math.isnan(v):
+                v = None
+            elif k in _BOOL:
+                v = bool(v)
+            elif k in _INT:
+                v = int(v)
+            rec[k] = v
+        out.append(rec)
+    return out
+
+
+def _rows(x: np.ndarray) -> np.ndarray:
+    return np.arange(x.shape[0])
+
+
+def _col(x: np.ndarray, i: int) -> np.ndarray:
+    """Column ``i`` counted from the end (1 = last); NaN where out of range."""
+    if i > x.shape[1]:
+        return np.full(x.shape[0], np.nan)
+    return x[:, -i]
+
+
+def _wilder(v: np.ndarray, start: np.ndarray, end: np.ndarray, period: int) -> np.ndarray:
+    """Wilder smoothing of ``v[r, start[r]:end[r]]`` per row: mean of the first
+    ``period`` values, then ``(avg*(p-1) + x) / p``. NaN where fewer than
+    ``period`` values are available."""
+    rows = _rows(v)
+    ok = (end - start) >= period
+    init_end = np.where(ok, start + period, v.shape[1] + 1)
+    idx = np.clip(start[:, None] + np.arange(period), 0, max(v.shape[1] - 1, 0))
+    avg = np.full(v.shape[0], np.nan)
+    if v.shape[1] and ok.any():
+        avg[ok] = v[rows[:, None], idx][ok].sum(axis=1) / period
+        for j in range(int(init_end[ok].min()), int(end[ok].max())):
+            upd = ok & (j >= init_end) & (j < end)
+            if upd.any():
+                avg[upd] = (avg[upd] * (period - 1) + v[upd, j]) / period
+    return avg
+
+
+def sma(values: np.ndarray, n: int) -> np.ndarray:
+    if n <= 0 or n > values.shape[1]:
+        return np.full(values.shape[0], np.nan)
+    out = values[:, -n:].mean(axis=1)
+    return np.where(lengths(values) >= n, out, np.nan)
+
+
+def ema_series(values: np.ndarray, n: int) -> np.ndarray:
+    out = np.full(values.shape, np.nan)
+    if n <= 0 or not values.size:
+        return out
+    k = 2 / (n + 1)
+    prev = np.full(values.shape[0], np.nan)
+    for j in range(values.shape[1]):
+        v = values[:, j]
+        prev = np.where(np.isnan(prev), v, v * k + prev * (1 - k))
+        out[:, j] = prev
+    return out
+
+
+def rsi(closes: np.ndarray, period: int = 14) -> np.ndarray:
+    """Wilder's RSI."""
+    d = np.diff(closes, axis=1)
+    gains, losses = np.maximum(d, 0.0), np.maximum(-d, 0.0)
+    n = lengths(closes)
+    start = closes.shape[1] - n
+    end = np.full(len(n), d.shape[1])
+    avg_gain = _wilder(gains, start, end, period)
+    avg_loss = _wilder(losses, start, end, period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100 - 100 / (1 + avg_gain / avg_loss)
+    out = np.where(avg_loss == 0, 100.0, out)
+    return np.where(n >= period + 1, out, np.nan)
+
+
+def true_ranges(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> np.ndarray:
+    """Shape (tickers, sessions - 1); column k is the range of session k + 1."""
+    h, lo, pc = highs[:, 1:], lows[:, 1:], closes[:, :-1]
+    return np.maximum(h - lo, np.maximum(np.abs(h - pc), np.abs(lo - pc)))
+
+
+def atr(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, period: int = 14) -> np.ndarray:
+    """Wilder's ATR (absolute, in price units)."""
+    trs = true_ranges(highs, lows, closes)
+    start = closes.shape[1] - lengths(closes)
+    return _wilder(trs, start, np.full(len(start), trs.shape[1]), period)
+
+
+def pct_return(closes: np.ndarray, n: int) -> np.ndarray:
+    base = _col(closes, n + 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = (_col(closes, 1) / base - 1) * 100.0
+    return np.where((lengths(closes) > n) & (base != 0), out, np.nan)
+
+
+def consecutive_up_sessions(closes: np.ndarray) -> np.ndarray:
+    up = closes[:, 1:] > closes[:, :-1]
+    return np.cumprod(up[:, ::-1], axis=1).sum(axis=1)
+
+
+def daily_returns(closes: np.ndarray) -> np.ndarray:
+    """Shape (tickers, sessions - 1). Unlike the list version, a zero previous
+    close yields NaN in place instead of dropping the element."""
+    prev = closes[:, :-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(prev != 0, closes[:, 1:] / prev - 1, np.nan)
+
+
+def stdev(values: np.ndarray) -> np.ndarray:
+    """Sample standard deviation per row over its real sessions."""
+    n = (~np.isnan(values)).sum(axis=1)
+    out = np.full(values.shape[0], np.nan)
+    ok = n >= 2
+    if ok.any():
+        out[ok] = np.nanstd(values[ok], axis=1, ddof=1)
+    return out
+
+
+def pivot_high(highs: np.ndarray, lookback: int = 60, exclude_recent: int = 3) -> np.ndarray:
+    """Highest swing high of the base (excludes the last few bars)."""
+    width = highs.shape[1]
+    lb = np.minimum(lookback, lengths(highs))
+    excl = np.where((exclude_recent > 0) & (lb > exclude_recent), exclude_recent, 0)
+    cols = np.arange(width)
+    mask = (cols >= (width - lb)[:, None]) & (cols < (width - excl)[:, None])
+    out = np.where(mask, highs, -np.inf).max(axis=1) if width else np.full(len(lb), -np.inf)
+    return np.where(mask.any(axis=1), out, np.nan)
+
+
+def base_stats(closes: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+               lookback: int = 60) -> dict[str, np.ndarray]:
+    """Consolidation/base metrics used by the setup classifier. Both ATRs come
+    from one true-range array instead of re-slicing the series."""
+    width = closes.shape[1]
+    n = lengths(closes)
+    w = np.minimum(lookback, n)
+    first = width - w
+    cols = np.arange(width)
+    in_win = cols >= first[:, None]
+    hi = np.where(in_win, highs, -np.inf).max(axis=1) if width else np.full(len(n), np.nan)
+    lo = np.where(in_win, lows, np.inf).min(axis=1) if width else np.full(len(n), np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        depth = np.where(hi != 0, np.round((hi - lo) / hi * 100, 2), np.nan)
+
+    # Volatility contraction: ATR over the last third vs the first third of base.
+    third = np.maximum(10, w // 3)
+    trs = true_ranges(highs, lows, closes)
+    early_end = np.minimum(width, first + 2 * third)
+    atr_early = _wilder(trs, first, early_end - 1, 14)
+    late_first = np.maximum(first, width - third - 1)
+    atr_late = _wilder(trs, late_first, np.full(len(n), width - 1), 14)
+    both = (np.nan_to_num(atr_early) != 0) & (np.nan_to_num(atr_late) != 0)
+    contraction = np.where(both, (atr_late < atr_early).astype(float), np.nan)
+
+    ok = n >= 20
+    nan = np.nan
+    return {
+        "base_high": np.where(ok, hi, nan),
+        "base_low": np.where(ok, lo, nan),
+        "base_depth_pct": np.where(ok, depth, nan),
+        "base_length": np.where(ok, w, nan),
+        "atr_early": np.where(ok, atr_early, nan),
+        "atr_late": np.where(ok, atr_late, nan),
+        "volatility_contraction": np.where(ok, contraction, nan),
+    }
+
+
+def volume_contraction(volumes: np.ndarray, lookback: int = 30) -> np.ndarray:
+    if lookback > volumes.shape[1]:
+        return np.full(volumes.shape[0], np.nan)
+    win = volumes[:, -lookback:]
+    half = lookback // 2
+    early = win[:, :half].mean(axis=1) if half else np.zeros(len(win))
+    late = win[:, half:].mean(axis=1) if lookback - half else np.zeros(len(win))
+    ok = (lengths(volumes) >= lookback) & (early != 0)
+    return np.where(ok, (late < early).astype(float), np.nan)
+
+
+def volume_ratio(volumes: np.ndarray, n: int = 1, base: int = 50) -> np.ndarray:
+    """Recent volume vs average; >1 means above-average activity."""
+    if base + n > volumes.shape[1]:
+        return np.full(volumes.shape[0], np.nan)
+    recent = volumes[:, -n:].mean(axis=1)
+    avg = volumes[:, -base - n:-n].mean(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = recent / avg
+    return np.where((lengths(volumes) >= base + n) & (avg != 0), out, np.nan)
+
+
+def parabolic_acceleration(closes: np.ndarray) -> np.ndarray:
+    c1, c6, c11 = _col(closes, 1), _col(closes, 6), _col(closes, 11)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        recent = c1 / c6 - 1
+        prior = c6 / c11 - 1
+    out = (recent > 0) & (recent > 2 * np.maximum(prior, 0.0001))
+    ok = (lengths(closes) >= 11) & (c6 != 0) & (c11 != 0)
+    return np.where(ok, out.astype(float), np.nan)
+
+
+def higher_low(lows: np.ndarray, lookback: int = 20) -> np.ndarray:
+    if 2 * lookback > lows.shape[1]:
+        return np.full(lows.shape[0], np.nan)
+    prev = lows[:, -2 * lookback:-lookback].min(axis=1)
+    recent = lows[:, -lookback:].min(axis=1)
+    return np.where(lengths(lows) >= 2 * lookback, (recent > prev).astype(float), np.nan)
+
+
+def extension_metrics(closes: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+                      volumes: np.ndarray) -> dict[str, np.ndarray]:
+    """Move-extension features for every ticker at once."""
+    n = lengths(closes)
+    price = np.where(n > 0, _col(closes, 1), np.nan) if closes.shape[1] else np.full(len(n), np.nan)
+    a = np.nan_to_num(atr(highs, lows, closes))
+    ma20 = sma(closes, 20)
+    ma50 = sma(closes, 50)
+    piv = pivot_high(highs)
+
+    def atr_dist(level: np.ndarray) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(a != 0, np.round((price - level) / a, 2), np.nan)
+
+    return {
+        "price": price,
+        "atr": np.where(a != 0, np.round(a, 4), np.nan),
+        "rsi14": rsi(closes),
+        "dist_from_pivot_atr": atr_dist(piv),
+        "dist_from_ma20_atr": atr_dist(ma20),
+        "dist_from_ma50_atr": atr_dist(ma50),
+        "consecutive_up": consecutive_up_sessions(closes),
+        "parabolic": parabolic_acceleration(closes),
+        "volume_ratio_1d": volume_ratio(volumes, 1),
+        "ma20": ma20,
+        "ma50": ma50,
+        "pivot": piv,
+    }
+
+
+def scan(bars: dict[str, dict]) -> dict[str, dict]:
+    """Every indicator :func:`investing.setups.build_features` derives, for a
+    universe of ``{ticker: {closes, highs, lows, volumes}}`` in one pass:
+    ``{ticker: {"ext", "base", "volume_contraction", "higher_low"}}``."""
+    tickers = list(bars)
+    c = stack([bars[t]["closes"] for t in tickers])
+    h = stack([bars[t]["highs"] for t in tickers])
+    lo = stack([bars[t]["lows"] for t in tickers])
+    v = stack([bars[t]["volumes"] for t in tickers])
+    ext = to_records(extension_metrics(c, h, lo, v))
+    base = to_records(base_stats(c, h, lo))
+    flags = to_records({"volume_contraction": volume_contraction(v), "higher_low": higher_low(lo)})
+    n = lengths(c)
+    return {t: {"ext": ext[i], "base": base[i] if n[i] >= 20 else {}, **flags[i]}
+            for i, t in enumerate(tickers)}
@@ -13,6 +13,7 @@ quantity/status field, so it structurally cannot make the final decision.
 
 from __future__ import annotations
 
+import datetime as _dt
 import json
 import logging
 from typing import Any, Optional, Type, TypeVar
@@ -134,3 +135,26 @@ def extract_qualitative(*, system: str, user: str, client: Optional[Any] = None)
     """Convenience wrapper: get validated :class:`LLMQualitative` from news/context."""
     return structured_call(LLMQualitative, system=system, user=user,
                            tool_name="submit_qualitative", client=client)
+
+
+def cached_qualitative(ticker: str, *, system: str, user: str, client: Optional[Any] = None,
+                       day: Optional[str] = None, db_path: Optional[str] = None) -> LLMQualitative:
+    """:func:`extract_qualitative` cached per ``(ticker, day, model)`` in SQLite,
+    so repeated plans for the same name on the same day cost no tokens. ``day``
+    defaults to today's UTC date."""
+    from . import persistence
+
+    day = day or _dt.datetime.now(_dt.timezone.utc).date().isoformat()
+    model = config.CLAUDE_MODEL_PRIMARY
+    try:
+        hit = persistence.llm_get(ticker, day, model, db_path=db_path)
+        if hit is not None:
+            return LLMQualitative.model_validate(hit)
+    except Exception as e:                   # noqa: BLE001 — cache must never block the call
+        logger.debug("llm cache read failed for %s: %s", ticker, e)
+    out = extract_qualitative(system=system, user=user, client=client)
+    try:
+        persistence.llm_put(ticker, day, model, out.model_dump(mode="json"), db_path=db_path)
+    except Exception as e:                   # noqa: BLE001
+        logger.debug("llm cache write failed for %s: %s", ticker, e)
+    return out
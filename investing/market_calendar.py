@@ -3,13 +3,22 @@ investing/market_calendar.py — XNYS (NYSE) trading calendar, computed in UTC.
 
 The pre-US-open brief must be scheduled relative to the *actual* XNYS open
 (open − 45 min by default), accounting for weekends, US market holidays, early
-closes and the US/Europe DST mismatch. All public functions return tz-aware UTC
-datetimes. Uses zoneinfo for America/New_York so DST is handled correctly.
+closes, unscheduled closures (``SPECIAL_CLOSURES``) and the US/Europe DST
+mismatch. All public functions return tz-aware UTC datetimes. Uses zoneinfo
+for America/New_York so DST is handled correctly.
+
+Session arithmetic ("sessions between two dates", "20 sessions after X") goes
+through a precomputed index: every session from 1990 to 2079 as a sorted array
+of date ordinals, searched with bisect. Dates outside that span fall back to
+walking the calendar day by day.
 """
 
 from __future__ import annotations
 
+import bisect
 import datetime as _dt
+import threading
+from array import array
 from functools import lru_cache
 from zoneinfo import ZoneInfo
 
@@ -62,11 +71,24 @@ def _observed(d: _dt.date) -> _dt.date:
     return d
 
 
+# Unscheduled full-day closures the rules can't produce: national days of
+# mourning, 9/11 and Hurricane Sandy.
+SPECIAL_CLOSURES = frozenset({
+    _dt.date(1994, 4, 27),                                     # Nixon
+    _dt.date(2001, 9, 11), _dt.date(2001, 9, 12),              # 9/11
+    _dt.date(2001, 9, 13), _dt.date(2001, 9, 14),
+    _dt.date(2004, 6, 11),                                     # Reagan
+    _dt.date(2007, 1, 2),                                      # Ford
+    _dt.date(2012, 10, 29), _dt.date(2012, 10, 30),            # Sandy
+    _dt.date(2018, 12, 5),                                     # G. H. W. Bush
+    _dt.date(2025, 1, 9),                                      # Carter
+})
+
+
 @lru_cache(maxsize=32)
 def holidays(year: int) -> frozenset[_dt.date]:
     hs = {
         _observed(_dt.date(year, 1, 1)),                       # New Year's
-        _nth_weekday(year, 1, 0, 3),                           # MLK
         _nth_weekday(year, 2, 0, 3),                           # Washington
         _easter(year) - _dt.timedelta(days=2),                 # Good Friday
         _nth_weekday(year, 5, 0, -1),                          # Memorial Day
@@ -75,8 +97,11 @@ def holidays(year: int) -> frozenset[_dt.date]:
         _nth_weekday(year, 11, 3, 4),                          # Thanksgiving
         _observed(_dt.date(year, 12, 25)),                     # Christmas
     }
+    if year >= 1998:
+        hs.add(_nth_weekday(year, 1, 0, 3))                    # MLK
     if year >= 2022:
         hs.add(_observed(_dt.date(year, 6, 19)))               # Juneteenth
+    hs.update(d for d in SPECIAL_CLOSURES if d.year == year)
     return frozenset(hs)
 
 
@@ -95,10 +120,52 @@ def early_closes(year: int) -> frozenset[_dt.date]:
     return frozenset(c for c in closes if c not in holidays(year))
 
 
-def is_trading_day(d: _dt.date) -> bool:
+def _is_session(d: _dt.date) -> bool:
     return d.weekday() < 5 and d not in holidays(d.year)
 
 
+_INDEX_FIRST = _dt.date(1990, 1, 1)
+_INDEX_LAST = _dt.date(2079, 12, 31)
+_INDEX: array | None = None
+_INDEX_LOCK = threading.Lock()
+
+
+def _sessions() -> array:
+    """Ordinals of every session in [_INDEX_FIRST, _INDEX_LAST] (~22.7k, 4 bytes each)."""
+    global _INDEX
+    if _INDEX is None:
+        with _INDEX_LOCK:
+            if _INDEX is None:
+                _INDEX = array("i", (o for o in range(_INDEX_FIRST.toordinal(), _INDEX_LAST.toordinal() + 1)
+                                     if _is_session(_dt.date.fromordinal(o))))
+    return _INDEX
+
+
+def _indexed(*days: _dt.date) -> bool:
+    return all(_INDEX_FIRST <= d <= _INDEX_LAST for d in days)
+
+
+def is_trading_day(d: _dt.date) -> bool:
+    if not _indexed(d):
+        return _is_session(d)
+    idx, o = _sessions(), d.toordinal()
+    i = bisect.bisect_left(idx, o)
+    return i < len(idx) and idx[i] == o
+
+
+def session_ordinal(d: _dt.date) -> int:
+    """Position of session ``d`` in the session index: consecutive sessions
+    differ by exactly 1, so the difference of two ordinals is a session count.
+    ValueError for a non-session day or a date outside the index."""
+    if not _indexed(d):
+        raise ValueError(f"{d} is outside the XNYS session index")
+    idx, o = _sessions(), d.toordinal()
+    i = bisect.bisect_left(idx, o)
+    if i == len(idx) or idx[i] != o:
+        raise ValueError(f"{d} is not an XNYS session")
+    return i
+
+
 def is_early_close(d: _dt.date) -> bool:
     return d in early_closes(d.year)
 
@@ -124,6 +191,62 @@ def next_trading_day(d: _dt.date) -> _dt.date:
     return nxt
 
 
+def previous_trading_day(d: _dt.date) -> _dt.date:
+    prv = d - _dt.timedelta(days=1)
+    while not is_trading_day(prv):
+        prv -= _dt.timedelta(days=1)
+    return prv
+
+
+def sessions_between(start: _dt.date, end: _dt.date) -> int:
+    """Number of XNYS sessions ``d`` with ``start < d <= end``."""
+    if _indexed(start, end):
+        idx = _sessions()
+        return max(0, bisect.bisect_right(idx, end.toordinal()) - bisect.bisect_right(idx, start.toordinal()))
+    n, d = 0, start
+    while True:
+        d = next_trading_day(d)
+        if d > end:
+            return n
+        n += 1
+
+
+def add_sessions(d: _dt.date, n: int) -> _dt.date:
+    """The ``n``-th XNYS session after ``d`` (before it for ``n < 0``; ``d``
+    itself for 0)."""
+    if n == 0:
+        return d
+    if _indexed(d):
+        idx, o = _sessions(), d.toordinal()
+        # n > 0: sessions up to d are idx[:i]; n < 0: sessions before d are idx[:i]
+        i = bisect.bisect_right(idx, o) + n - 1 if n > 0 else bisect.bisect_left(idx, o) + n
+        if 0 <= i < len(idx):
+            return _dt.date.fromordinal(idx[i])
+    step = next_trading_day if n > 0 else previous_trading_day
+    for _ in range(abs(n)):
+        d = step(d)
+    return d
+
+
+def last_completed_session(now_utc: _dt.datetime | None = None) -> _dt.date:
+    """Most recent XNYS session whose regular close is at/before ``now_utc`` —
+    the newest daily bar that can no longer change."""
+    now_utc = now_utc or _dt.datetime.now(UTC)
+    d = now_utc.astimezone(ET).date()
+    close = market_close_utc(d)
+    if close is not None and now_utc >= close:
+        return d
+    return previous_trading_day(d)
+
+
+def in_session(now_utc: _dt.datetime | None = None) -> bool:
+    """True between today's regular open and close (a live daily bar exists)."""
+    now_utc = now_utc or _dt.datetime.now(UTC)
+    d = now_utc.astimezone(ET).date()
+    open_utc, close_utc = market_open_utc(d), market_close_utc(d)
+    return open_utc is not None and open_utc <= now_utc < close_utc
+
+
 def pre_open_brief_utc(d: _dt.date, lead_minutes: int = config.PRE_OPEN_BRIEF_LEAD_MIN) -> _dt.datetime | None:
     """UTC time to fire the pre-open brief on trading day ``d`` (open − lead)."""
     open_utc = market_open_utc(d)
@@ -150,6 +150,13 @@ def build_context(
     return ctx
 
 
+def for_sector(ctx: MarketContext, sector: str, rate_trend: Optional[str] = None) -> MarketContext:
+    """A copy of a market-wide context with the sector's macro-impact note."""
+    out = ctx.model_copy(deep=True)
+    out.macro_impact = _sector_macro_impact(out.regime, sector, rate_trend)
+    return out
+
+
 # Sectors whose macro sensitivity differs materially — macro impact is per-sector,
 # not a blanket market-wide verdict.
 _RATE_SENSITIVE = {"Tech/Cloud", "AI Apps", "AI/Semis", "Space/Defense"}
@@ -0,0 +1,117 @@
+"""
+investing/metrics.py — a tiny in-memory metrics registry (counters + latency
+histograms) with a JSON snapshot.
+
+Deliberately dependency-free: no Prometheus client, no background exporter. The
+gateway records into it and anything that wants to look (a debug command, a log
+line, a test) takes a :meth:`Registry.snapshot`. Series are keyed by name plus
+labels and rendered Prometheus-style, e.g. ``gateway_retries{source=yfinance}``.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import threading
+from collections import deque
+from typing import Any, Optional
+
+# Histograms keep a window of the most recent samples for percentiles, plus
+# lifetime count / sum / max.
+HISTOGRAM_WINDOW = 1024
+
+
+def _key(name: str, labels: dict[str, Any]) -> str:
+    if not labels:
+        return name
+    inner = ",".join(f"{k}={labels[k]}" for k in sorted(labels))
+    return f"{name}{{{inner}}}"
+
+
+class Histogram:
+    def __init__(self, window: int = HISTOGRAM_WINDOW) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self._samples.append(value)
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Nearest-rank percentile (0-100) over the recent window."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = math.ceil(q / 100.0 * len(ordered))
+        return ordered[min(len(ordered), max(1, rank)) - 1]
+
+    def summary(self) -> dict[str, Optional[float]]:
+        def r(x: Optional[float]) -> Optional[float]:
+            return round(x, 2) if x is not None else None
+        return {
+            "count": self.count,
+            "mean": r(self.total / self.count) if self.count else None,
+            "max": r(self.max) if self.count else None,
+            "p50": r(self.percentile(50)),
+            "p95": r(self.percentile(95)),
+            "p99": r(self.percentile(99)),
+        }
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._counters: dict[str, float] = {}
+        self._histograms: dict[str, Histogram] = {}
+        self._labels: dict[str, tuple[str, dict[str, Any]]] = {}   # series key -> (name, labels)
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, n: float = 1, **labels: Any) -> None:
+        k = _key(name, labels)
+        with self._lock:
+            if k not in self._counters:
+                self._labels[k] = (name, labels)
+            self._counters[k] = self._counters.get(k, 0) + n
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        k = _key(name, labels)
+        with self._lock:
+            h = self._histograms.get(k)
+            if h is None:
+                h = self._histograms[k] = Histogram()
+            h.observe(value)
+
+    def counter(self, name: str, **labels: Any) -> float:
+        with self._lock:
+            return self._counters.get(_key(name, labels), 0)
+
+    def total(self, name: str, **match: Any) -> float:
+        """Sum of every ``name`` counter series whose labels include ``match``
+        (e.g. all degraded reasons for one source)."""
+        with self._lock:
+            return sum(v for k, v in self._counters.items()
+                       if self._labels[k][0] == name
+                       and all(self._labels[k][1].get(lk) == lv for lk, lv in match.items()))
+
+    def label_values(self, label: str) -> set:
+        """Every value seen for ``label`` across counter series."""
+        with self._lock:
+            return {lbl[label] for _, lbl in self._labels.values() if label in lbl}
+
+    def histogram(self, name: str, **labels: Any) -> Optional[dict]:
+        with self._lock:
+            h = self._histograms.get(_key(name, labels))
+            return h.summary() if h else None
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                "counters": dict(sorted(self._counters.items())),
+                "histograms": {k: h.summary() for k, h in sorted(self._histograms.items())},
+            }
+
+    def to_json(self, **kw: Any) -> str:
+        return json.dumps(self.snapshot(), **kw)
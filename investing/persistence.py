@@ -4,24 +4,32 @@ investing/persistence.py — SQLite state for the investment skill.
 Replaces loose data/*.json with a transactional store. Tables:
 
     signals, position_plans, positions, recommendation_outcomes,
-    market_health_history, api_cache, job_runs, data_quality_events
+    market_health_history, api_cache, gateway_cache, job_runs, data_quality_events,
+    feature_cache, llm_cache, outcome_rollups
 
 Every recommendation is stored with a full snapshot of the features used at
 decision time (backtest reproducibility). All writes go through ``with conn:``
-so a failure rolls back atomically.
+so a failure rolls back atomically. The schema is applied once per connection;
+append-only logs can be written ``deferred=True`` through a write-behind queue
+that groups them into batched transactions (:func:`flush` waits for it).
 """
 
 from __future__ import annotations
 
+import atexit
 import datetime as _dt
 import json
+import logging
 import os
+import queue
 import sqlite3
 import threading
-from typing import Any, Optional
+import time
+from typing import Any, Optional, Sequence
 
 from . import config
 
+_logger = logging.getLogger(__name__)
 _LOCAL = threading.local()
 
 _SCHEMA = """
@@ -58,7 +66,8 @@ CREATE TABLE IF NOT EXISTS position_plans (
     code_version TEXT,
     model_version TEXT,
     feature_snapshot TEXT,
-    plan_json TEXT
+    plan_json TEXT,
+    outcomes_done INTEGER DEFAULT 0
 );
 CREATE TABLE IF NOT EXISTS positions (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -95,6 +104,20 @@ CREATE TABLE IF NOT EXISTS recommendation_outcomes (
     sector TEXT,
     market_regime TEXT
 );
+CREATE TABLE IF NOT EXISTS outcome_rollups (
+    dimension TEXT NOT NULL,
+    value TEXT NOT NULL,
+    horizon_session INTEGER NOT NULL,
+    n INTEGER NOT NULL DEFAULT 0,
+    n_r INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    sum_r REAL NOT NULL DEFAULT 0,
+    sum_mfe REAL NOT NULL DEFAULT 0,
+    sum_mae REAL NOT NULL DEFAULT 0,
+    hits_target_1 INTEGER NOT NULL DEFAULT 0,
+    hits_stop INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, value, horizon_session)
+);
 CREATE TABLE IF NOT EXISTS market_health_history (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     ts TEXT NOT NULL,
@@ -102,7 +125,8 @@ CREATE TABLE IF NOT EXISTS market_health_history (
     percentile REAL,
     zscore REAL,
     regime TEXT,
-    payload TEXT
+    payload TEXT,
+    session TEXT
 );
 CREATE TABLE IF NOT EXISTS api_cache (
     key TEXT PRIMARY KEY,
@@ -111,6 +135,14 @@ CREATE TABLE IF NOT EXISTS api_cache (
     fetched_at TEXT,
     ttl_seconds REAL
 );
+CREATE TABLE IF NOT EXISTS gateway_cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    source TEXT,
+    fetched_at TEXT NOT NULL,
+    fresh_until REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
 CREATE TABLE IF NOT EXISTS job_runs (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     job TEXT NOT NULL,
@@ -119,6 +151,24 @@ CREATE TABLE IF NOT EXISTS job_runs (
     status TEXT,
     detail TEXT
 );
+CREATE TABLE IF NOT EXISTS feature_cache (
+    ticker TEXT NOT NULL,
+    bar_date TEXT NOT NULL,
+    config_version TEXT NOT NULL,
+    fingerprint TEXT,
+    features TEXT,
+    setup TEXT,
+    created_at TEXT,
+    PRIMARY KEY (ticker, bar_date, config_version)
+);
+CREATE TABLE IF NOT EXISTS llm_cache (
+    ticker TEXT NOT NULL,
+    day TEXT NOT NULL,
+    model TEXT NOT NULL,
+    payload TEXT,
+    created_at TEXT,
+    PRIMARY KEY (ticker, day, model)
+);
 CREATE TABLE IF NOT EXISTS data_quality_events (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     ts TEXT NOT NULL,
@@ -131,6 +181,39 @@ CREATE TABLE IF NOT EXISTS data_quality_events (
 """
 
 
+# Columns added after the first release: (table, column, type). Applied to
+# databases created by an older schema, before any index that depends on them.
+_COLUMN_MIGRATIONS = [
+    ("market_health_history", "session", "TEXT"),
+    ("position_plans", "outcomes_done", "INTEGER DEFAULT 0"),
+]
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_gateway_cache_expires ON gateway_cache(expires_at);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_market_health_session ON market_health_history(session);
+CREATE INDEX IF NOT EXISTS idx_signals_ticker_ts ON signals(ticker, ts);
+CREATE INDEX IF NOT EXISTS idx_position_plans_ticker_ts ON position_plans(ticker, ts);
+CREATE INDEX IF NOT EXISTS idx_position_plans_pending ON position_plans(outcomes_done, ts);
+CREATE INDEX IF NOT EXISTS idx_dq_events_ticker_ts ON data_quality_events(ticker, ts);
+CREATE INDEX IF NOT EXISTS idx_outcomes_setup_regime_horizon
+    ON recommendation_outcomes(setup_type, market_regime, horizon_session);
+CREATE INDEX IF NOT EXISTS idx_outcomes_plan ON recommendation_outcomes(plan_id, horizon_session);
+CREATE INDEX IF NOT EXISTS idx_job_runs_job_started ON job_runs(job, started_at);
+"""
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    for table, column, ctype in _COLUMN_MIGRATIONS:
+        cols = {r["name"] for r in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+        if column not in cols:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ctype}")
+    conn.executescript(_INDEXES)
+    # outcome rollups arrived after outcomes did: backfill them once
+    if (conn.execute("SELECT 1 FROM outcome_rollups LIMIT 1").fetchone() is None
+            and conn.execute("SELECT 1 FROM recommendation_outcomes LIMIT 1").fetchone() is not None):
+        _rebuild_rollups(conn)
+
+
 def _utcnow_iso() -> str:
     return _dt.datetime.now(_dt.timezone.utc).isoformat()
 
@@ -151,12 +234,122 @@ def connect(db_path: Optional[str] = None) -> sqlite3.Connection:
 
 
 def init_db(db_path: Optional[str] = None) -> sqlite3.Connection:
+    """The thread's connection, with the schema applied once per connection."""
     conn = connect(db_path)
-    with conn:
-        conn.executescript(_SCHEMA)
+    if getattr(_LOCAL, "ready", None) is not conn:
+        with conn:
+            conn.executescript(_SCHEMA)
+            _migrate(conn)
+        _LOCAL.ready = conn
     return conn
 
 
+# ── Write-behind queue ──────────────────────────────────────────────────────────
+class _WriteBehind:
+    """Append-only log writes (signals, data-quality events, outcomes) queued and
+    committed by one background thread, up to ``max_batch`` rows per transaction
+    (waiting at most ``linger`` s to fill a batch). :meth:`flush` blocks until
+    everything queued before it is committed."""
+
+    def __init__(self, *, max_batch: int, linger: float) -> None:
+        self.max_batch = max_batch
+        self.linger = linger
+        self._q: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, db_path: Optional[str], statements: list[tuple[str, tuple]]) -> None:
+        self._ensure_thread()
+        self._q.put((db_path or config.DB_PATH, statements))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._q.put(done)
+        return done.wait(timeout)
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="persist-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._q.get()]
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.max_batch and not isinstance(batch[-1], threading.Event):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            rows = [b for b in batch if not isinstance(b, threading.Event)]
+            self._write(rows)
+            for b in batch:
+                if isinstance(b, threading.Event):
+                    b.set()
+
+    @staticmethod
+    def _write(rows: list[tuple]) -> None:
+        by_db: dict[str, list[list[tuple[str, tuple]]]] = {}
+        for path, statements in rows:
+            by_db.setdefault(path, []).append(statements)
+        for path, writes in by_db.items():
+            try:
+                conn = init_db(path)
+            except Exception as e:              # noqa: BLE001
+                _logger.warning("write-behind: %d rows dropped, db unavailable: %s", len(writes), e)
+                continue
+            try:
+                with conn:
+                    for statements in writes:
+                        for sql, params in statements:
+                            conn.execute(sql, params)
+            except Exception:                   # noqa: BLE001 — retry row by row
+                for statements in writes:
+                    try:
+                        with conn:
+                            for sql, params in statements:
+                                conn.execute(sql, params)
+                    except Exception as e:      # noqa: BLE001
+                        _logger.warning("write-behind row dropped (%s): %s",
+                                        statements[0][0].split("(")[0], e)
+
+
+_WRITER = _WriteBehind(max_batch=config.PERSIST_WRITE_BEHIND["max_batch"],
+                       linger=config.PERSIST_WRITE_BEHIND["linger"])
+
+
+def _write(sql: str, params: tuple, *, deferred: bool, db_path: Optional[str],
+           then: Sequence[tuple[str, tuple]] = ()) -> Optional[int]:
+    """Insert now and return the row id, or (``deferred`` with write-behind
+    enabled) queue it and return None. ``then`` statements run in the same
+    transaction."""
+    statements = [(sql, params), *then]
+    if deferred and config.PERSIST_WRITE_BEHIND["enabled"]:
+        _WRITER.submit(db_path, statements)
+        return None
+    conn = init_db(db_path)
+    with conn:
+        rowid = int(conn.execute(sql, params).lastrowid)
+        for extra, extra_params in then:
+            conn.execute(extra, extra_params)
+        return rowid
+
+
+def flush(timeout: Optional[float] = None) -> bool:
+    """Block until every deferred write queued so far is committed (tests,
+    shutdown). Returns False on timeout."""
+    return _WRITER.flush(timeout)
+
+
+atexit.register(flush, 10.0)
+
+
 # ── Position plans / signals ───────────────────────────────────────────────────
 def save_position_plan(plan, db_path: Optional[str] = None) -> int:
     """Persist a PositionPlan (with full feature snapshot). Returns row id."""
@@ -190,25 +383,24 @@ def save_position_plan(plan, db_path: Optional[str] = None) -> int:
 
 
 def log_signal(ticker: str, strategy: str, setup_type: str, confidence: float,
-               dq: float, payload: dict, db_path: Optional[str] = None) -> int:
-    conn = init_db(db_path)
-    with conn:
-        cur = conn.execute(
-            "INSERT INTO signals (ts,ticker,strategy,setup_type,signal_confidence,data_quality_score,payload)"
-            " VALUES (?,?,?,?,?,?,?)",
-            (_utcnow_iso(), ticker, strategy, setup_type, confidence, dq, json.dumps(payload)),
-        )
-        return int(cur.lastrowid)
+               dq: float, payload: dict, db_path: Optional[str] = None, *,
+               deferred: bool = False) -> Optional[int]:
+    return _write(
+        "INSERT INTO signals (ts,ticker,strategy,setup_type,signal_confidence,data_quality_score,payload)"
+        " VALUES (?,?,?,?,?,?,?)",
+        (_utcnow_iso(), ticker, strategy, setup_type, confidence, dq, json.dumps(payload)),
+        deferred=deferred, db_path=db_path,
+    )
 
 
 def log_data_quality_event(ticker: str, field: str, status: str, source: str,
-                           detail: str = "", db_path: Optional[str] = None) -> None:
-    conn = init_db(db_path)
-    with conn:
-        conn.execute(
-            "INSERT INTO data_quality_events (ts,ticker,field,status,source,detail) VALUES (?,?,?,?,?,?)",
-            (_utcnow_iso(), ticker, field, status, source, detail),
-        )
+                           detail: str = "", db_path: Optional[str] = None, *,
+                           deferred: bool = False) -> None:
+    _write(
+        "INSERT INTO data_quality_events (ts,ticker,field,status,source,detail) VALUES (?,?,?,?,?,?)",
+        (_utcnow_iso(), ticker, field, status, source, detail),
+        deferred=deferred, db_path=db_path,
+    )
 
 
 # ── Positions repository ────────────────────────────────────────────────────────
@@ -240,14 +432,18 @@ def list_open_positions(db_path: Optional[str] = None) -> list[dict]:
 
 # ── Market health history ────────────────────────────────────────────────────────
 def save_market_health(composite, percentile, zscore, regime, payload: dict,
-                        db_path: Optional[str] = None) -> int:
+                        db_path: Optional[str] = None, *,
+                        session: Optional[str] = None) -> Optional[int]:
+    """Append a reading. With ``session`` (ISO date) at most one row per session
+    is kept: a repeat is ignored and returns None."""
     conn = init_db(db_path)
     with conn:
         cur = conn.execute(
-            "INSERT INTO market_health_history (ts,composite,percentile,zscore,regime,payload) VALUES (?,?,?,?,?,?)",
-            (_utcnow_iso(), composite, percentile, zscore, regime, json.dumps(payload)),
+            "INSERT OR IGNORE INTO market_health_history (ts,composite,percentile,zscore,regime,payload,session) "
+            "VALUES (?,?,?,?,?,?,?)",
+            (_utcnow_iso(), composite, percentile, zscore, regime, json.dumps(payload), session),
         )
-        return int(cur.lastrowid)
+        return int(cur.lastrowid) if cur.rowcount else None
 
 
 def market_health_series(limit: int = 250, db_path: Optional[str] = None) -> list[float]:
@@ -285,6 +481,84 @@ def cache_set(key: str, value: Any, ttl_seconds: float, source: str = "",
         )
 
 
+def cache_get_entry(key: str, db_path: Optional[str] = None) -> Optional[dict]:
+    """Raw row for the gateway's L2 tier (binary ``value``, epoch expiries). The
+    tier has its own ``gateway_cache`` table; ``api_cache`` stays the JSON cache
+    of :func:`cache_get` / :func:`cache_set`."""
+    conn = init_db(db_path)
+    row = conn.execute(
+        "SELECT value, source, fetched_at, fresh_until, expires_at FROM gateway_cache WHERE key=?",
+        (key,),
+    ).fetchone()
+    return dict(row) if row else None
+
+
+def cache_put_entry(key: str, blob: bytes, *, source: str, fetched_at: str,
+                    fresh_until: float, expires_at: float, db_path: Optional[str] = None) -> None:
+    conn = init_db(db_path)
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO gateway_cache (key,value,source,fetched_at,fresh_until,expires_at)"
+            " VALUES (?,?,?,?,?,?)",
+            (key, sqlite3.Binary(blob), source, fetched_at, fresh_until, expires_at),
+        )
+
+
+def cache_sweep(now: Optional[float] = None, db_path: Optional[str] = None) -> int:
+    """Delete every ``gateway_cache`` row past its ``expires_at``. Returns rows removed."""
+    conn = init_db(db_path)
+    with conn:
+        cur = conn.execute("DELETE FROM gateway_cache WHERE expires_at < ?",
+                           (now if now is not None else time.time(),))
+        return cur.rowcount
+
+
+# ── Feature cache ────────────────────────────────────────────────────────────────
+def feature_get(ticker: str, bar_date: str, config_version: str,
+                db_path: Optional[str] = None) -> Optional[dict]:
+    conn = init_db(db_path)
+    row = conn.execute(
+        "SELECT fingerprint, features, setup FROM feature_cache"
+        " WHERE ticker=? AND bar_date=? AND config_version=?",
+        (ticker, bar_date, config_version),
+    ).fetchone()
+    if not row:
+        return None
+    return {"fingerprint": row["fingerprint"], "features": json.loads(row["features"]),
+            "setup": json.loads(row["setup"])}
+
+
+def feature_put(ticker: str, bar_date: str, config_version: str, fingerprint: str,
+                features: dict, setup: dict, db_path: Optional[str] = None) -> None:
+    conn = init_db(db_path)
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO feature_cache"
+            " (ticker,bar_date,config_version,fingerprint,features,setup,created_at)"
+            " VALUES (?,?,?,?,?,?,?)",
+            (ticker, bar_date, config_version, fingerprint, json.dumps(features),
+             json.dumps(setup), _utcnow_iso()),
+        )
+
+
+# ── LLM enrichment cache ─────────────────────────────────────────────────────────
+def llm_get(ticker: str, day: str, model: str, db_path: Optional[str] = None) -> Optional[dict]:
+    conn = init_db(db_path)
+    row = conn.execute("SELECT payload FROM llm_cache WHERE ticker=? AND day=? AND model=?",
+                       (ticker, day, model)).fetchone()
+    return json.loads(row["payload"]) if row else None
+
+
+def llm_put(ticker: str, day: str, model: str, payload: dict,
+            db_path: Optional[str] = None) -> None:
+    conn = init_db(db_path)
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (ticker,day,model,payload,created_at) VALUES (?,?,?,?,?)",
+            (ticker, day, model, json.dumps(payload), _utcnow_iso()),
+        )
+
+
 # ── Job runs ───────────────────────────────────────────────────────────────────
 def record_job_run(job: str, status: str, started_at: str, detail: str = "",
                    db_path: Optional[str] = None) -> None:
@@ -297,14 +571,147 @@ def record_job_run(job: str, status: str, started_at: str, detail: str = "",
 
 
 # ── Outcomes (backtest tracking) ──────────────────────────────────────────────────
-def save_outcome(outcome: dict, db_path: Optional[str] = None) -> int:
+_OUTCOME_COLS = ("plan_id", "ticker", "horizon_session", "as_of", "price", "mfe", "mae",
+                 "r_multiple", "hit_stop", "hit_target_1", "hit_target_2", "time_to_target",
+                 "gap_risk", "max_drawdown", "setup_type", "sector", "market_regime")
+_OUTCOME_INSERT = (f"INSERT INTO recommendation_outcomes ({','.join(_OUTCOME_COLS)})"
+                   f" VALUES ({','.join('?' for _ in _OUTCOME_COLS)})")
+
+
+def save_outcome(outcome: dict, db_path: Optional[str] = None, *,
+                 deferred: bool = False) -> Optional[int]:
+    """Insert an outcome row and fold it into :data:`ROLLUP_DIMENSIONS` in the
+    same transaction."""
+    return _write(
+        _OUTCOME_INSERT, tuple(outcome.get(c) for c in _OUTCOME_COLS),
+        deferred=deferred, db_path=db_path, then=_rollup_statements(outcome),
+    )
+
+
+def pending_outcome_plans(db_path: Optional[str] = None) -> list[dict]:
+    """Plans not yet fully scored (``outcomes_done = 0``), each with the
+    horizons already recorded in ``done_horizons``. Finished plans are flagged
+    by :func:`save_outcomes`, so this stays proportional to the open ones."""
+    conn = init_db(db_path)
+    rows = conn.execute(
+        """SELECT p.id, p.ts, p.ticker, p.entry_trigger, p.stop, p.target_1, p.target_2,
+                  p.target_3, p.setup_type, p.market_regime, p.decision_status,
+                  (SELECT group_concat(o.horizon_session) FROM recommendation_outcomes o
+                   WHERE o.plan_id = p.id) AS done
+           FROM position_plans p WHERE p.outcomes_done = 0 ORDER BY p.id"""
+    ).fetchall()
+    out = []
+    for r in rows:
+        d = dict(r)
+        done = d.pop("done")
+        d["done_horizons"] = {int(h) for h in done.split(",")} if done else set()
+        out.append(d)
+    return out
+
+
+def save_outcomes(outcomes: list[dict], done_plan_ids: Sequence[int] = (),
+                  db_path: Optional[str] = None) -> int:
+    """Outcome rows (with their rollups) and the plans they complete, written
+    in a single transaction. Returns the number of outcome rows."""
     conn = init_db(db_path)
-    cols = ("plan_id", "ticker", "horizon_session", "as_of", "price", "mfe", "mae",
-            "r_multiple", "hit_stop", "hit_target_1", "hit_target_2", "time_to_target",
-            "gap_risk", "max_drawdown", "setup_type", "sector", "market_regime")
     with conn:
-        cur = conn.execute(
-            f"INSERT INTO recommendation_outcomes ({','.join(cols)}) VALUES ({','.join('?' for _ in cols)})",
-            tuple(outcome.get(c) for c in cols),
+        conn.executemany(_OUTCOME_INSERT, [tuple(o.get(c) for c in _OUTCOME_COLS) for o in outcomes])
+        for o in outcomes:
+            for sql, params in _rollup_statements(o):
+                conn.execute(sql, params)
+        conn.executemany("UPDATE position_plans SET outcomes_done = 1 WHERE id = ?",
+                         [(i,) for i in done_plan_ids])
+    return len(outcomes)
+
+
+# ── Outcome rollups ──────────────────────────────────────────────────────────────
+# Materialized per-dimension aggregates of recommendation_outcomes, kept current
+# by save_outcome; a report reads a handful of rows instead of scanning outcomes.
+ROLLUP_DIMENSIONS = ("setup_type", "sector", "market_regime", "setup_regime")
+
+_ROLLUP_UPSERT = """
+INSERT INTO outcome_rollups
+    (dimension, value, horizon_session, n, n_r, wins, sum_r, sum_mfe, sum_mae, hits_target_1, hits_stop)
+VALUES (?,?,?,?,?,?,?,?,?,?,?)
+ON CONFLICT(dimension, value, horizon_session) DO UPDATE SET
+    n = n + excluded.n, n_r = n_r + excluded.n_r, wins = wins + excluded.wins,
+    sum_r = sum_r + excluded.sum_r, sum_mfe = sum_mfe + excluded.sum_mfe,
+    sum_mae = sum_mae + excluded.sum_mae, hits_target_1 = hits_target_1 + excluded.hits_target_1,
+    hits_stop = hits_stop + excluded.hits_stop
+"""
+
+# SQL for a dimension's value over recommendation_outcomes (rebuild)
+_ROLLUP_VALUE_SQL = {
+    "setup_type": "COALESCE(setup_type, 'UNKNOWN')",
+    "sector": "COALESCE(sector, 'UNKNOWN')",
+    "market_regime": "COALESCE(market_regime, 'UNKNOWN')",
+    "setup_regime": "COALESCE(setup_type, 'UNKNOWN') || '|' || COALESCE(market_regime, 'UNKNOWN')",
+}
+
+
+def _rollup_value(outcome: dict, dimension: str) -> str:
+    if dimension == "setup_regime":
+        return f"{outcome.get('setup_type') or 'UNKNOWN'}|{outcome.get('market_regime') or 'UNKNOWN'}"
+    return outcome.get(dimension) or "UNKNOWN"
+
+
+def _rollup_statements(outcome: dict) -> list[tuple[str, tuple]]:
+    if outcome.get("horizon_session") is None:
+        return []
+    r = outcome.get("r_multiple")
+    has_r = r is not None
+    delta = (1, int(has_r), int(has_r and r > 0), r or 0.0, outcome.get("mfe") or 0.0,
+             outcome.get("mae") or 0.0, int(bool(outcome.get("hit_target_1"))),
+             int(bool(outcome.get("hit_stop"))))
+    return [(_ROLLUP_UPSERT, (d, _rollup_value(outcome, d), outcome["horizon_session"], *delta))
+            for d in ROLLUP_DIMENSIONS]
+
+
+def _rebuild_rollups(conn: sqlite3.Connection) -> None:
+    conn.execute("DELETE FROM outcome_rollups")
+    for dim, expr in _ROLLUP_VALUE_SQL.items():
+        conn.execute(
+            f"""INSERT INTO outcome_rollups
+                (dimension, value, horizon_session, n, n_r, wins, sum_r, sum_mfe, sum_mae,
+                 hits_target_1, hits_stop)
+            SELECT ?, {expr}, horizon_session, COUNT(*), COUNT(r_multiple),
+                   COALESCE(SUM(r_multiple > 0), 0), COALESCE(SUM(r_multiple), 0), COALESCE(SUM(mfe), 0),
+                   COALESCE(SUM(mae), 0), SUM(COALESCE(hit_target_1, 0) != 0),
+                   SUM(COALESCE(hit_stop, 0) != 0)
+            FROM recommendation_outcomes WHERE horizon_session IS NOT NULL
+            GROUP BY {expr}, horizon_session""",
+            (dim,),
         )
-        return int(cur.lastrowid)
+
+
+def rebuild_outcome_rollups(db_path: Optional[str] = None) -> None:
+    """Recompute every rollup from recommendation_outcomes (after manual edits)."""
+    conn = init_db(db_path)
+    with conn:
+        _rebuild_rollups(conn)
+
+
+def outcome_rollups(dimension: str, horizon_session: Optional[int] = None,
+                    db_path: Optional[str] = None) -> list[dict]:
+    """Aggregates for one of :data:`ROLLUP_DIMENSIONS` (``setup_regime`` values
+    are ``"SETUP|REGIME"``), with win rate and averages derived."""
+    if dimension not in ROLLUP_DIMENSIONS:
+        raise ValueError(f"unknown rollup dimension {dimension!r}")
+    conn = init_db(db_path)
+    sql = "SELECT * FROM outcome_rollups WHERE dimension=?"
+    args: list[Any] = [dimension]
+    if horizon_session is not None:
+        sql += " AND horizon_session=?"
+        args.append(horizon_session)
+    out = []
+    for row in conn.execute(sql + " ORDER BY value, horizon_session", args).fetchall():
+        d = dict(row)
+        n_r = d["n_r"]
+        d["win_rate"] = round(d["wins"] / n_r, 4) if n_r else None
+        d["avg_r"] = round(d["sum_r"] / n_r, 4) if n_r else None
+        d["avg_mfe"] = round(d["sum_mfe"] / n_r, 4) if n_r else None
+        d["avg_mae"] = round(d["sum_mae"] / n_r, 4) if n_r else None
+        d["target_1_rate"] = round(d["hits_target_1"] / d["n"], 4) if d["n"] else None
+        d["stop_rate"] = round(d["hits_stop"] / d["n"], 4) if d["n"] else None
+        out.append(d)
+    return out
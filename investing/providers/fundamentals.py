@@ -39,10 +39,10 @@ def get_reported_fundamentals(ticker: str) -> dict[str, DataPoint]:
             "ev_ebitda": info.get("enterpriseToEbitda"),
         }
     try:
-        d = gateway.fetch("yfinance", f"fund:{ticker}", _fetch, kind="fundamentals")
-        now = _dt.datetime.now(_dt.timezone.utc)
+        res = gateway.fetch_result("yfinance", f"fund:{ticker}", _fetch, kind="fundamentals")
+        d, fetched_at = res.value, res.fetched_at
         return {k: make_datapoint(f"{ticker}.{k}", v, source="yfinance:reported",
-                                  kind="fundamentals", as_of=now)
+                                  kind="fundamentals", as_of=fetched_at)
                 for k, v in d.items()}
     except Exception as e:
         return {k: make_datapoint(f"{ticker}.{k}", None, source="yfinance:reported",
@@ -59,10 +59,10 @@ def get_analyst_estimates(ticker: str) -> dict[str, DataPoint]:
             "num_analysts": info.get("numberOfAnalystOpinions"),
         }
     try:
-        d = gateway.fetch("yfinance", f"est:{ticker}", _fetch, kind="fundamentals")
-        now = _dt.datetime.now(_dt.timezone.utc)
+        res = gateway.fetch_result("yfinance", f"est:{ticker}", _fetch, kind="fundamentals")
+        d, fetched_at = res.value, res.fetched_at
         return {k: make_datapoint(f"{ticker}.est.{k}", v, source="yfinance:estimates",
-                                  kind="fundamentals", as_of=now)
+                                  kind="fundamentals", as_of=fetched_at)
                 for k, v in d.items()}
     except Exception as e:
         return {k: make_datapoint(f"{ticker}.est.{k}", None, source="yfinance:estimates",
@@ -59,7 +59,7 @@ def fred_point(name: str) -> DataPoint:
         return _fred_latest(series_id)
 
     try:
-        value, obs_date = gateway.fetch("FRED", f"fred:{series_id}", _fetch, kind="macro", rate_limit=60)
+        value, obs_date = gateway.fetch("FRED", f"fred:{series_id}", _fetch, kind="macro")
         as_of = _dt.datetime.fromisoformat(obs_date).replace(tzinfo=_dt.timezone.utc)
         return make_datapoint(name, value, source=f"FRED:{series_id}", kind="macro", as_of=as_of)
     except Exception as e:
@@ -3,15 +3,19 @@ investing/providers/market_data.py — price quotes, daily bars and earnings dat
 
 All access goes through the gateway (retry / circuit breaker / TTL cache). Heavy
 deps (yfinance) are imported lazily; when unavailable the provider returns a
-DataPoint with status MISSING/ERROR — never a fabricated neutral value.
+DataPoint with status MISSING/ERROR — never a fabricated neutral value. Daily
+bars are served from the local OHLCV store (:mod:`investing.bar_store`), which
+only downloads the sessions it is missing.
 """
 
 from __future__ import annotations
 
+import bisect
 import datetime as _dt
+import re
 from typing import Optional
 
-from .. import gateway
+from .. import bar_store, config, gateway, market_calendar
 from ..data_quality import make_datapoint
 from ..schemas import DataPoint
 
@@ -21,7 +25,9 @@ def _yf():
     return yf
 
 
-def get_quote(ticker: str) -> DataPoint:
+def get_quote(ticker: str, *, fresh: bool = False) -> DataPoint:
+    """Last price. ``fresh`` refetches a stale cache entry instead of serving it
+    (see :meth:`Gateway.fetch_result`); a plan's required inputs use it."""
     def _fetch():
         yf = _yf()
         t = yf.Ticker(ticker)
@@ -38,60 +44,213 @@ def get_quote(ticker: str) -> DataPoint:
         return float(price)
 
     try:
-        price = gateway.fetch("yfinance", f"quote:{ticker}", _fetch, kind="quote", rate_limit=120)
+        res = gateway.fetch_result("yfinance", f"quote:{ticker}", _fetch, kind="quote",
+                                   require_fresh=fresh)
         # as_of = our knowledge time (fetch time). The ~15 min market delay of the
         # free yfinance feed is recorded as a note, NOT as staleness — otherwise a
         # freshly fetched quote would always be flagged STALE and the gate would
-        # permanently return DATA_INCOMPLETE.
-        dp = make_datapoint(f"{ticker}.price", round(price, 4), source="yfinance",
-                            kind="quote", as_of=_dt.datetime.now(_dt.timezone.utc))
+        # permanently return DATA_INCOMPLETE. A cache entry served past its fresh
+        # TTL (stale-while-revalidate) keeps its real fetch time and so is STALE.
+        dp = make_datapoint(f"{ticker}.price", round(res.value, 4), source="yfinance",
+                            kind="quote", as_of=res.fetched_at)
         dp.note = "źródło ~15 min opóźnione (yfinance)"
         return dp
     except Exception as e:
         return make_datapoint(f"{ticker}.price", None, source="yfinance", kind="quote", error=str(e))
 
 
-def get_bars(ticker: str, period: str = "1y") -> dict:
-    """Return {closes, highs, lows, volumes, adv_dollars, point}. ``point`` is a
-    DataPoint describing freshness of the bar set."""
+def _bars_value(hist) -> dict:
+    """Cacheable bar set from a yfinance OHLCV frame."""
+    if hist is None or len(hist) < 2:
+        raise ValueError("insufficient bars")
+    closes = [float(x) for x in hist["Close"].tolist()]
+    adj = hist["Adj Close"] if "Adj Close" in hist.columns else hist["Close"]
+    adj_closes = [float(x) for x in adj.tolist()]
+    opens = [float(x) for x in hist["Open"].tolist()]
+    highs = [float(x) for x in hist["High"].tolist()]
+    lows = [float(x) for x in hist["Low"].tolist()]
+    vols = [float(x) for x in hist["Volume"].tolist()]
+    dates = [ts.date().toordinal() for ts in hist.index]
+    last_ts = hist.index[-1].to_pydatetime()
+    return {"closes": closes, "adj_closes": adj_closes, "opens": opens, "highs": highs,
+            "lows": lows, "volumes": vols, "dates": dates, "as_of": last_ts}
+
+
+def _history_rows(hist) -> list[bar_store.Row]:
+    """yfinance OHLCV frame -> bar-store rows (Adj Close falls back to Close)."""
+    if hist is None or not len(hist):
+        return []
+    hist = hist.dropna(subset=["Close"])
+    adj = hist["Adj Close"] if "Adj Close" in hist.columns else hist["Close"]
+    return [(ts.date(), float(o), float(h), float(lo), float(c), float(a), float(v))
+            for ts, o, h, lo, c, a, v in zip(hist.index, hist["Open"], hist["High"], hist["Low"],
+                                             hist["Close"], adj, hist["Volume"])]
+
+
+def _stored_value(bars: bar_store.Bars, indicators: Optional[dict] = None) -> dict:
+    if len(bars) < 2:
+        raise ValueError("insufficient bars")
+    return {"closes": bars.close, "adj_closes": bars.adj_close, "opens": bars.open,
+            "highs": bars.high, "lows": bars.low, "volumes": bars.volume, "dates": [d.toordinal() for d in bars.dates],
+            "as_of": _dt.datetime.combine(bars.last, _dt.time()), "indicators": indicators}
+
+
+_SESSIONS_RE = re.compile(r"^(\d+)d$")
+
+
+def _source_period(period: str) -> str:
+    """Period actually fetched for ``period``: anything covered by the canonical
+    series is served as a window over it, so 1y / 6mo / 35d / 5d of one ticker
+    share one cache entry and one download."""
+    canon = config.BARS_CANONICAL_PERIOD
+    try:
+        covered = bar_store.period_start(period) >= bar_store.period_start(canon)
+    except ValueError:
+        return period
+    return canon if covered else period
+
+
+def _window(value: dict, period: str) -> dict:
+    """Slice a cached bar set down to ``period`` (``Nd`` = last N sessions)."""
+    dates = value.get("dates")
+    n = len(value["closes"])
+    m = _SESSIONS_RE.match(period)
+    if m:
+        i = max(0, n - int(m.group(1)))
+    elif not dates:                       # entry cached before dates were recorded
+        start = bar_store.period_start(period)
+        sessions = market_calendar.sessions_between(start - _dt.timedelta(days=1), _dt.date.today())
+        i = max(0, n - sessions)
+    else:
+        i = bisect.bisect_left(dates, bar_store.period_start(period).toordinal())
+    if i == 0:
+        return value
+    return {k: (v[i:] if isinstance(v, list) else v) for k, v in value.items()}
+
+
+def _bars_result(ticker: str, res: gateway.Fetched, period: str) -> dict:
+    data = _window(res.value, period)
+    closes, vols = data["closes"], data["volumes"]
+    adv = None
+    if len(closes) >= 20:
+        adv = sum(closes[i] * vols[i] for i in range(-20, 0)) / 20
+    last_ts = data["as_of"]
+    if last_ts.tzinfo is None:
+        last_ts = last_ts.replace(tzinfo=_dt.timezone.utc)
+    # as_of = fetch time (latest available bars just pulled). The last bar's
+    # date (e.g. Friday over a weekend) is expected, not "stale", so it goes
+    # into the note rather than the freshness clock.
+    point = make_datapoint(f"{ticker}.bars", True, source="yfinance",
+                           kind="daily_bars", as_of=res.fetched_at)
+    point.note = f"ostatnia świeca: {last_ts.date().isoformat()}"
+    return {"closes": closes, "adj_closes": data.get("adj_closes"), "highs": data["highs"],
+            "lows": data["lows"], "volumes": vols, "opens": data.get("opens"),
+            "dates": data.get("dates"), "indicators": data.get("indicators"), "adv_dollars": adv,
+            "last_date": last_ts.date().isoformat(), "point": point}
+
+
+def _bars_missing(ticker: str, error: str) -> dict:
+    return {"closes": [], "adj_closes": [], "highs": [], "lows": [], "volumes": [],
+            "indicators": None, "adv_dollars": None, "last_date": None, "point": make_datapoint(f"{ticker}.bars", None, source="yfinance",
+                                    kind="daily_bars", error=error)}
+
+
+def get_bars(ticker: str, period: str = "1y", *, fresh: bool = False) -> dict:
+    """Return {closes, adj_closes, opens, highs, lows, volumes, dates, indicators, adv_dollars,
+    last_date, point} (``closes`` are split-adjusted only, ``adj_closes`` also
+    dividend-adjusted — use them for returns; ``dates`` are ordinals; ``indicators``
+    is the bar store's streaming :meth:`IndicatorState.values` as of the last bar;
+    ``adj_closes``/``opens``/``dates``/``indicators`` may be None on old cache
+    entries or without the bar store). ``point`` is a
+    DataPoint describing freshness of the bar set. Periods up to
+    :data:`config.BARS_CANONICAL_PERIOD` are sliced from that one series. ``fresh`` as
+    in :func:`get_quote`."""
+    source_period = _source_period(period)
+
     def _fetch():
         yf = _yf()
-        hist = yf.Ticker(ticker).history(period=period, auto_adjust=False)
-        if hist is None or len(hist) < 2:
-            raise ValueError("insufficient bars")
-        closes = [float(x) for x in hist["Close"].tolist()]
-        highs = [float(x) for x in hist["High"].tolist()]
-        lows = [float(x) for x in hist["Low"].tolist()]
-        vols = [float(x) for x in hist["Volume"].tolist()]
-        last_ts = hist.index[-1].to_pydatetime()
-        return {"closes": closes, "highs": highs, "lows": lows, "volumes": vols, "as_of": last_ts}
+        if not config.BAR_STORE["enabled"]:
+            return _bars_value(yf.Ticker(ticker).history(period=source_period, auto_adjust=False))
+
+        def _since(start: _dt.date) -> list:
+            return _history_rows(yf.Ticker(ticker).history(start=start.isoformat(), auto_adjust=False))
+
+        store = bar_store.store()
+        bars = store.history(ticker, bar_store.period_start(source_period), _since)
+        return _stored_value(bars, store.indicator_values(ticker, bars))
+
+    try:
+        res = gateway.fetch_result("yfinance", f"bars:{ticker}:{source_period}", _fetch,
+                                   kind="daily_bars", require_fresh=fresh)
+        return _bars_result(ticker, res, period)
+    except Exception as e:
+        return _bars_missing(ticker, str(e))
+
+
+def get_bars_many(tickers: list[str], period: str = "1y") -> dict[str, dict]:
+    """:func:`get_bars` for many tickers at once: ``{ticker: bars}``.
+
+    Uncached tickers are pulled with chunked ``yf.download`` calls instead of one
+    ``history`` request each; the result is split into the same per-ticker
+    ``bars:{ticker}:{period}`` cache entries :func:`get_bars` reads."""
+    source_period = _source_period(period)
+
+    def _download(chunk: list[str], **kw):
+        yf = _yf()
+        raw = yf.download(chunk, auto_adjust=False, group_by="ticker",
+                          progress=False, threads=True, **kw)
+        if raw is None or raw.empty:
+            raise ValueError("empty download")
+        multi = getattr(raw.columns, "nlevels", 1) > 1
+        present = set(raw.columns.get_level_values(0)) if multi else set(chunk[:1])
+        return {t: (raw[t] if multi else raw).dropna(subset=["Close"])
+                for t in chunk if t in present}
+
+    def _batch(chunk: list[str]) -> dict[str, dict]:
+        out = {}
+        if not config.BAR_STORE["enabled"]:
+            for t, hist in _download(chunk, period=source_period).items():
+                try:
+                    out[t] = _bars_value(hist)
+                except ValueError:
+                    continue                # delisted / too short: reported per ticker
+            return out
+
+        # only download what each ticker's local history is missing, one call per
+        # distinct refresh start (normally one: the whole universe shares a last bar)
+        store, start = bar_store.store(), bar_store.period_start(source_period)
+        plans: dict[_dt.date, list[str]] = {}
+        for t in chunk:
+            since = store.plan(t, start)
+            plans.setdefault(since, []).append(t)
+        for since, group in plans.items():
+            frames = _download(group, start=since.isoformat()) if since is not None else {}
+            for t in group:
+                try:
+                    rows = _history_rows(frames.get(t)) if since is not None else []
+                    bars = store.history(t, start, lambda s, t=t, r=rows, d=since: r if s == d else
+                                         _history_rows(_download([t], start=s.isoformat()).get(t)))
+                    out[t] = _stored_value(bars, store.indicator_values(t, bars))
+                except ValueError:
+                    continue
+        return out
 
+    keys = {t: f"bars:{t}:{source_period}" for t in dict.fromkeys(tickers)}
     try:
-        data = gateway.fetch("yfinance", f"bars:{ticker}:{period}", _fetch,
-                             kind="daily_bars", rate_limit=120)
-        closes, vols = data["closes"], data["volumes"]
-        adv = None
-        if len(closes) >= 20:
-            adv = sum(closes[i] * vols[i] for i in range(-20, 0)) / 20
-        last_ts = data["as_of"]
-        if last_ts.tzinfo is None:
-            last_ts = last_ts.replace(tzinfo=_dt.timezone.utc)
-        # as_of = fetch time (latest available bars just pulled). The last bar's
-        # date (e.g. Friday over a weekend) is expected, not "stale", so it goes
-        # into the note rather than the freshness clock.
-        point = make_datapoint(f"{ticker}.bars", True, source="yfinance",
-                               kind="daily_bars", as_of=_dt.datetime.now(_dt.timezone.utc))
-        point.note = f"ostatnia świeca: {last_ts.date().isoformat()}"
-        return {"closes": closes, "highs": data["highs"], "lows": data["lows"],
-                "volumes": vols, "adv_dollars": adv, "point": point}
+        results = gateway.fetch_many("yfinance", keys, _batch, kind="daily_bars")
     except Exception as e:
-        return {"closes": [], "highs": [], "lows": [], "volumes": [], "adv_dollars": None,
-                "point": make_datapoint(f"{ticker}.bars", None, source="yfinance",
-                                        kind="daily_bars", error=str(e))}
+        return {t: _bars_missing(t, str(e)) for t in keys}
+    out = {}
+    for t, res in results.items():
+        if isinstance(res, Exception):
+            out[t] = _bars_missing(t, str(res))
+        else:
+            out[t] = _bars_result(t, res, period)
+    return out
 
 
-def get_earnings_date(ticker: str) -> DataPoint:
-    """Next scheduled earnings date with provenance."""
+def get_earnings_date(ticker: str, *, fresh: bool = False) -> DataPoint:
+    """Next scheduled earnings date with provenance (``fresh`` as in :func:`get_quote`)."""
     def _fetch():
         yf = _yf()
         t = yf.Ticker(ticker)
@@ -117,10 +276,11 @@ def get_earnings_date(ticker: str) -> DataPoint:
         raise ValueError("no earnings date")
 
     try:
-        iso = gateway.fetch("yfinance", f"earnings:{ticker}", _fetch, kind="earnings")
-        date = _dt.date.fromisoformat(iso[:10])
+        res = gateway.fetch_result("yfinance", f"earnings:{ticker}", _fetch, kind="earnings",
+                                   require_fresh=fresh)
+        date = _dt.date.fromisoformat(res.value[:10])
         return make_datapoint(f"{ticker}.earnings_date", date.isoformat(), source="yfinance",
-                              kind="earnings", as_of=_dt.datetime.now(_dt.timezone.utc))
+                              kind="earnings", as_of=res.fetched_at)
     except Exception as e:
         return make_datapoint(f"{ticker}.earnings_date", None, source="yfinance",
                               kind="earnings", error=str(e))
@@ -4,7 +4,8 @@ investing/relative_strength.py — multi-window, risk-adjusted relative strength
 Replaces the old "30d return minus QQQ" single number (kept only as one auxiliary
 feature). Computes RS21/63/126 vs a broad benchmark and a sector benchmark, plus
 beta-adjusted excess return, volatility-adjusted RS, and percentile ranks within
-the sector and the whole universe.
+the sector and the whole universe. The universe-wide batch version (and the
+session rank table plans read their percentiles from) is :mod:`investing.rs_rank`.
 """
 
 from __future__ import annotations
@@ -0,0 +1,246 @@
+"""
+investing/rs_rank.py — cross-sectional relative strength for the whole universe.
+
+:func:`relative_strength.compute` works one ticker at a time and the percentile
+ranks need populations nobody built, so ``pct_rank_sector`` /
+``pct_rank_universe`` stayed empty. Here RS21/63/126 (broad and sector), beta,
+beta-adjusted excess and vol-adjusted RS are computed for every universe ticker
+in one vectorized pass (tickers x sessions), and ranked with a sort
+(``searchsorted``) instead of pairwise counting.
+
+The resulting :class:`RankTable` is built per completed session by the nightly
+job (:func:`refresh`), or in the background when a plan finds it missing; a plan
+never builds it inline and goes without ranks until it lands. A plan looks its
+ticker up in O(1), and a ticker outside the universe is ranked against the
+stored sorted populations in O(log n).
+"""
+
+from __future__ import annotations
+
+import bisect
+import datetime as _dt
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+from . import indicators_np as vnp
+from . import config, market_calendar, universe
+
+logger = logging.getLogger(__name__)
+
+RANK_KEY = "rs63_broad"
+
+
+def _pct(values: np.ndarray, population: np.ndarray) -> np.ndarray:
+    """Inclusive percentile (0-100) of each value in a sorted population."""
+    if not len(population):
+        return np.full(len(values), np.nan)
+    below = np.searchsorted(population, values, side="left")
+    equal = np.searchsorted(population, values, side="right") - below
+    out = np.round((below + 0.5 * equal) / len(population) * 100, 1)
+    return np.where(np.isnan(values), np.nan, out)
+
+
+def _beta(stock: np.ndarray, bench: np.ndarray, window: int = 126) -> np.ndarray:
+    sr = vnp.daily_returns(stock[:, -window - 1:])
+    br = vnp.daily_returns(bench[None, -window - 1:])[0]
+    k = min(sr.shape[1], len(br))
+    sr, br = sr[:, sr.shape[1] - k:], br[len(br) - k:]
+    valid = ~np.isnan(sr) & ~np.isnan(br)[None, :]
+    n = valid.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        b = np.where(valid, br[None, :], 0.0)
+        s = np.where(valid, sr, 0.0)
+        mb = b.sum(axis=1) / n
+        ms = s.sum(axis=1) / n
+        db = np.where(valid, b - mb[:, None], 0.0)
+        ds = np.where(valid, s - ms[:, None], 0.0)
+        cov = (db * ds).sum(axis=1) / (n - 1)
+        var = (db * db).sum(axis=1) / (n - 1)
+        out = cov / var
+    return np.where((n >= 20) & (var != 0), out, np.nan)
+
+
+def compute_universe(
+    closes: dict[str, Sequence[float]],
+    broad_closes: Sequence[float],
+    sector_closes: Optional[dict[str, Sequence[float]]] = None,
+    sector_of: Callable[[str], str] = universe.sector_of,
+) -> dict[str, dict]:
+    """:func:`relative_strength.compute` for every ticker at once, plus
+    ``pct_rank_sector`` / ``pct_rank_universe`` on :data:`RANK_KEY`.
+    ``sector_closes`` maps sector name -> that sector benchmark's closes."""
+    tickers = list(closes)
+    if not tickers or not len(broad_closes):
+        return {}
+    c = vnp.stack([closes[t] for t in tickers])
+    broad = np.asarray(broad_closes, dtype=float)[None, :]
+    sectors = [sector_of(t) for t in tickers]
+    sec_arrays = {s: np.asarray(v, dtype=float)[None, :] for s, v in (sector_closes or {}).items() if len(v)}
+
+    cols: dict[str, np.ndarray] = {}
+    for w in (21, 63, 126):
+        s = vnp.pct_return(c, w)
+        b = vnp.pct_return(broad, w)[0]
+        cols[f"rs{w}_broad"] = np.round(s - b, 2)
+        sec = np.array([vnp.pct_return(sec_arrays[x], w)[0] if x in sec_arrays else np.nan
+                        for x in sectors])
+        cols[f"rs{w}_sector"] = np.round(s - sec, 2)
+
+    bt = _beta(c, np.asarray(broad_closes, dtype=float))
+    cols["beta"] = np.round(bt, 3)
+    s63, b63 = vnp.pct_return(c, 63), vnp.pct_return(broad, 63)[0]
+    cols["beta_adj_excess_63"] = np.round(s63 - bt * b63, 2)
+    vol = vnp.stdev(vnp.daily_returns(c[:, -64:]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cols["vol_adj_rs_63"] = np.where(np.nan_to_num(vol) != 0,
+                                         np.round(cols["rs63_broad"] / (vol * 100), 3), np.nan)
+    s30, b30 = vnp.pct_return(c, 30), vnp.pct_return(broad, 30)[0]
+    cols["aux_30d_minus_broad"] = np.round(s30 - b30, 2)
+
+    key = cols[RANK_KEY]
+    cols["pct_rank_universe"] = _pct(key, np.sort(key[~np.isnan(key)]))
+    rank_sector = np.full(len(tickers), np.nan)
+    sector_arr = np.array(sectors)
+    for sec in set(sectors):
+        m = sector_arr == sec
+        pop = key[m]
+        rank_sector[m] = _pct(pop, np.sort(pop[~np.isnan(pop)]))
+    cols["pct_rank_sector"] = rank_sector
+    return dict(zip(tickers, vnp.to_records(cols)))
+
+
+@dataclass
+class RankTable:
+    session: _dt.date
+    metrics: dict[str, dict] = field(default_factory=dict)
+    # sorted RANK_KEY populations, for ranking tickers outside the universe
+    universe_pop: list[float] = field(default_factory=list)
+    sector_pop: dict[str, list[float]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, session: _dt.date, metrics: dict[str, dict],
+              sector_of: Callable[[str], str] = universe.sector_of) -> "RankTable":
+        table = cls(session, metrics)
+        for t, m in metrics.items():
+            v = m.get(RANK_KEY)
+            if v is None:
+                continue
+            table.universe_pop.append(v)
+            table.sector_pop.setdefault(sector_of(t), []).append(v)
+        table.universe_pop.sort()
+        for pop in table.sector_pop.values():
+            pop.sort()
+        return table
+
+    def lookup(self, ticker: str) -> Optional[dict]:
+        return self.metrics.get(ticker)
+
+    @staticmethod
+    def _pct(value: float, pop: list[float]) -> Optional[float]:
+        if not pop:
+            return None
+        below = bisect.bisect_left(pop, value)
+        equal = bisect.bisect_right(pop, value) - below
+        return round((below + 0.5 * equal) / len(pop) * 100, 1)
+
+    def rank(self, value: Optional[float], sector: str) -> tuple[Optional[float], Optional[float]]:
+        """(sector, universe) percentile of ``value`` in O(log n)."""
+        if value is None:
+            return None, None
+        return self._pct(value, self.sector_pop.get(sector, [])), self._pct(value, self.universe_pop)
+
+
+def universe_tickers() -> list[str]:
+    return sorted(set(universe.WATCHLIST) | set(universe.SECTOR_OF))
+
+
+_TABLE: Optional[RankTable] = None
+_LOCK = threading.Lock()
+_BUILDING = False
+_FAILED_AT: Optional[float] = None          # time.monotonic() of the last failed build
+
+
+def build_table(session: Optional[_dt.date] = None) -> RankTable:
+    """Fetch universe + benchmark bars in bulk and rank them."""
+    from .providers import market_data
+
+    session = session or market_calendar.last_completed_session()
+    tickers = universe_tickers()
+    benches = sorted(set(universe.SECTOR_BENCHMARK.values()) | {universe.BROAD_BENCHMARK})
+    bars = market_data.get_bars_many(tickers + benches, period="1y")
+    closes = {t: bars[t]["closes"] for t in tickers if bars.get(t, {}).get("closes")}
+    sector_closes = {s: bars[b]["closes"] for s, b in universe.SECTOR_BENCHMARK.items()
+                     if bars.get(b, {}).get("closes")}
+    metrics = compute_universe(closes, bars[universe.BROAD_BENCHMARK]["closes"], sector_closes)
+    return RankTable.build(session, metrics)
+
+
+def refresh(session: Optional[_dt.date] = None) -> RankTable:
+    """The nightly job: build the session's table and make it the one plans read."""
+    global _TABLE, _FAILED_AT
+    session = session or market_calendar.last_completed_session()
+    try:
+        t = build_table(session)
+    except Exception:
+        with _LOCK:
+            _FAILED_AT = time.monotonic()
+        raise
+    with _LOCK:
+        _TABLE, _FAILED_AT = t, None
+    logger.info("RS rank table built for %s (%d tickers)", session, len(t.metrics))
+    return t
+
+
+def _build_in_background(session: _dt.date) -> None:
+    """Start one background :func:`refresh`, unless one is running or the last
+    one failed less than ``config.RS_RANK_RETRY`` seconds ago."""
+    global _BUILDING
+    with _LOCK:
+        if _BUILDING or (_FAILED_AT is not None
+                         and time.monotonic() - _FAILED_AT < config.RS_RANK_RETRY):
+            return
+        _BUILDING = True
+
+    def _run() -> None:
+        global _BUILDING
+        try:
+            refresh(session)
+        except Exception as e:                 # noqa: BLE001
+            logger.warning("RS rank table build failed: %s", e)
+        finally:
+            with _LOCK:
+                _BUILDING = False
+
+    threading.Thread(target=_run, name="rs-rank-build", daemon=True).start()
+
+
+def table() -> Optional[RankTable]:
+    """The last completed session's rank table, or None while it is missing (a
+    background build is then started; the caller never waits for it)."""
+    session = market_calendar.last_completed_session()
+    t = _TABLE
+    if t is not None and t.session == session:
+        return t
+    _build_in_background(session)
+    return None
+
+
+def attach_ranks(ticker: str, sector: str, rs: dict) -> dict:
+    """Fill ``pct_rank_sector`` / ``pct_rank_universe`` of a single-ticker RS dict:
+    the precomputed ranks for universe tickers, a bisect for anything else, and
+    None while the session's table is not built yet."""
+    t = table()
+    if t is None:
+        rs["pct_rank_sector"] = rs["pct_rank_universe"] = None
+        return rs
+    hit = t.lookup(ticker)
+    if hit is not None:
+        rs["pct_rank_sector"], rs["pct_rank_universe"] = hit["pct_rank_sector"], hit["pct_rank_universe"]
+    else:
+        rs["pct_rank_sector"], rs["pct_rank_universe"] = t.rank(rs.get(RANK_KEY), sector)
+    return rs
@@ -4,7 +4,8 @@ investing/runner.py — a bounded executor for Slack-triggered analyses.
 Replaces the pattern of spawning an unbounded number of daemon threads. Provides:
   * a single ThreadPoolExecutor capped at MAX_CONCURRENT_ANALYSES
   * idempotency / dedup so the same (user, ticker) isn't analysed twice at once
-  * a tiny helper to run a batch of tickers and report partial results
+  * :func:`submit_batch`: a batch of tickers as one task per ticker on the same
+    executor (deduped per ticker), so a batch never exceeds the cap either
 """
 
 from __future__ import annotations
@@ -56,6 +57,50 @@ def submit(idempotency_key: str, fn: Callable[[], None]) -> bool:
     return True
 
 
+def submit_batch(keys: dict[str, str], fn: Callable[[str], None], *,
+                 prepare: Optional[Callable[[list[str]], None]] = None,
+                 done: Optional[Callable[[], None]] = None) -> list[str]:
+    """Run ``fn(item)`` for every item of ``keys`` (``{item: idempotency key}``)
+    as its own task on the shared executor. Items whose key is already in flight
+    are skipped and returned. ``prepare(items)`` runs once, as a task, before the
+    items are queued; ``done()`` runs after the last item finishes."""
+    with _LOCK:
+        skipped = [i for i, k in keys.items() if k in _INFLIGHT]
+        items = [i for i in keys if i not in skipped]
+        _INFLIGHT.update(keys[i] for i in items)
+    if not items:
+        return skipped
+    remaining = [len(items)]
+
+    def _one(item: str) -> None:
+        try:
+            fn(item)
+        except Exception:                       # noqa: BLE001
+            logger.exception("analysis task failed: %s", keys[item])
+        finally:
+            with _LOCK:
+                _INFLIGHT.discard(keys[item])
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last and done is not None:
+                try:
+                    done()
+                except Exception:               # noqa: BLE001
+                    logger.exception("batch completion failed")
+
+    def _start() -> None:
+        if prepare is not None:
+            try:
+                prepare(items)
+            except Exception:                   # noqa: BLE001
+                logger.exception("batch preparation failed")
+        for item in items:
+            _executor().submit(_one, item)
+
+    _executor().submit(_start)
+    return skipped
+
+
 def inflight_count() -> int:
     with _LOCK:
         return len(_INFLIGHT)
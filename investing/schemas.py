@@ -239,6 +239,7 @@ class PositionPlan(BaseModel):
     asset_type: AssetType = AssetType.EQUITY
     strategy: str
     horizon_sessions: int
+    horizon_end: Optional[_dt.date] = None      # XNYS session the horizon runs out on
 
     decision_status: DecisionStatus
     decision_reason: str = ""
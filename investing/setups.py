@@ -371,6 +371,7 @@ def build_features(
     rs: dict,
     *,
     imminent_binary_event: bool = False,
+    streamed: Optional[dict] = None,
 ) -> dict:
     return {
         "closes": list(closes),
@@ -378,7 +379,7 @@ def build_features(
         "lows": list(lows),
         "volumes": list(volumes),
         "rs": rs or {},
-        "ext": ind.extension_metrics(closes, highs, lows, volumes),
+        "ext": ind.extension_metrics(closes, highs, lows, volumes, streamed),
         "base": ind.base_stats(closes, highs, lows),
         "volume_contraction": ind.volume_contraction(volumes),
         "higher_low": ind.higher_low(lows),
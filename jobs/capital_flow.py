@@ -13,7 +13,6 @@ import json
 import datetime
 import logging
 
-import yfinance as yf
 import _ctx
 from config.constants import CHANNEL_CLIENT_MAP
 
@@ -129,30 +128,18 @@ _snapshot_date: str = ""
 
 def fetch_sector_etf_performance() -> dict[str, float]:
     """Returns {etf: 5d_pct_change} for all sector ETFs."""
+    # windows over the cached per-ticker bar series: no download when the
+    # investing layer already holds them
+    from investing.providers import market_data
     result = {}
-    tickers = list(SECTOR_ETFS.keys())
     try:
-        data = yf.download(tickers, period="10d", interval="1d", progress=False, auto_adjust=True)
-        closes = data["Close"] if "Close" in data else data
-        for etf in tickers:
-            try:
-                series = closes[etf].dropna()
-                if len(series) >= 5:
-                    pct = round((series.iloc[-1] / series.iloc[-6] - 1) * 100, 2)
-                    result[etf] = pct
-            except Exception:
-                pass
+        for etf, bars in market_data.get_bars_many(list(SECTOR_ETFS.keys()), period="10d").items():
+            # dividend-adjusted: an ex-dividend day is not a drop
+            closes = bars.get("adj_closes") or bars["closes"]
+            if len(closes) >= 6:
+                result[etf] = round((closes[-1] / closes[-6] - 1) * 100, 2)
     except Exception as e:
-        logger.warning("ETF batch download error: %s", e)
-        # Fallback: one by one
-        for etf in tickers:
-            try:
-                h = yf.Ticker(etf).history(period="10d")
-                closes_s = h["Close"].dropna().tolist()
-                if len(closes_s) >= 5:
-                    result[etf] = round((closes_s[-1] / closes_s[-6] - 1) * 100, 2)
-            except Exception:
-                pass
+        logger.warning("ETF bars error: %s", e)
     return result
 
 
@@ -163,38 +150,31 @@ def fetch_etf_daily_data() -> dict[str, dict]:
     For each sector ETF fetch today's 1d return and estimated dollar volume.
     Returns {etf: {pct_1d, dollar_volume_m, vs_avg_30d}}
     """
-    tickers = list(SECTOR_ETFS.keys())
+    from investing.providers import market_data
     result: dict[str, dict] = {}
     try:
-        data = yf.download(tickers, period="35d", interval="1d", progress=False, auto_adjust=True)
-        closes  = data["Close"]  if "Close"  in data else data
-        volumes = data["Volume"] if "Volume" in data else None
-
-        for etf in tickers:
-            try:
-                c = closes[etf].dropna()
-                if len(c) < 2:
-                    continue
-                pct_1d = round((c.iloc[-1] / c.iloc[-2] - 1) * 100, 2)
-
-                dv_m = None
-                avg_30d_m = None
-                if volumes is not None:
-                    v = volumes[etf].dropna()
-                    if len(v) >= 2:
-                        today_dv = float(v.iloc[-1]) * float(c.iloc[-1]) / 1e6
-                        avg_dv   = float(v.iloc[-30:].mean()) * float(c.iloc[-1]) / 1e6 if len(v) >= 10 else None
-                        dv_m     = round(today_dv, 0)
-                        avg_30d_m = round(avg_dv, 0) if avg_dv else None
-
-                result[etf] = {
-                    "pct_1d":       pct_1d,
-                    "dollar_volume_m": dv_m,
-                    "avg_30d_m":    avg_30d_m,
-                    "vs_avg":       round(dv_m / avg_30d_m, 2) if (dv_m and avg_30d_m and avg_30d_m > 0) else None,
-                }
-            except Exception:
-                pass
+        for etf, bars in market_data.get_bars_many(list(SECTOR_ETFS.keys()), period="35d").items():
+            c, v = bars["closes"], bars["volumes"]
+            if len(c) < 2:
+                continue
+            adj = bars.get("adj_closes") or c          # returns: dividend-adjusted
+            pct_1d = round((adj[-1] / adj[-2] - 1) * 100, 2)
+
+            dv_m = None
+            avg_30d_m = None
+            if len(v) >= 2:
+                today_dv = v[-1] * c[-1] / 1e6
+                recent = v[-30:]
+                avg_dv   = sum(recent) / len(recent) * c[-1] / 1e6 if len(v) >= 10 else None
+                dv_m     = round(today_dv, 0)
+                avg_30d_m = round(avg_dv, 0) if avg_dv else None
+
+            result[etf] = {
+                "pct_1d":       pct_1d,
+                "dollar_volume_m": dv_m,
+                "avg_30d_m":    avg_30d_m,
+                "vs_avg":       round(dv_m / avg_30d_m, 2) if (dv_m and avg_30d_m and avg_30d_m > 0) else None,
+            }
     except Exception as e:
         logger.warning("ETF daily data error: %s", e)
     return result
@@ -58,3 +58,32 @@ def benchmark_series(n: int = 220, drift: float = 1.001):
         p *= drift
         closes.append(round(p, 2))
     return closes
+
+
+def bar_store_history(store, tickers, n: int = 700):
+    """``n`` XNYS sessions of seeded random-walk rows for SPY (mild drift) and
+    each of ``tickers`` (stronger drift, more volatile), written to ``store``.
+    Returns the session dates."""
+    import datetime as dt
+    import numpy as np
+    from investing import market_calendar
+
+    days = [dt.date(2021, 1, 4)]
+    while len(days) < n:
+        days.append(market_calendar.next_trading_day(days[-1]))
+
+    def rows(seed, drift, vol):
+        rng = np.random.default_rng(seed)
+        px, out = 100.0, []
+        for d in days:
+            o = px
+            px *= 1 + rng.normal(drift, vol)
+            hi = max(o, px) * (1 + abs(rng.normal(0, vol / 2)))
+            lo = min(o, px) * (1 - abs(rng.normal(0, vol / 2)))
+            out.append((d, o, hi, lo, px, px, float(rng.integers(1_000_000, 5_000_000))))
+        return out
+
+    store.write("SPY", rows(0, 0.0004, 0.01), complete_from=days[0])
+    for k, t in enumerate(tickers):
+        store.write(t, rows(k + 1, 0.0012, 0.022), complete_from=days[0])
+    return days
@@ -40,3 +40,114 @@ def test_horizons_only_record_when_enough_bars(tmp_path):
                                                setup_type="BREAKOUT", db_path=db)
     # horizons 5 and 10 recorded; 20/40/60 skipped
     assert len(ids) == 2
+
+
+def test_track_outcomes_scores_elapsed_horizons_in_bulk(tmp_path):
+    import datetime as dt
+    from investing import market_calendar, persistence
+
+    db = str(tmp_path / "bt.db")
+    made = dt.date(2026, 1, 5)
+    good = persistence.save_position_plan(
+        {"created_at": "2026-01-05T15:00:00+00:00", "ticker": "NVDA", "setup_type": "BREAKOUT",
+         "decision_status": "READY_TO_ENTER", "entry_trigger": 100, "technical_stop": 95,
+         "target_1": 110}, db_path=db)
+    persistence.save_position_plan(
+        {"created_at": "2026-01-05T15:00:00+00:00", "ticker": "AMD", "decision_status": "WAIT_FOR_TRIGGER",
+         "entry_trigger": 100}, db_path=db)
+    for status in ("NO_TRADE", "DATA_INCOMPLETE"):       # never scored, never in the rollups
+        persistence.save_position_plan(
+            {"created_at": "2026-01-05T15:00:00+00:00", "ticker": "NVDA", "setup_type": "BREAKOUT",
+             "decision_status": status, "entry_trigger": 100, "technical_stop": 95,
+             "target_1": 110}, db_path=db)
+
+    days = [made]
+    for _ in range(70):
+        days.append(market_calendar.next_trading_day(days[-1]))
+    closes = [100.0 + i * 0.1 for i in range(len(days))]
+    bars = {"NVDA": {"dates": [d.toordinal() for d in days], "closes": closes, "opens": closes,
+                     "highs": [c + 1 for c in closes], "lows": [c - 1 for c in closes]}}
+    calls = []
+
+    def fetch(tickers, period):
+        calls.append((tuple(tickers), period))
+        return bars
+
+    first = backtest.track_outcomes(session=days[12], db_path=db, get_bars_many=fetch)
+    assert first["outcomes"] == 2 and calls == [(("NVDA",), "1y")]
+    assert [p["id"] for p in persistence.pending_outcome_plans(db)] == [good]
+    assert backtest.track_outcomes(session=days[12], db_path=db, get_bars_many=fetch)["outcomes"] == 0
+
+    last = backtest.track_outcomes(session=days[65], db_path=db, get_bars_many=fetch)
+    assert last["outcomes"] == 3
+    assert persistence.pending_outcome_plans(db) == []
+    conn = persistence.init_db(db)
+    assert conn.execute("SELECT count(*) FROM recommendation_outcomes").fetchone()[0] == 5
+    assert conn.execute("SELECT as_of FROM recommendation_outcomes WHERE horizon_session = 5"
+                        ).fetchone()[0] == days[5].isoformat()
+    assert conn.execute("SELECT count(*) FROM job_runs WHERE job = 'outcome_tracking' AND status = 'ok'"
+                        ).fetchone()[0] == 3
+    assert conn.execute("SELECT sum(n) FROM outcome_rollups WHERE dimension = 'setup_type'"
+                        ).fetchone()[0] == 5
+
+
+def _wait_plan(db, persistence, trigger=105, stop=95):
+    return persistence.save_position_plan(
+        {"created_at": "2026-01-05T15:00:00+00:00", "ticker": "NVDA", "setup_type": "BREAKOUT",
+         "decision_status": "WAIT_FOR_TRIGGER", "entry_trigger": trigger, "technical_stop": stop,
+         "target_1": 120}, db_path=db)
+
+
+def _series_bars(days, closes, highs, lows):
+    return {"NVDA": {"dates": [d.toordinal() for d in days], "closes": closes, "opens": closes,
+                     "highs": highs, "lows": lows}}
+
+
+def test_wait_for_trigger_that_never_fills_is_not_scored(tmp_path):
+    import datetime as dt
+    from investing import market_calendar, persistence
+
+    db = str(tmp_path / "bt.db")
+    plan = _wait_plan(db, persistence)
+    days = [dt.date(2026, 1, 5)]
+    for _ in range(70):
+        days.append(market_calendar.next_trading_day(days[-1]))
+    closes = [max(100.0 - i * 0.1, 94.0) for i in range(len(days))]   # drifts 100 -> 94
+    bars = _series_bars(days, closes, [min(c + 0.5, 100.5) for c in closes], [c - 0.5 for c in closes])
+    fetch = lambda tickers, period: bars                               # noqa: E731
+
+    assert backtest.track_outcomes(session=days[20], db_path=db, get_bars_many=fetch)["outcomes"] == 0
+    assert [p["id"] for p in persistence.pending_outcome_plans(db)] == [plan]   # may still fill
+    last = backtest.track_outcomes(session=days[65], db_path=db, get_bars_many=fetch)
+    assert last["outcomes"] == 0 and persistence.pending_outcome_plans(db) == []
+    conn = persistence.init_db(db)
+    assert conn.execute("SELECT count(*) FROM recommendation_outcomes").fetchone()[0] == 0
+    assert conn.execute("SELECT count(*) FROM outcome_rollups").fetchone()[0] == 0
+
+
+def test_wait_for_trigger_scored_from_fill_and_cancelled_by_stop_first(tmp_path):
+    import datetime as dt
+    from investing import market_calendar, persistence
+
+    db = str(tmp_path / "bt.db")
+    filled = _wait_plan(db, persistence)
+    days = [dt.date(2026, 1, 5)]
+    for _ in range(20):
+        days.append(market_calendar.next_trading_day(days[-1]))
+    # sessions after the plan: 3 quiet ones, then the trigger is reached and price climbs
+    closes = [100.0] * 4 + [106.0 + i for i in range(len(days) - 4)]
+    bars = _series_bars(days, closes, [c + 0.5 for c in closes], [c - 0.5 for c in closes])
+    fetch = lambda tickers, period: bars                               # noqa: E731
+
+    assert backtest.track_outcomes(session=days[7], db_path=db, get_bars_many=fetch)["outcomes"] == 0
+    assert backtest.track_outcomes(session=days[8], db_path=db, get_bars_many=fetch)["outcomes"] == 1
+    row = persistence.init_db(db).execute(
+        "SELECT as_of, r_multiple FROM recommendation_outcomes WHERE plan_id = ?", (filled,)).fetchone()
+    assert row["as_of"] == days[8].isoformat()               # fill on days[4] + 5 sessions
+    assert row["r_multiple"] == round((closes[8] - 105) / 10, 3)
+
+    stopped = _wait_plan(db, persistence, trigger=110, stop=99.8)    # first low 99.5 < stop
+    backtest.track_outcomes(session=days[8], db_path=db, get_bars_many=fetch)
+    assert stopped not in [p["id"] for p in persistence.pending_outcome_plans(db)]
+    assert persistence.init_db(db).execute(
+        "SELECT count(*) FROM recommendation_outcomes WHERE plan_id = ?", (stopped,)).fetchone()[0] == 0
@@ -0,0 +1,153 @@
+"""Local OHLCV store — incremental refresh, corporate-action re-adjustment."""
+
+import datetime as dt
+
+import pytest
+
+from investing import market_calendar
+from investing.bar_store import BarStore, period_start
+
+
+def _sessions(start, n):
+    out, d = [], start
+    while len(out) < n:
+        if market_calendar.is_trading_day(d):
+            out.append(d)
+        d += dt.timedelta(days=1)
+    return out
+
+
+def _rows(days, base=100.0, adj=1.0):
+    return [(d, base + i, base + i + 1, base + i - 1, base + i, (base + i) * adj, 1000.0)
+            for i, d in enumerate(days)]
+
+
+def _after_close(d):
+    return market_calendar.market_close_utc(d) + dt.timedelta(hours=1)
+
+
+DAYS = _sessions(dt.date(2025, 3, 3), 30)
+
+
+class _Source:
+    """Upstream stub: full history up to ``upto`` with optional split/dividend."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def __call__(self, since):
+        self.calls.append(since)
+        return [r for r in self.rows if r[0] >= since]
+
+
+def test_first_load_then_only_missing_sessions(tmp_path):
+    store = BarStore(str(tmp_path))
+    src = _Source(_rows(DAYS[:20]))
+    bars = store.history("AAPL", DAYS[0], src, now_utc=_after_close(DAYS[19]))
+    assert len(bars) == 20 and src.calls == [DAYS[0]]
+
+    # same day again: nothing to download
+    store.history("AAPL", DAYS[0], src, now_utc=_after_close(DAYS[19]))
+    assert len(src.calls) == 1
+
+    # five sessions later: only the overlap + the new sessions are requested
+    src.rows = _rows(DAYS[:25])
+    bars = store.history("AAPL", DAYS[0], src, now_utc=_after_close(DAYS[24]))
+    assert src.calls[-1] > DAYS[10]
+    assert bars.dates == DAYS[:25] and bars.close[-1] == 124.0
+    assert store.last_session("AAPL") == DAYS[24]
+
+
+def test_split_rescales_stored_history(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.history("X", DAYS[0], _Source(_rows(DAYS[:20])), now_utc=_after_close(DAYS[19]))
+
+    # 2:1 split after DAYS[19]: upstream now reports all history halved
+    split = [(d, o / 2, h / 2, lo / 2, c / 2, a / 2, v * 2) for d, o, h, lo, c, a, v in _rows(DAYS[:25])]
+    bars = store.history("X", DAYS[0], _Source(split), now_utc=_after_close(DAYS[24]))
+    assert bars.close[0] == pytest.approx(50.0)
+    assert bars.volume[0] == pytest.approx(2000.0)
+    assert bars.close == pytest.approx([r[4] for r in split])
+
+
+def test_dividend_rescales_adjusted_close_only(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.history("X", DAYS[0], _Source(_rows(DAYS[:20])), now_utc=_after_close(DAYS[19]))
+    bars = store.history("X", DAYS[0], _Source(_rows(DAYS[:25], adj=0.99)),
+                         now_utc=_after_close(DAYS[24]))
+    assert bars.close[0] == 100.0
+    assert bars.adj_close[0] == pytest.approx(99.0)
+
+
+def test_live_bar_returned_but_not_persisted(tmp_path):
+    store = BarStore(str(tmp_path))
+    mid_session = market_calendar.market_open_utc(DAYS[20]) + dt.timedelta(hours=1)
+    bars = store.history("X", DAYS[0], _Source(_rows(DAYS[:21])), now_utc=mid_session)
+    assert bars.last == DAYS[20]
+    assert store.last_session("X") == DAYS[19]
+
+
+def test_longer_period_than_stored_refetches_from_new_start(tmp_path):
+    store = BarStore(str(tmp_path))
+    src = _Source(_rows(DAYS[:20]))
+    store.history("X", DAYS[10], src, now_utc=_after_close(DAYS[19]))
+    bars = store.history("X", DAYS[0], src, now_utc=_after_close(DAYS[19]))
+    assert src.calls == [DAYS[10], DAYS[0]] and len(bars) == 20
+
+
+def test_memmap_matches_rows(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.history("X", DAYS[0], _Source(_rows(DAYS[:5])), now_utc=_after_close(DAYS[4]))
+    mm = store.memmap("X")
+    assert mm.shape == (5, 7)
+    assert mm[0, 0] == DAYS[0].toordinal() and mm[4, 4] == 104.0
+
+
+def test_period_start():
+    today = dt.date(2025, 6, 18)
+    assert period_start("1y", today) == dt.date(2024, 6, 18)
+    assert period_start("6mo", today) == dt.date(2024, 12, 18)
+    assert period_start("ytd", today) == dt.date(2025, 1, 1)
+    # sessions, not calendar days: Juneteenth-adjacent week
+    assert period_start("5d", dt.date(2025, 6, 23)) == dt.date(2025, 6, 16)
+
+
+@pytest.mark.parametrize("returned", [[], _rows(DAYS[:3])])
+def test_empty_or_short_refresh_keeps_stored_history(tmp_path, returned):
+    from investing.bar_store import EmptyFetch
+
+    store = BarStore(str(tmp_path))
+    store.history("X", DAYS[0], _Source(_rows(DAYS[:20])), now_utc=_after_close(DAYS[19]))
+    failing = _Source(returned)                     # e.g. a 429 answered with an empty frame
+    with pytest.raises(EmptyFetch):
+        store.history("X", DAYS[0], failing, now_utc=_after_close(DAYS[24]))
+    assert len(store.read("X")) == 20 and store.last_session("X") == DAYS[19]
+    assert len(failing.calls) == 1                  # no full refetch on top of a failure
+    with pytest.raises(EmptyFetch):                 # a rebuild shorter than what is stored
+        store.ingest("X", _rows(DAYS[:5]), fetched_from=DAYS[0], now_utc=_after_close(DAYS[24]))
+    assert len(store.read("X")) == 20
+
+    with pytest.raises(EmptyFetch):                 # a first load that gets nothing stores nothing
+        store.history("Y", DAYS[0], _Source([]), now_utc=_after_close(DAYS[19]))
+    assert store.read("Y") is None
+
+
+def test_refresh_creates_and_advances_indicator_state(tmp_path):
+    from investing import indicators as ind
+
+    store = BarStore(str(tmp_path))
+    rows = _rows(DAYS)
+    store.history("AAPL", DAYS[0], _Source(rows[:25]), now_utc=_after_close(DAYS[24]))
+    assert store._load_state("AAPL").last_date == DAYS[24]      # created by the refresh
+
+    # one session later, mid-session: the live bar is folded in, not stored
+    live_at = market_calendar.market_close_utc(DAYS[26]) - dt.timedelta(hours=1)
+    bars = store.history("AAPL", DAYS[0], _Source(rows[:27]), now_utc=live_at)
+    assert store._load_state("AAPL").last_date == DAYS[25]
+    vals = store.indicator_values("AAPL", bars)
+    assert vals["rsi14"] == ind.rsi(bars.close)
+    assert vals["atr"] == ind.atr(bars.high, bars.low, bars.close)
+    assert vals["ma20"] == ind.sma(bars.close, 20)
+    assert ind.extension_metrics(bars.close, bars.high, bars.low, bars.volume, vals) == \
+        ind.extension_metrics(bars.close, bars.high, bars.low, bars.volume)
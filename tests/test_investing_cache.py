@@ -0,0 +1,139 @@
+"""L2 cache tests — binary codec, cross-instance reuse, sweeper, own table."""
+
+import datetime as dt
+import sqlite3
+
+import pytest
+
+from investing import cache, gateway, persistence
+from investing.gateway import Gateway
+
+
+@pytest.fixture(autouse=True)
+def _no_sleep(monkeypatch):
+    monkeypatch.setattr(gateway, "_SLEEP", lambda s: None)
+
+
+@pytest.fixture()
+def db(tmp_path):
+    return str(tmp_path / "cache_test.db")
+
+
+def _bars():
+    return {"closes": [100.0, 101.5, 99.25], "highs": [101.0, 102.0, 100.0],
+            "lows": [99.0, 100.5, 98.0], "volumes": [1e6, 1.2e6, 9e5],
+            "as_of": dt.datetime(2025, 7, 3, 20, 0, tzinfo=dt.timezone.utc)}
+
+
+def test_codec_roundtrips_bar_arrays_and_datetimes():
+    bars = _bars()
+    assert cache.decode(cache.encode(bars)) == bars
+
+
+def test_codec_keeps_int_arrays_int_and_mixed_lists_as_is():
+    value = {"dates": [739000, 739001, 739004], "closes": [1.5, 2.0],
+             "mixed": [1, 2.5], "flags": [True, False]}
+    out = cache.decode(cache.encode(value))
+    assert out == value
+    assert [type(x) for x in out["dates"]] == [int] * 3
+    assert [type(x) for x in out["mixed"]] == [int, float]
+
+
+def test_codec_packs_arrays_compactly():
+    n = 252
+    bars = {k: [100.0 + i * 0.01 for i in range(n)] for k in ("closes", "highs", "lows", "volumes")}
+    import json
+    assert len(cache.encode(bars)) < len(json.dumps(bars))
+
+
+def test_codec_plain_json_and_uncacheable():
+    assert cache.decode(cache.encode((4.2, "2025-07-01"))) == [4.2, "2025-07-01"]
+    with pytest.raises(TypeError):
+        cache.encode(object())
+
+
+def test_l2_survives_a_restart(db):
+    calls = {"n": 0}
+
+    def fn():
+        calls["n"] += 1
+        return _bars()
+
+    Gateway(l2=True, db_path=db).fetch("yfinance", "bars:SPY:1y", fn, ttl=100)
+    restarted = Gateway(l2=True, db_path=db)
+    assert restarted.fetch("yfinance", "bars:SPY:1y", fn, ttl=100) == _bars()
+    assert calls["n"] == 1
+    st = restarted.stats()
+    assert st["l1_misses"] == 1 and st["l2_hits"] == 1 and st["upstream_loads"] == 0
+
+
+def test_batch_served_from_l2_counts_an_l1_miss_not_a_hit(db):
+    Gateway(l2=True, db_path=db).fetch("yfinance", "bars:SPY:1y", _bars, ttl=100)
+    restarted = Gateway(l2=True, db_path=db)
+    res = restarted.fetch_many("yfinance", {"SPY": "bars:SPY:1y"},
+                               lambda ids: pytest.fail("went upstream"), ttl=100)
+    assert res["SPY"].value == _bars()
+    st = restarted.stats()
+    assert st["l1_misses"] == 1 and st.get("l1_hits", 0) == 0 and st["l2_hits"] == 1
+    snap = restarted.snapshot()["sources"]["yfinance"]
+    assert snap["cache_hit_ratio"] == 1.0
+
+
+def test_sweeper_removes_expired_rows(db):
+    l2 = cache.SQLiteCache(db, sweep_interval=0)
+    now = dt.datetime.now(dt.timezone.utc)
+    l2.put("live", {"v": 1}, source="s", fetched_at=now, fresh_for=100, max_age=100)
+    l2.put("dead", {"v": 2}, source="s", fetched_at=now, fresh_for=1, max_age=1)
+    persistence.connect(db).execute("UPDATE gateway_cache SET expires_at = 0 WHERE key='dead'")
+    assert l2.get("dead") is None
+    assert l2.sweep() == 1
+    assert l2.get("live").value == {"v": 1}
+    assert l2.stats()["swept"] == 1
+
+
+def test_l2_and_legacy_api_cache_do_not_share_rows(tmp_path):
+    path = str(tmp_path / "old.db")
+    with sqlite3.connect(path) as c:
+        c.execute("CREATE TABLE api_cache (key TEXT PRIMARY KEY, value TEXT, source TEXT,"
+                  " fetched_at TEXT, ttl_seconds REAL)")
+    persistence.cache_set("k", {"legacy": 1}, ttl_seconds=1000, db_path=path)
+    l2 = cache.SQLiteCache(path, sweep_interval=0)
+    l2.put("k", {"closes": [1.0]}, source="s", fetched_at=dt.datetime.now(dt.timezone.utc),
+           fresh_for=100, max_age=100)
+    assert persistence.cache_get("k", path) == {"legacy": 1}
+    assert l2.get("k").value == {"closes": [1.0]}
+
+
+class _E:
+    def __init__(self, value, max_until=float("inf")):
+        self.value = value
+        self.max_until = max_until
+
+
+def test_memory_cache_evicts_least_recently_used_over_byte_budget():
+    one = cache.approx_size([1.0] * 100)
+    mc = cache.MemoryCache(max_bytes=int(one * 2.5), max_entries=100, purge_interval=1e9)
+    mc.put("a", _E([1.0] * 100))
+    mc.put("b", _E([2.0] * 100))
+    assert mc.get("a") is not None          # touch a -> b becomes LRU
+    mc.put("c", _E([3.0] * 100))
+    assert "b" not in mc and "a" in mc and "c" in mc
+    st = mc.stats()
+    assert st["evictions_lru"] == 1 and st["entries"] == 2
+    assert st["bytes"] <= st["max_bytes"]
+
+
+def test_memory_cache_entry_cap_and_expired_purge():
+    mc = cache.MemoryCache(max_bytes=10 ** 9, max_entries=2, purge_interval=0)
+    mc.put("dead", _E("x", max_until=0))
+    mc.put("live", _E("y"))                  # put triggers the purge of "dead"
+    assert "dead" not in mc and mc.stats()["evictions_expired"] == 1
+    mc.put("k1", _E(1)); mc.put("k2", _E(2))
+    assert len(mc) == 2 and "live" not in mc
+
+
+def test_gateway_reports_l1_memory_metrics():
+    gw = Gateway()
+    gw.fetch("src", "bars", lambda: {"closes": [1.0] * 252}, ttl=100)
+    st = gw.stats()
+    assert st["l1_entries"] == 1 and st["l1_bytes"] > 252 * 8
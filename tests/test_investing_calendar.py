@@ -19,6 +19,16 @@ def test_known_holidays_2025():
     assert not mc.is_trading_day(dt.date(2025, 11, 27))  # Thanksgiving
 
 
+def test_special_closures_and_mlk_from_1998():
+    for d in (dt.date(2001, 9, 11), dt.date(2001, 9, 14), dt.date(2012, 10, 29),
+              dt.date(2018, 12, 5), dt.date(2025, 1, 9)):
+        assert not mc.is_trading_day(d)
+    assert mc.is_trading_day(dt.date(1997, 1, 20))      # MLK Day, before the NYSE observed it
+    assert not mc.is_trading_day(dt.date(1998, 1, 19))
+    assert mc.sessions_between(dt.date(2001, 9, 10), dt.date(2001, 9, 17)) == 1
+    assert mc.add_sessions(dt.date(2012, 10, 26), 1) == dt.date(2012, 10, 31)
+
+
 def test_regular_open_in_utc_during_edt():
     # 2025-07-07 is a Monday in EDT (UTC-4) -> 9:30 ET == 13:30 UTC
     o = mc.market_open_utc(dt.date(2025, 7, 7))
@@ -52,3 +62,43 @@ def test_next_pre_open_brief_skips_holiday_and_weekend():
     nxt = mc.next_pre_open_brief_utc(now)
     assert mc.is_trading_day(nxt.date())
     assert nxt > now
+
+
+def _walk(d, n):
+    step = mc.next_trading_day if n > 0 else mc.previous_trading_day
+    for _ in range(abs(n)):
+        d = step(d)
+    return d
+
+
+def test_session_arithmetic_matches_walking_the_calendar():
+    start = dt.date(2025, 12, 20)
+    for k in range(40):
+        d = start + dt.timedelta(days=k)
+        for n in (1, 5, 20, -1, -7):
+            assert mc.add_sessions(d, n) == _walk(d, n)
+        end = mc.add_sessions(d, 20)
+        assert mc.sessions_between(d, end) == 20
+    assert mc.sessions_between(dt.date(2025, 12, 24), dt.date(2025, 12, 26)) == 1   # Christmas
+    assert mc.sessions_between(dt.date(2026, 1, 10), dt.date(2026, 1, 1)) == 0
+
+
+def test_session_ordinal():
+    fri, mon = dt.date(2025, 7, 3), dt.date(2025, 7, 7)               # July 4th in between
+    assert mc.session_ordinal(mon) - mc.session_ordinal(fri) == 1
+    a, b = dt.date(2020, 3, 2), dt.date(2026, 3, 2)
+    assert mc.session_ordinal(b) - mc.session_ordinal(a) == mc.sessions_between(a, b)
+    for bad in (dt.date(2025, 7, 4), dt.date(2025, 7, 5), dt.date(1985, 1, 2)):
+        try:
+            mc.session_ordinal(bad)
+        except ValueError:
+            continue
+        raise AssertionError(bad)
+
+
+def test_dates_outside_the_index_fall_back_to_the_rules():
+    d = dt.date(2081, 12, 23)
+    assert mc.add_sessions(d, 2) == _walk(d, 2) == dt.date(2081, 12, 26)
+    assert mc.sessions_between(dt.date(1985, 1, 1), dt.date(1985, 1, 31)) == \
+        sum(mc.is_trading_day(dt.date(1985, 1, k)) for k in range(2, 32))
+    assert not mc.is_trading_day(dt.date(1985, 12, 25))
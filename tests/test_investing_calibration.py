@@ -0,0 +1,69 @@
+"""Calibration sweeps: settings, config overrides, feature reuse across settings."""
+
+import pathlib
+import sys
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent))
+import invest_fixtures as fx  # noqa: E402
+
+from investing import bar_store, calibration, config, historical_backtest as hb  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = bar_store.BarStore(str(tmp_path / "bars"))
+    return s, fx.bar_store_history(s, ["NVDA", "AMD"], n=500)
+
+
+def test_grid_and_random_settings():
+    space = {"MAX_CHASE_ATR": [0.5, 1.0], "RR_MIN_BY_REGIME.BULL": [1.5, 2.0, 2.5]}
+    settings = calibration.grid(space)
+    assert len(settings) == 6 and {"MAX_CHASE_ATR": 1.0, "RR_MIN_BY_REGIME.BULL": 2.5} in settings
+    picked = calibration.random_settings(space, 4, seed=1)
+    assert len(picked) == 4 and all(p in settings for p in picked)
+    assert picked == calibration.random_settings(space, 4, seed=1)
+    assert len(calibration.grid()) == len(calibration.random_settings(None, 10_000))
+
+
+def test_overrides_apply_and_restore():
+    chase, rr = config.MAX_CHASE_ATR, config.RR_MIN_BY_REGIME
+    with calibration.overrides({"MAX_CHASE_ATR": 9.0, "RR_MIN_BY_REGIME.BULL": 1.1}):
+        assert config.MAX_CHASE_ATR == 9.0
+        assert config.RR_MIN_BY_REGIME["BULL"] == 1.1
+        assert config.RR_MIN_BY_REGIME["BEAR"] == rr["BEAR"]
+    assert config.MAX_CHASE_ATR == chase and config.RR_MIN_BY_REGIME is rr and rr["BULL"] == 2.0
+    with pytest.raises(ValueError):
+        with calibration.overrides({"NOT_A_SETTING": 1}):
+            pass
+
+
+def test_sweep_reuses_features_and_matches_replay(store, monkeypatch):
+    s, days = store
+    calls = []
+    real = hb.features_at
+    monkeypatch.setattr(hb, "features_at", lambda job, series, i: calls.append((job.ticker, i)) or real(job, series, i))
+
+    baseline = hb.run(["NVDA", "AMD"], start=days[0], end=days[-1], workers=0, root=s.root)
+    single = len(calls)
+    calls.clear()
+    settings = [{}, {"RR_MIN_BY_REGIME.BULL": 2.0}, {"MAX_CHASE_ATR": config.MAX_CHASE_ATR}]
+    rows = calibration.sweep(settings, ["NVDA", "AMD"], start=days[0], end=days[-1], workers=0, root=s.root)
+
+    assert len(calls) == len(set(calls)) == single        # computed once for all three settings
+    assert len(rows) == 3
+    assert all(r["n"] == len(baseline.trades) and r["avg_r"] == hb.summarize(baseline.trades)["avg_r"]
+               for r in rows)
+
+
+def test_sweep_reports_per_setting(store):
+    s, days = store
+    strict = {"RR_MIN_BY_REGIME": {k: 50.0 for k in config.RR_MIN_BY_REGIME}}
+    rows = calibration.sweep([strict, {}], ["NVDA", "AMD"], start=days[0], end=days[-1],
+                             workers=2, root=s.root)
+    by = {tuple(r["setting"]): r for r in rows}
+    assert by[("RR_MIN_BY_REGIME",)]["n"] == 0 and by[("RR_MIN_BY_REGIME",)]["avg_r"] is None
+    assert rows[-1]["setting"] == strict                   # no trades sorts last
+    with pytest.raises(ValueError):
+        calibration.sweep([{"MAX_CHASE_ATR.X": 1}], ["NVDA"], root=s.root)
@@ -0,0 +1,74 @@
+"""Nightly correlation/beta matrix — parity with portfolio.correlation, O(1) lookups."""
+
+import datetime as dt
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from investing import correlation_matrix as cm  # noqa: E402
+from investing import portfolio, rs_rank  # noqa: E402
+
+
+def _walk(n, seed, common=None, k=0.0):
+    rng = random.Random(seed)
+    px, out = 100.0, []
+    for i in range(n):
+        shock = k * common[i - n] if common else 0.0
+        px *= 1 + shock + rng.gauss(0, 0.006)
+        out.append(px)
+    return out
+
+
+_rng = random.Random(7)
+COMMON = [_rng.gauss(0, 0.01) for _ in range(200)]
+CLOSES = {t: _walk(n, i, COMMON, k) for i, (t, n, k) in enumerate(
+    [("A", 200, 1.0), ("B", 200, 1.2), ("C", 90, 0.0), ("D", 40, 2.0), ("E", 15, 1.0)])}
+BROAD = _walk(200, 99, COMMON, 1.0)
+
+
+def test_matches_pairwise_reference_and_rs_beta():
+    window = 126            # rs_rank's beta window
+    names, corr, beta = cm.compute(CLOSES, BROAD, window)
+    m = cm.CorrelationMatrix.from_arrays(dt.date(2024, 6, 3), window, names, corr, beta)
+    for a in CLOSES:
+        for b in CLOSES:
+            want = portfolio.correlation(CLOSES[a][-window - 1:], CLOSES[b][-window - 1:])
+            got = m.get(a, b)
+            if want is None:
+                assert got is None, (a, b)
+            else:
+                assert got == pytest.approx(want, abs=0.0011), (a, b)
+    ref_beta = rs_rank.compute_universe(CLOSES, BROAD, sector_of=lambda t: "S")
+    for t in CLOSES:
+        want = ref_beta[t]["beta"]
+        assert (m.beta_of(t) is None) if want is None else m.beta_of(t) == pytest.approx(want, abs=1e-3)
+
+
+def test_round_trip_and_lookup_helpers(tmp_path):
+    names, corr, beta = cm.compute(CLOSES, BROAD, 126)
+    m = cm.CorrelationMatrix.from_arrays(dt.date(2024, 6, 3), 126, names, corr, beta)
+    path = str(tmp_path / "corr.npz")
+    m.save(path)
+    back = cm.CorrelationMatrix.load(path)
+    assert back.session == dt.date(2024, 6, 3) and back.tickers == names
+    assert back.get("A", "D") == m.get("A", "D") and back.get("A", "D") > 0.8
+    assert back.get("A", "ZZZ") is None and back.get("E", "A") is None
+    got = back.correlations_for("A", ["A", "B", "E", "ZZZ"])
+    assert set(got) == {"B"}
+    assert cm.matrix(str(tmp_path / "missing.npz")) is None
+    assert cm.matrix(path).get("A", "B") == m.get("A", "B")
+
+
+def test_high_correlation_reaches_the_portfolio_warning():
+    names, corr, beta = cm.compute(CLOSES, BROAD, 126)
+    m = cm.CorrelationMatrix.from_arrays(dt.date(2024, 6, 3), 126, names, corr, beta)
+    corrs = m.correlations_for("A", ["D", "C"])
+    assert corrs["D"] >= portfolio.config.CORRELATION_WARN > corrs["C"]
+    imp = portfolio.evaluate_new_position(
+        ticker="A", sector="S", narrative="N", entry_price=10, stop_price=9, quantity=10,
+        portfolio_value=100_000, open_positions=[{"ticker": "D"}, {"ticker": "C"}],
+        correlations=corrs,
+    )
+    assert imp.correlation_warning and "D" in imp.correlation_warning
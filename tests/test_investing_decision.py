@@ -109,3 +109,12 @@ def test_llm_never_sets_numbers():
     # numbers are engine-derived; LLM only contributed prose
     assert plan.bull_case == ["x"]
     assert isinstance(plan.recommended_quantity, int)
+
+
+def test_horizon_end_counts_sessions_from_the_price_date():
+    ins = _ready_inputs()
+    ins["price_point"] = ins["price_point"].model_copy(
+        update={"as_of": dt.datetime(2025, 12, 19, 18, 0, tzinfo=dt.timezone.utc)})
+    ins["horizon_sessions"] = 5
+    # 22, 23, 24, (Christmas), 26, 29 December
+    assert dmod.decide(**ins).horizon_end == dt.date(2025, 12, 29)
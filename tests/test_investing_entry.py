@@ -0,0 +1,54 @@
+"""Batch position plans — shared inputs fetched once, per-ticker results streamed."""
+
+from investing import entry, persistence, rs_rank
+from investing.providers import market_data
+
+
+def test_batch_prefetches_shared_inputs_once_and_streams_each_plan(monkeypatch):
+    bulk, calls, streamed = [], [], []
+    monkeypatch.setattr(market_data, "get_bars_many", lambda ts, period="1y": bulk.append(list(ts)) or {})
+    monkeypatch.setattr(entry, "market_regime", lambda fetched=None: calls.append("regime"))
+    monkeypatch.setattr(rs_rank, "table", lambda: calls.append("rs"))
+    monkeypatch.setattr(persistence, "list_open_positions",
+                        lambda db_path=None: calls.append("positions") or [{"ticker": "AMD"}])
+
+    def fake_plan(ticker, amount, risk_pct, *, open_positions, **kw):
+        assert open_positions == [{"ticker": "AMD"}]
+        if ticker == "BAD":
+            raise RuntimeError("no data")
+        return f"plan:{ticker}:{amount}"
+
+    monkeypatch.setattr(entry, "build_position_plan", fake_plan)
+    out = entry.build_position_plans(["nvda", "BAD", "NVDA", "MSFT"], 5000,
+                                     on_plan=lambda t, r: streamed.append(t))
+
+    assert list(out) == ["NVDA", "BAD", "MSFT"]
+    assert out["NVDA"] == "plan:NVDA:5000"
+    assert isinstance(out["BAD"], RuntimeError)
+    assert sorted(streamed) == ["BAD", "MSFT", "NVDA"]
+    assert len(bulk) == 1 and {"NVDA", "MSFT", "BAD", "SPY"} <= set(bulk[0])
+    assert sorted(calls) == ["positions", "regime", "rs"]
+    assert entry.build_position_plans([]) == {}
+
+
+def test_llm_pool_is_created_once_under_concurrent_first_use(monkeypatch):
+    import threading
+
+    monkeypatch.setattr(entry, "_LLM_POOL", None)
+    created = []
+    real = entry.ThreadPoolExecutor
+
+    def slow_pool(**kw):
+        created.append(kw)
+        threading.Event().wait(0.05)               # widen the check-then-create window
+        return real(**kw)
+
+    monkeypatch.setattr(entry, "ThreadPoolExecutor", slow_pool)
+    pools = []
+    threads = [threading.Thread(target=lambda: pools.append(entry._llm_pool())) for _ in range(4)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join(5)
+    assert len(created) == 1 and len({id(p) for p in pools}) == 1
+    pools[0].shutdown(wait=False)
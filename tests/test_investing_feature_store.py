@@ -0,0 +1,65 @@
+"""Feature store — cache per (ticker, bar date, config version)."""
+
+import pytest
+
+from investing import config, feature_store, setups
+from investing.feature_store import FeatureStore
+
+
+def _series(n=120):
+    closes = [50 + i * 0.3 + (i % 7) * 0.2 for i in range(n)]
+    highs = [c * 1.01 for c in closes]
+    lows = [c * 0.99 for c in closes]
+    vols = [1_000_000.0 + (i % 5) * 1000 for i in range(n)]
+    return closes, highs, lows, vols
+
+
+@pytest.fixture
+def fs(tmp_path, monkeypatch):
+    calls = {"n": 0}
+    real = setups.build_features
+
+    def counting(*a, **kw):
+        calls["n"] += 1
+        return real(*a, **kw)
+
+    monkeypatch.setattr(setups, "build_features", counting)
+    store = FeatureStore(db_path=str(tmp_path / "f.db"))
+    store.calls = calls
+    return store
+
+
+def test_same_bar_date_is_served_from_cache(fs):
+    c, h, lo, v = _series()
+    feat1, setup1 = fs.features_and_setup("AAA", "2025-06-02", c, h, lo, v, {"rs_pct": 1.0})
+    feat2, setup2 = fs.features_and_setup("AAA", "2025-06-02", c, h, lo, v, {"rs_pct": 1.0})
+    assert fs.calls["n"] == 1
+    assert setup2 == setup1
+    assert feat2["ext"] == feat1["ext"] and feat2["closes"] == c
+
+
+def test_new_bar_config_or_inputs_recompute(fs, monkeypatch):
+    c, h, lo, v = _series()
+    fs.features_and_setup("AAA", "2025-06-02", c, h, lo, v, {})
+    fs.features_and_setup("AAA", "2025-06-03", c + [c[-1]], h + [h[-1]], lo + [lo[-1]], v + [v[-1]], {})
+    assert fs.calls["n"] == 2
+    fs.features_and_setup("AAA", "2025-06-02", c, h, lo, v, {}, imminent_binary_event=True)
+    assert fs.calls["n"] == 3
+    monkeypatch.setattr(config, "CONFIG_VERSION", "test-bump")
+    fs.features_and_setup("AAA", "2025-06-02", c, h, lo, v, {})
+    assert fs.calls["n"] == 4
+
+
+def test_persisted_entry_reused_by_another_process(fs, tmp_path):
+    c, h, lo, v = _series()
+    _, setup = fs.features_and_setup("AAA", "2025-06-02", c, h, lo, v, {})
+    other = FeatureStore(db_path=str(tmp_path / "f.db"))     # fresh memory, same DB
+    _, again = other.features_and_setup("AAA", "2025-06-02", c, h, lo, v, {})
+    assert fs.calls["n"] == 1
+    assert again.setup_type == setup.setup_type and again.stop == setup.stop
+
+
+def test_fingerprint_tracks_live_bar():
+    c, h, lo, v = _series()
+    a = feature_store.fingerprint(c, h, lo, v, {}, False)
+    assert a != feature_store.fingerprint(c[:-1] + [c[-1] + 1], h, lo, v, {}, False)
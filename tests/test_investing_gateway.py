@@ -94,3 +94,343 @@ def test_rate_limiter_blocks_excess():
     rl = RateLimiter(max_calls=2, window=1000)
     assert rl.allow() and rl.allow()
     assert not rl.allow()
+
+
+def test_concurrent_misses_coalesce_into_one_upstream_call():
+    import threading
+    import time
+
+    gw = Gateway()
+    release = threading.Event()
+    calls = {"n": 0}
+
+    def slow():
+        calls["n"] += 1
+        release.wait(5)
+        return "bars"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(gw.fetch("src", "bars:SPY:1y", slow, ttl=100)))
+               for _ in range(4)]
+    threads[0].start()
+    while "bars:SPY:1y" not in gw._inflight:
+        time.sleep(0.001)
+    for t in threads[1:]:
+        t.start()
+    while gw._inflight["bars:SPY:1y"].waiters < 3:
+        time.sleep(0.001)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert results == ["bars"] * 4
+    assert calls["n"] == 1
+    assert gw.stats()["coalesced"] == 3
+    assert gw.stats()["upstream_loads"] == 1
+
+
+def test_coalesced_waiters_use_their_own_fallback_on_failure():
+    import threading
+    import time
+
+    gw = Gateway()
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise RuntimeError("down")
+
+    out = {}
+    leader = threading.Thread(target=lambda: out.setdefault(
+        "leader", gw.fetch("src", "k", fail, max_retries=0, ttl=0, fallback=lambda: "L")))
+    leader.start()
+    while "k" not in gw._inflight:
+        time.sleep(0.001)
+    follower = threading.Thread(target=lambda: out.setdefault(
+        "follower", gw.fetch("src", "k", fail, max_retries=0, ttl=0, fallback=lambda: "F")))
+    follower.start()
+    while gw._inflight["k"].waiters < 1:
+        time.sleep(0.001)
+    release.set()
+    leader.join(5); follower.join(5)
+    assert out == {"leader": "L", "follower": "F"}
+
+
+def test_stale_entry_served_immediately_and_revalidated_in_background():
+    import time
+
+    gw = Gateway()
+    calls = {"n": 0}
+
+    def fn():
+        calls["n"] += 1
+        return calls["n"]
+
+    first = gw.fetch_result("src", "swr", fn, ttl=0, max_age=100)
+    assert first.value == 1 and not first.stale
+
+    second = gw.fetch_result("src", "swr", fn, ttl=0, max_age=100)
+    assert second.value == 1 and second.stale           # served stale, not blocked
+    assert second.fetched_at == first.fetched_at        # keeps the real fetch time
+    deadline = time.monotonic() + 5
+    while "swr" in gw._inflight and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert calls["n"] == 2
+    assert gw.stats()["stale_served"] == 1 and gw.stats()["revalidations"] == 1
+    assert gw.fetch("src", "swr", fn, ttl=0, max_age=100) == 2
+
+
+def test_stale_value_yields_stale_datapoint(monkeypatch):
+    import datetime as dt
+
+    from investing.data_quality import make_datapoint
+
+    old = dt.datetime.now(dt.timezone.utc) - dt.timedelta(seconds=120)
+    monkeypatch.setattr(gateway, "_utcnow", lambda: old)
+    gw = Gateway()
+    gw.fetch("src", "q", lambda: 10.0, ttl=0, max_age=300)
+    res = gw.fetch_result("src", "q", lambda: 11.0, ttl=0, max_age=300)
+    dp = make_datapoint("X.price", res.value, source="src", kind="quote", as_of=res.fetched_at)
+    assert res.stale and dp.status.value == "STALE"
+
+
+def test_require_fresh_refetches_stale_entry_and_falls_back_to_it_on_failure():
+    gw = Gateway()
+    gw.fetch("src", "rf", lambda: 1, ttl=0, max_age=100)
+    res = gw.fetch_result("src", "rf", lambda: 2, ttl=0, max_age=100, require_fresh=True)
+    assert res.value == 2 and not res.stale              # refetched, not served stale
+
+    def down():
+        raise RuntimeError("down")
+
+    res = gw.fetch_result("src", "rf", down, ttl=0, max_age=100, max_retries=0,
+                          require_fresh=True)
+    assert res.value == 2 and res.stale                  # stale beats nothing
+    assert gw.stats()["revalidations"] == 0
+
+
+def test_require_fresh_waiter_on_failed_revalidation_gets_the_stale_value():
+    import threading
+    import time
+
+    gw = Gateway()
+    gw.fetch("src", "rw", lambda: 1, ttl=0, max_age=100)
+    gate = threading.Event()
+
+    def down():
+        gate.wait(5)
+        raise RuntimeError("down")
+
+    # a plain read serves stale and starts a background revalidation that fails
+    assert gw.fetch_result("src", "rw", down, ttl=0, max_age=100, max_retries=0).stale
+    out = {}
+    follower = threading.Thread(target=lambda: out.update(res=gw.fetch_result(
+        "src", "rw", down, ttl=0, max_age=100, max_retries=0, require_fresh=True)))
+    follower.start()
+    deadline = time.monotonic() + 5
+    while gw._inflight.get("rw") is not None and gw._inflight["rw"].waiters == 0 \
+            and time.monotonic() < deadline:
+        time.sleep(0.001)
+    gate.set()
+    follower.join(5)
+    assert out["res"].value == 1 and out["res"].stale     # not degraded
+    assert gw.stats()["coalesced"] == 1 and gw.stats()["stale_served"] == 2
+
+
+def test_expired_beyond_max_age_blocks_and_refetches():
+    gw = Gateway()
+    calls = {"n": 0}
+
+    def fn():
+        calls["n"] += 1
+        return calls["n"]
+
+    gw.fetch("src", "hard", fn, ttl=0)          # explicit ttl: no stale window
+    assert gw.fetch_result("src", "hard", fn, ttl=0).value == 2
+    assert gw.stats()["stale_served"] == 0
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def now(self):
+        return self.t
+
+    def sleep(self, s):
+        self.t += s
+
+
+def test_token_bucket_burst_then_paced_acquire():
+    clk = _Clock()
+    rl = RateLimiter(max_calls=60, window=60, burst=3, _now=clk.now, _sleep=clk.sleep)
+    assert rl.allow() and rl.allow() and rl.allow()    # burst capacity
+    assert not rl.allow()
+    assert rl.acquire(timeout=5)                       # waits ~1 s for a refill
+    assert clk.t == pytest.approx(1.0)
+
+
+def test_token_bucket_acquire_gives_up_when_timeout_too_short():
+    clk = _Clock()
+    rl = RateLimiter(max_calls=1, window=60, _now=clk.now, _sleep=clk.sleep)
+    assert rl.acquire(timeout=0)
+    assert not rl.acquire(timeout=10)                  # next token in 60 s
+    assert clk.t == 0.0                                # did not sleep pointlessly
+
+
+def test_per_source_budgets_come_from_config(monkeypatch):
+    from investing import config
+    monkeypatch.setitem(config.RATE_LIMITS, "FRED", {"per_minute": 30, "burst": 4})
+    lim = Gateway().limiter("FRED", max_calls=999)
+    assert lim.capacity == 4 and lim.rate == pytest.approx(0.5)
+
+
+def test_bulkhead_tracks_zombies_and_refuses_when_saturated(monkeypatch):
+    import threading
+    import time
+
+    from investing import config
+    monkeypatch.setitem(config.BULKHEAD_WORKERS, "slow", 1)
+    gw = Gateway()
+    hang = threading.Event()
+    calls = {"n": 0}
+
+    def hung():
+        calls["n"] += 1
+        hang.wait(5)
+        return "late"
+
+    with pytest.raises(GatewayError):
+        gw.fetch("slow", "a", hung, timeout=0.05, max_retries=0, ttl=0)
+    assert gw.bulkhead_stats()["slow"]["zombies"] == 1
+
+    # saturated: refused without calling the source, other sources unaffected
+    assert gw.fetch("slow", "b", hung, timeout=0.05, max_retries=0, ttl=0,
+                    fallback=lambda: "degraded") == "degraded"
+    assert calls["n"] == 1
+    assert gw.bulkhead_stats()["slow"]["refused"] == 1
+    assert gw.fetch("other", "c", lambda: "ok", ttl=0) == "ok"
+
+    hang.set()                              # the zombie finally returns
+    deadline = time.monotonic() + 5
+    while gw.bulkhead_stats()["slow"]["zombies"] and time.monotonic() < deadline:
+        time.sleep(0.001)
+    st = gw.bulkhead_stats()["slow"]
+    assert st["zombies"] == 0 and st["abandoned"] == 1
+    assert gw.fetch("slow", "d", lambda: "fresh", ttl=0) == "fresh"
+
+
+def test_histogram_nearest_rank_percentiles():
+    from investing.metrics import Registry
+
+    reg = Registry()
+    for ms in range(1, 101):
+        reg.observe("lat", float(ms), source="s")
+    h = reg.histogram("lat", source="s")
+    assert (h["p50"], h["p95"], h["p99"], h["max"], h["count"]) == (50.0, 95.0, 99.0, 100.0, 100)
+    assert reg.histogram("lat", source="other") is None
+
+
+def test_snapshot_reports_hit_ratio_retries_degraded_and_breaker(monkeypatch):
+    import json
+
+    from investing import config
+    monkeypatch.setitem(config.GATEWAY, "cb_threshold", 2)
+    monkeypatch.setitem(config.GATEWAY, "cb_cooldown", 1000)
+    gw = Gateway()
+    calls = {"n": 0}
+
+    def flaky():
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise RuntimeError("transient")
+        return 1
+
+    gw.fetch("src", "k", flaky, max_retries=1, ttl=60)
+    for _ in range(3):
+        gw.fetch("src", "k", flaky, ttl=60)              # L1 hits
+
+    def fail():
+        raise RuntimeError("down")
+
+    for key in ("x", "y", "z"):                         # trips the breaker on the 2nd
+        gw.fetch("bad", key, fail, max_retries=0, ttl=0, fallback=lambda: None)
+
+    snap = gw.snapshot()
+    src = snap["sources"]["src"]
+    assert src["cache_hit_ratio"] == 0.75
+    assert src["retries"] == 1 and src["errors"] == 1
+    assert src["latency_ms"]["count"] == 2
+    assert src["breaker"] == "closed" and src["degraded"] == 0
+
+    bad = snap["sources"]["bad"]
+    assert bad["breaker"] == "open"
+    assert bad["breaker_transitions"] == 1
+    assert bad["degraded"] == 3
+    assert gw.metrics.counter("gateway_degraded", source="bad", reason="circuit open") == 1
+    assert json.loads(gw.snapshot_json())["sources"]["bad"]["breaker"] == "open"
+
+
+def test_fetch_many_batches_misses_and_fills_per_key_cache():
+    gw = Gateway()
+    gw.fetch("src", "px:A", lambda: "cached-A", ttl=60)
+    batches = []
+
+    def batch(ids):
+        batches.append(list(ids))
+        return {i: f"v-{i}" for i in ids if i != "GONE"}
+
+    keys = {t: f"px:{t}" for t in ("A", "B", "C", "D", "GONE")}
+    out = gw.fetch_many("src", keys, batch, ttl=60, chunk_size=2, max_retries=0)
+
+    assert list(out) == ["A", "B", "C", "D", "GONE"]
+    assert out["A"].value == "cached-A"
+    assert [out[t].value for t in "BCD"] == ["v-B", "v-C", "v-D"]
+    assert isinstance(out["GONE"], GatewayError)
+    assert batches == [["B", "C"], ["D", "GONE"]]
+    # the batch landed under the per-key entries single fetches use
+    assert gw.fetch("src", "px:C", lambda: pytest.fail("should be cached"), ttl=60) == "v-C"
+
+
+def test_fetch_many_failed_chunk_maps_to_errors_only_for_that_chunk():
+    gw = Gateway()
+
+    def batch(ids):
+        if "BAD" in ids:
+            raise RuntimeError("boom")
+        return {i: i.lower() for i in ids}
+
+    keys = {t: t for t in ("X", "BAD", "Y", "Z")}
+    out = gw.fetch_many("src", keys, batch, ttl=60, chunk_size=2, max_retries=0)
+    assert isinstance(out["X"], GatewayError) and isinstance(out["BAD"], GatewayError)
+    assert out["Y"].value == "y" and out["Z"].value == "z"
+    assert not gw._inflight
+
+
+def test_gather_runs_calls_concurrently_and_keeps_partial_results():
+    import threading
+    import time
+
+    barrier = threading.Barrier(3, timeout=2)     # only passes if all three run at once
+
+    def slow(v):
+        barrier.wait()
+        return v
+
+    def boom():
+        barrier.wait()
+        raise RuntimeError("source down")
+
+    gw = Gateway()
+    out = gw.gather({"a": lambda: slow(1), "b": lambda: slow(2), "c": boom}, deadline=5)
+    assert out["a"] == 1 and out["b"] == 2
+    assert isinstance(out["c"], GatewayError) and "source down" in str(out["c"])
+
+    release = threading.Event()
+    t0 = time.monotonic()
+    out = gw.gather({"fast": lambda: "ok", "hung": lambda: release.wait(5)}, deadline=0.2)
+    release.set()
+    assert time.monotonic() - t0 < 2
+    assert out["fast"] == "ok"
+    assert isinstance(out["hung"], GatewayError) and "deadline" in str(out["hung"])
+    assert gw.metrics.total("gateway_gather", result="deadline") == 1
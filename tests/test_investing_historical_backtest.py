@@ -0,0 +1,57 @@
+"""Historical replay: regime reconstruction, per-ticker replay, expectancy table."""
+
+import datetime as dt
+import pathlib
+import sys
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent))
+import invest_fixtures as fx  # noqa: E402
+
+from investing import bar_store, historical_backtest as hb  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = bar_store.BarStore(str(tmp_path / "bars"))
+    return s, fx.bar_store_history(s, ["NVDA", "AMD", "PLTR"])
+
+
+def test_regime_is_unknown_until_ma200_exists():
+    closes = [100 + i * 0.1 for i in range(260)]
+    regimes = hb.reconstruct_regimes(list(range(260)), closes)
+    assert all(regimes[i] == "UNKNOWN" for i in range(199))
+    assert all(regimes[i] != "UNKNOWN" for i in range(199, 260))
+
+
+def test_replay_in_pool_matches_in_process(store):
+    s, days = store
+    tickers = ["NVDA", "AMD", "PLTR"]
+    local = hb.run(tickers, start=days[0], end=days[-1], workers=0, root=s.root)
+    pooled = hb.run(tickers, start=days[0], end=days[-1], workers=2, root=s.root)
+    assert local.trades and pooled.trades == local.trades
+
+    for t in tickers:                      # one position at a time per ticker
+        entries = [days.index(dt.date.fromisoformat(x["date"])) for x in local.trades if x["ticker"] == t]
+        assert all(b - a > local.horizon for a, b in zip(entries, entries[1:]))
+    table = local.table()
+    assert sum(row["n"] for row in table.values()) == len(local.trades)
+
+
+def test_missing_ticker_yields_no_trades(store):
+    s, days = store
+    assert hb.run(["ZZZZ"], start=days[0], end=days[-1], workers=0, root=s.root).trades == []
+
+
+def test_expectancy_table():
+    trades = [
+        {"setup_type": "BREAKOUT", "r_multiple": 2.0, "mfe": 2.5, "mae": -0.2, "hit_target_1": True, "hit_stop": False},
+        {"setup_type": "BREAKOUT", "r_multiple": -1.0, "mfe": 0.3, "mae": -1.0, "hit_target_1": False, "hit_stop": True},
+        {"setup_type": "PULLBACK_CONTINUATION", "r_multiple": 0.5, "mfe": 1.0, "mae": -0.4,
+         "hit_target_1": False, "hit_stop": False},
+    ]
+    table = hb.expectancy_table(trades)
+    assert table["BREAKOUT"] == {"n": 2, "win_rate": 0.5, "avg_r": 0.5, "avg_win_r": 2.0, "avg_loss_r": -1.0,
+                                 "avg_mfe": 1.4, "avg_mae": -0.6, "target_1_rate": 0.5, "stop_rate": 0.5}
+    assert table["PULLBACK_CONTINUATION"]["avg_loss_r"] is None
@@ -0,0 +1,82 @@
+"""Streaming indicators — parity with the list functions, persistence."""
+
+import datetime as dt
+import json
+import random
+
+import pytest
+
+from investing import indicators as ind
+from investing.indicator_state import IndicatorState
+
+
+def _bars(n, seed=7):
+    rng = random.Random(seed)
+    out, px, d = [], 100.0, dt.date(2024, 1, 1)
+    for i in range(n):
+        px = max(1.0, px * (1 + rng.gauss(0, 0.02)))
+        hi, lo = px * (1 + abs(rng.gauss(0, 0.01))), px * (1 - abs(rng.gauss(0, 0.01)))
+        out.append((d + dt.timedelta(days=i), hi, lo, px, float(rng.randint(1000, 9000))))
+    return out
+
+
+def _reference(bars):
+    h = [b[1] for b in bars]
+    lo = [b[2] for b in bars]
+    c = [b[3] for b in bars]
+    v = [b[4] for b in bars]
+    return {"ma20": ind.sma(c, 20), "ma50": ind.sma(c, 50),
+            "ema21": ind.ema_series(c, 21)[-1] if c else None,
+            "rsi14": ind.rsi(c), "atr": ind.atr(h, lo, c), "avg_volume50": ind.sma(v, 50)}
+
+
+@pytest.mark.parametrize("n", [1, 14, 15, 16, 49, 50, 120])
+def test_streaming_values_identical_to_list_functions(n):
+    bars = _bars(n)
+    st = IndicatorState()
+    for b in bars:
+        st.update(*b)
+    got = st.values()
+    for k, want in _reference(bars).items():
+        assert got[k] == want, k
+
+
+def test_state_round_trips_and_resumes():
+    bars = _bars(80)
+    st = IndicatorState()
+    for b in bars[:60]:
+        st.update(*b)
+    st = IndicatorState.from_state(json.loads(json.dumps(st.state())))
+    for b in bars[55:]:                      # overlapping sessions are ignored
+        st.update(*b)
+    assert st.bars == 80
+    assert st.values()["rsi14"] == ind.rsi([b[3] for b in bars])
+
+
+def test_peek_evaluates_live_bar_without_committing():
+    bars = _bars(60)
+    st = IndicatorState()
+    for b in bars[:-1]:
+        st.update(*b)
+    before = st.state()
+    live = bars[-1]
+    assert st.peek(live[1], live[2], live[3], live[4])["atr"] == _reference(bars)["atr"]
+    assert st.state() == before
+
+
+def test_bar_store_keeps_state_in_step_with_appends(tmp_path):
+    from investing.bar_store import BarStore
+
+    store = BarStore(str(tmp_path))
+    rows = [(d, c, h, lo, c, c, v) for d, h, lo, c, v in _bars(40)]
+    store.write("X", rows[:30], complete_from=rows[0][0])
+    assert store.indicators("X").last_date == rows[29][0]
+
+    store.append("X", rows[30:])
+    st = store._load_state("X")               # advanced by append, no recompute
+    assert st.last_date == rows[-1][0]
+    assert st.values()["rsi14"] == ind.rsi([r[4] for r in rows])
+
+    store.write("X", rows, complete_from=rows[0][0])   # rewrite invalidates
+    assert store._load_state("X").last_date is None
+    assert store.indicators("X").bars == 40
@@ -0,0 +1,94 @@
+"""Parity: the NumPy indicator engine must match the pure-Python reference."""
+
+import math
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from investing import indicators as ind  # noqa: E402
+from investing import indicators_np as vnp  # noqa: E402
+
+
+def _walk(n, seed):
+    rng = random.Random(seed)
+    c, h, lo, v = [], [], [], []
+    px = 50 + seed
+    for _ in range(n):
+        px = max(1.0, px * (1 + rng.gauss(0.001, 0.02)))
+        c.append(round(px, 2))
+        h.append(round(px * (1 + abs(rng.gauss(0, 0.01))), 2))
+        lo.append(round(px * (1 - abs(rng.gauss(0, 0.01))), 2))
+        v.append(float(rng.randint(1_000, 50_000)))
+    return {"closes": c, "highs": h, "lows": lo, "volumes": v}
+
+
+# short, around every threshold, and a full year; ragged on purpose
+UNIVERSE = {f"T{i}": _walk(n, i) for i, n in enumerate([0, 1, 5, 11, 15, 19, 20, 25, 40, 61, 70, 120, 252])}
+
+
+def _arrays():
+    ts = list(UNIVERSE)
+    return ts, tuple(vnp.stack([UNIVERSE[t][k] for t in ts]) for k in ("closes", "highs", "lows", "volumes"))
+
+
+def _same(got, want):
+    if want is None:
+        assert got is None or (isinstance(got, float) and math.isnan(got))
+    elif isinstance(want, bool):
+        assert bool(got) == want
+    else:
+        assert got == pytest.approx(want, rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize("name,args", [
+    ("sma", (20,)), ("sma", (50,)), ("rsi", ()), ("pct_return", (5,)),
+    ("consecutive_up_sessions", ()), ("stdev", ()), ("parabolic_acceleration", ()),
+])
+def test_close_based_scalars_match(name, args):
+    ts, (c, _, _, _) = _arrays()
+    got = getattr(vnp, name)(c, *args)
+    for i, t in enumerate(ts):
+        _same(got[i].item(), getattr(ind, name)(UNIVERSE[t]["closes"], *args))
+
+
+def test_range_and_volume_indicators_match():
+    ts, (c, h, lo, v) = _arrays()
+    atr, piv = vnp.atr(h, lo, c), vnp.pivot_high(h)
+    vr, vc, hl = vnp.volume_ratio(v, 1), vnp.volume_contraction(v), vnp.higher_low(lo)
+    for i, t in enumerate(ts):
+        b = UNIVERSE[t]
+        _same(atr[i].item(), ind.atr(b["highs"], b["lows"], b["closes"]))
+        _same(piv[i].item(), ind.pivot_high(b["highs"]))
+        _same(vr[i].item(), ind.volume_ratio(b["volumes"], 1))
+        _same(vc[i].item(), ind.volume_contraction(b["volumes"]))
+        _same(hl[i].item(), ind.higher_low(b["lows"]))
+
+
+def test_series_outputs_match():
+    ts, (c, h, lo, _) = _arrays()
+    ema, trs = vnp.ema_series(c, 10), vnp.true_ranges(h, lo, c)
+    for i, t in enumerate(ts):
+        b = UNIVERSE[t]
+        want_ema = ind.ema_series(b["closes"], 10)
+        assert ema[i, ema.shape[1] - len(want_ema):].tolist() == pytest.approx(want_ema)
+        want_tr = ind.true_ranges(b["highs"], b["lows"], b["closes"])
+        assert trs[i, trs.shape[1] - len(want_tr):].tolist() == pytest.approx(want_tr)
+
+
+def test_scan_matches_build_features_exactly_for_the_decision_core():
+    from investing.setups import build_features
+
+    out = vnp.scan(UNIVERSE)
+    for t, b in UNIVERSE.items():
+        ref = build_features(b["closes"], b["highs"], b["lows"], b["volumes"], {})
+        got = out[t]
+        assert set(got["ext"]) == set(ref["ext"])
+        for k, want in ref["ext"].items():
+            _same(got["ext"][k], want)
+        assert set(got["base"]) == set(ref["base"])
+        for k, want in ref["base"].items():
+            _same(got["base"][k], want)
+        assert got["volume_contraction"] == ref["volume_contraction"]
+        assert got["higher_low"] == ref["higher_low"]
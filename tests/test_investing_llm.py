@@ -65,3 +65,21 @@ def test_tool_schema_generated_from_pydantic():
     assert tool["name"] == "submit_qualitative"
     assert "properties" in tool["input_schema"]
     assert "bull_case" in tool["input_schema"]["properties"]
+
+
+def test_qualitative_cached_per_ticker_day_and_model(tmp_path, monkeypatch):
+    from investing import config
+
+    db = str(tmp_path / "llm.db")
+    client = _FakeClient([{"thesis_summary": "ok", "bull_case": ["a"], "bear_case": ["b"]}])
+    kw = dict(system="s", user="u", client=client, db_path=db)
+    first = llm.cached_qualitative("NVDA", day="2024-06-03", **kw)
+    again = llm.cached_qualitative("NVDA", day="2024-06-03", **kw)
+    assert client.messages.calls == 1
+    assert again.model_dump() == first.model_dump()
+
+    llm.cached_qualitative("NVDA", day="2024-06-04", **kw)        # new day
+    llm.cached_qualitative("AMD", day="2024-06-03", **kw)         # other name
+    monkeypatch.setattr(config, "CLAUDE_MODEL_PRIMARY", "other-model")
+    llm.cached_qualitative("NVDA", day="2024-06-03", **kw)        # model change
+    assert client.messages.calls == 4
@@ -0,0 +1,63 @@
+"""Market-data provider — period windows over the canonical bar series."""
+
+import datetime as dt
+
+import pytest
+
+from investing import gateway
+from investing.providers import market_data
+
+
+@pytest.fixture
+def gw(monkeypatch):
+    g = gateway.Gateway()
+    monkeypatch.setattr(gateway, "_GATEWAY", g)
+    monkeypatch.setattr(market_data, "_yf", lambda: pytest.fail("network access"))
+    return g
+
+
+def _year_of_bars():
+    today = dt.date.today()
+    days = [today - dt.timedelta(days=i) for i in range(365, -1, -1)]
+    days = [d for d in days if d.weekday() < 5]
+    n = len(days)
+    return {"closes": [float(i) for i in range(n)], "highs": [float(i) for i in range(n)],
+            "lows": [float(i) for i in range(n)], "volumes": [1.0] * n,
+            "dates": [d.toordinal() for d in days],
+            "as_of": dt.datetime.combine(days[-1], dt.time())}
+
+
+def test_shorter_periods_are_sliced_from_cached_canonical_series(gw):
+    value = _year_of_bars()
+    gw.fetch("yfinance", "bars:SPY:1y", lambda: value, kind="daily_bars")
+
+    assert len(market_data.get_bars("SPY", "1y")["closes"]) == len(value["closes"])
+    assert market_data.get_bars("SPY", "5d")["closes"] == value["closes"][-5:]
+    six = market_data.get_bars("SPY", "6mo")["closes"]
+    assert 120 < len(six) < 135 and six[-1] == value["closes"][-1]
+    many = market_data.get_bars_many(["SPY"], period="35d")
+    assert many["SPY"]["closes"] == value["closes"][-35:]
+
+
+def test_longer_period_is_its_own_series():
+    assert market_data._source_period("6mo") == "1y"
+    assert market_data._source_period("10d") == "1y"
+    assert market_data._source_period("2y") == "2y"
+
+
+def test_bar_store_series_exposes_dividend_adjusted_closes(gw, tmp_path, monkeypatch):
+    from investing import bar_store, config
+
+    monkeypatch.setitem(config.BAR_STORE, "enabled", True)
+    monkeypatch.setattr(bar_store, "_STORE", bar_store.BarStore(str(tmp_path)))
+    value = _year_of_bars()
+    days = [dt.date.fromordinal(d) for d in value["dates"]][:-1]
+    rows = [(d, 100.0, 101.0, 99.0, 100.0, 100.0 if i < len(days) - 1 else 99.0, 1.0)
+            for i, d in enumerate(days)]
+    bar_store.store().write("XLE", rows, complete_from=days[0])
+    monkeypatch.setattr(bar_store.BarStore, "plan", lambda self, t, start, now_utc=None: None)
+    monkeypatch.setattr(market_data, "_yf", lambda: None)         # store is current: no download
+
+    bars = market_data.get_bars("XLE", "10d")
+    assert bars["closes"][-1] == 100.0 and bars["adj_closes"][-1] == 99.0
+    assert len(bars["adj_closes"]) == len(bars["closes"]) == 10
@@ -48,3 +48,51 @@ def test_macro_impact_is_sector_specific():
                                         "breadth": 1.0}, [], sector="AI/Semis",
                                        rate_trend="rising")
     assert "AI/Semis" in bull.macro_impact or bull.macro_impact
+
+
+def test_regime_is_shared_across_plans_and_recorded_once_per_session(tmp_path, monkeypatch):
+    import datetime as dt
+
+    from investing import config, entry, market_calendar, persistence
+    from investing.schemas import DataPoint, DataStatus
+
+    db = str(tmp_path / "mh.db")
+    monkeypatch.setattr(config, "DB_PATH", db)
+    monkeypatch.setattr(entry, "_REGIME", None)
+    monkeypatch.setattr(market_calendar, "last_completed_session", lambda *a: dt.date(2024, 6, 3))
+    gathered = []
+
+    def fake_gather(calls, **kw):
+        gathered.append(set(calls))
+        out = {k: {"closes": [100.0 + i for i in range(250)]} for k in calls}
+        for k in ("credit_oas", "yield_curve", "yield_10y"):
+            if k in calls:
+                out[k] = DataPoint(name=k, value={"credit_oas": 3.5, "yield_curve": 0.4,
+                                                  "yield_10y": 5.0}[k], status=DataStatus.OK)
+        return out
+
+    monkeypatch.setattr(entry.gateway, "gather", fake_gather)
+    tech = entry.build_market_context("Tech/Cloud")
+    health = entry.build_market_context("Healthcare")
+    assert "credit_oas" in gathered[0] and "credit_oas" not in gathered[1]   # regime reused
+    assert tech.regime == health.regime and tech.health_score == health.health_score
+    assert "Tech/Cloud" in tech.macro_impact and "Tech/Cloud" not in health.macro_impact
+
+    monkeypatch.setattr(entry, "_REGIME", None)      # TTL expired: rebuilt, same session
+    entry.build_market_context("Tech/Cloud")
+    n = persistence.connect(db).execute("SELECT COUNT(*) FROM market_health_history").fetchone()[0]
+    assert n == 1
+
+
+def test_degraded_regime_is_only_kept_for_the_short_ttl(tmp_path, monkeypatch):
+    from investing import config, entry
+
+    monkeypatch.setattr(config, "DB_PATH", str(tmp_path / "mh.db"))
+    monkeypatch.setattr(entry, "_REGIME", None)
+    monkeypatch.setattr(entry.gateway, "gather", lambda calls, **kw: {k: RuntimeError("down") for k in calls})
+    ctx = entry.build_market_context("Tech/Cloud")
+    assert ctx.regime.value == "UNKNOWN"
+    assert entry._REGIME.ttl == config.MARKET_CONTEXT_DEGRADED_TTL < config.MARKET_CONTEXT_TTL
+
+    entry._REGIME.built_at -= config.MARKET_CONTEXT_DEGRADED_TTL + 1
+    assert not entry._regime_fresh()               # retried long before the full TTL
@@ -64,3 +64,61 @@ def test_atomic_rollback_on_error(db):
             conn.execute("INSERT INTO nonexistent_table (x) VALUES (1)")
     after = conn.execute("SELECT COUNT(*) c FROM signals").fetchone()["c"]
     assert after == before  # the first insert was rolled back
+
+
+def test_schema_applied_once_per_connection(db):
+    conn = persistence.init_db(db)
+    conn.execute("DROP TABLE job_runs")
+    assert persistence.init_db(db) is conn
+    names = {r["name"] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    assert "job_runs" not in names                # not re-run on the same connection
+
+
+def test_deferred_writes_batch_and_flush(db):
+    for i in range(50):
+        assert persistence.log_data_quality_event("NVDA", f"f{i}", "STALE", "yfinance",
+                                                  db_path=db, deferred=True) is None
+    persistence.log_signal("NVDA", "POSITION_20_90", "BREAKOUT", 0.7, 0.9, {}, db_path=db, deferred=True)
+    persistence.save_outcome({"plan_id": 1, "ticker": "NVDA", "horizon_session": 5},
+                             db_path=db, deferred=True)
+    assert persistence.flush(timeout=5)
+    conn = persistence.init_db(db)
+    count = lambda t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]  # noqa: E731
+    assert (count("data_quality_events"), count("signals"), count("recommendation_outcomes")) == (50, 1, 1)
+    # synchronous path unchanged: returns the row id
+    assert persistence.log_signal("AMD", "SHADOW", "X", 0, 0, {}, db_path=db) == 2
+
+
+def test_indexes_exist(db):
+    conn = persistence.init_db(db)
+    idx = {r["name"] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    assert {"idx_signals_ticker_ts", "idx_position_plans_ticker_ts",
+            "idx_outcomes_setup_regime_horizon", "idx_job_runs_job_started"} <= idx
+
+
+def test_outcome_rollups_incremental_match_rebuild(db):
+    rows = [("BREAKOUT", "CAUTION", "AI/Semis", 2.0, True, False),
+            ("BREAKOUT", "CAUTION", "Tech/Cloud", -1.0, False, True),
+            ("BREAKOUT", "BULL", "AI/Semis", 0.5, False, False),
+            ("PULLBACK", "CAUTION", "AI/Semis", None, False, False)]
+    for i, (setup, regime, sector, r, t1, stop) in enumerate(rows):
+        persistence.save_outcome({"plan_id": i, "ticker": "X", "horizon_session": 20,
+                                  "r_multiple": r, "mfe": abs(r or 0), "mae": 0.5,
+                                  "hit_target_1": t1, "hit_stop": stop, "setup_type": setup,
+                                  "sector": sector, "market_regime": regime},
+                                 db_path=db, deferred=(i % 2 == 1))
+    persistence.flush(timeout=5)
+
+    caution = {d["value"]: d for d in persistence.outcome_rollups("setup_regime", 20, db_path=db)}
+    b = caution["BREAKOUT|CAUTION"]
+    assert (b["n"], b["wins"], b["win_rate"], b["avg_r"], b["stop_rate"]) == (2, 1, 0.5, 0.5, 0.5)
+    assert caution["PULLBACK|CAUTION"]["avg_r"] is None
+    sectors = {d["value"]: d["n"] for d in persistence.outcome_rollups("sector", db_path=db)}
+    assert sectors == {"AI/Semis": 3, "Tech/Cloud": 1}
+
+    before = {dim: persistence.outcome_rollups(dim, db_path=db) for dim in persistence.ROLLUP_DIMENSIONS}
+    persistence.rebuild_outcome_rollups(db_path=db)
+    assert before == {dim: persistence.outcome_rollups(dim, db_path=db)
+                      for dim in persistence.ROLLUP_DIMENSIONS}
+    with pytest.raises(ValueError):
+        persistence.outcome_rollups("ticker", db_path=db)
@@ -0,0 +1,102 @@
+"""Batch RS engine — parity with relative_strength.compute, sort-based ranks."""
+
+import datetime as dt
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from investing import relative_strength, rs_rank  # noqa: E402
+
+
+def _walk(n, seed, drift=0.0):
+    rng = random.Random(seed)
+    px, out = 100.0, []
+    for _ in range(n):
+        px *= 1 + rng.gauss(drift, 0.015)
+        out.append(px)
+    return out
+
+
+SECTORS = {"A": "S1", "B": "S1", "C": "S1", "D": "S2", "E": "S2", "F": "S2"}
+CLOSES = {t: _walk(n, i, 0.0005 * i) for i, (t, n) in
+          enumerate(zip(SECTORS, [252, 252, 130, 70, 30, 252]))}
+BROAD = _walk(252, 99)
+SECTOR_CLOSES = {"S1": _walk(252, 50), "S2": _walk(252, 51)}
+
+
+def test_batch_matches_single_ticker_compute():
+    out = rs_rank.compute_universe(CLOSES, BROAD, SECTOR_CLOSES, sector_of=SECTORS.get)
+    for t, closes in CLOSES.items():
+        ref = relative_strength.compute(closes, BROAD, SECTOR_CLOSES[SECTORS[t]])
+        for k, want in ref.items():
+            got = out[t][k]
+            if want is None:
+                assert got is None, (t, k)
+            else:
+                assert got == pytest.approx(want, abs=0.0011), (t, k)
+
+
+def test_ranks_match_percentile_rank_definition():
+    out = rs_rank.compute_universe(CLOSES, BROAD, SECTOR_CLOSES, sector_of=SECTORS.get)
+    pop = [m["rs63_broad"] for m in out.values()]
+    for t, m in out.items():
+        v = m["rs63_broad"]
+        if v is None:
+            assert m["pct_rank_universe"] is None
+            continue
+        assert m["pct_rank_universe"] == relative_strength.percentile_rank(v, pop)
+        sec_pop = [out[x]["rs63_broad"] for x in out if SECTORS[x] == SECTORS[t]]
+        assert m["pct_rank_sector"] == relative_strength.percentile_rank(v, sec_pop)
+
+
+def test_table_lookup_and_out_of_universe_rank(monkeypatch):
+    metrics = rs_rank.compute_universe(CLOSES, BROAD, SECTOR_CLOSES, sector_of=SECTORS.get)
+    table = rs_rank.RankTable.build(dt.date(2025, 6, 2), metrics, sector_of=SECTORS.get)
+    monkeypatch.setattr(rs_rank, "table", lambda: table)
+
+    rs = rs_rank.attach_ranks("A", "S1", {"rs63_broad": metrics["A"]["rs63_broad"]})
+    assert rs["pct_rank_universe"] == metrics["A"]["pct_rank_universe"]
+
+    top = max(table.universe_pop) + 1
+    rs = rs_rank.attach_ranks("ZZZ", "S2", {"rs63_broad": top})
+    assert rs["pct_rank_universe"] == 100.0 and rs["pct_rank_sector"] == 100.0
+    assert rs_rank.attach_ranks("ZZZ", "S2", {"rs63_broad": None})["pct_rank_universe"] is None
+
+
+def test_missing_table_builds_in_background_and_failures_back_off(monkeypatch):
+    import threading
+
+    session = dt.date(2025, 6, 2)
+    monkeypatch.setattr(rs_rank.market_calendar, "last_completed_session", lambda *a: session)
+    monkeypatch.setattr(rs_rank, "_TABLE", None)
+    monkeypatch.setattr(rs_rank, "_FAILED_AT", None)
+    release, builds = threading.Event(), []
+
+    def slow_build(s):
+        builds.append(s)
+        release.wait(5)
+        return rs_rank.RankTable.build(s, rs_rank.compute_universe(CLOSES, BROAD, sector_of=SECTORS.get),
+                                       sector_of=SECTORS.get)
+
+    monkeypatch.setattr(rs_rank, "build_table", slow_build)
+    rs = rs_rank.attach_ranks("A", "S1", {"rs63_broad": 1.0})
+    assert rs["pct_rank_universe"] is None and rs["pct_rank_sector"] is None   # plan doesn't wait
+    assert rs_rank.table() is None
+    release.set()
+    for th in threading.enumerate():
+        if th.name == "rs-rank-build":
+            th.join(5)
+    assert builds == [session]                          # one build, not one per plan
+    assert rs_rank.table().session == session
+
+    monkeypatch.setattr(rs_rank, "_TABLE", None)
+    monkeypatch.setattr(rs_rank, "build_table", lambda s: builds.append(s) or 1 / 0)
+    rs_rank.table()
+    for th in threading.enumerate():
+        if th.name == "rs-rank-build":
+            th.join(5)
+    assert rs_rank._FAILED_AT is not None
+    rs_rank.table()                                     # negative-cached: no rebuild yet
+    assert len(builds) == 2
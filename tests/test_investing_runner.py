@@ -0,0 +1,38 @@
+"""Bounded executor — per-ticker dedupe and batches on the shared pool."""
+
+import threading
+
+from investing import runner
+
+
+def test_batch_runs_on_shared_pool_and_dedupes_per_ticker(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    monkeypatch.setattr(runner, "_EXECUTOR", ThreadPoolExecutor(max_workers=2))
+    monkeypatch.setattr(runner, "_INFLIGHT", set())
+    release, finished = threading.Event(), threading.Event()
+    seen, order, active, peak = [], [], [0], [0]
+    lock = threading.Lock()
+
+    def plan(t):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        release.wait(5)
+        with lock:
+            active[0] -= 1
+        seen.append(t)
+
+    assert runner.submit("u:AMD", release.wait) is True
+    skipped = runner.submit_batch({t: f"u:{t}" for t in ("NVDA", "AMD", "MSFT", "AAPL")}, plan,
+                                  prepare=lambda ts: order.append(("prepare", ts)),
+                                  done=finished.set)
+    assert skipped == ["AMD"]                           # only the ticker already running
+    assert runner.submit("u:NVDA", lambda: None) is False
+    release.set()
+    assert finished.wait(5)
+    assert order == [("prepare", ["NVDA", "MSFT", "AAPL"])]
+    assert sorted(seen) == ["AAPL", "MSFT", "NVDA"]
+    assert peak[0] <= 2                                 # never more than the pool's cap
+    runner._EXECUTOR.shutdown(wait=True)
+    assert runner.inflight_count() == 0